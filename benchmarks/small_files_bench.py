@@ -0,0 +1,94 @@
+"""
+Сравнение хеширования множества небольших файлов: построчный цикл
+md5_file, пул процессов с задачей на каждый файл и hash_entries (в одном
+процессе и пакетами в пуле). Для оценки нижней границы отдельно
+измеряется вычисление MD5 тех же данных в памяти (без открытия файлов и
+межпроцессного взаимодействия). Каждый вариант запускается --repeat раз,
+учитывается лучшее время.
+
+Запуск из корня репозитория:
+    python benchmarks/small_files_bench.py --files 20000 --size 1024
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from md5_batch import hash_entries
+from md5_core import md5, md5_file
+from md5_walk import walk_files
+
+
+def make_tree(root, files, size, per_dir=500):
+    """Создает дерево из files файлов случайного содержимого размером size."""
+    for i in range(files):
+        directory = os.path.join(root, f"d{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(directory)
+        with open(os.path.join(directory, f"f{i:06d}.bin"), "wb") as file:
+            file.write(os.urandom(size))
+
+
+def timed(name, func, files, baseline_time=None, repeat=1):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        digests = func()
+        elapsed = min(elapsed, time.perf_counter() - started)
+    speedup = f"  {baseline_time / elapsed:6.2f}x" if baseline_time else ""
+    print(f"{name:<40} {elapsed:8.2f} с  {files / elapsed:10.0f} файлов/с  "
+          f"{elapsed / files * 1e6:8.1f} мкс/файл{speedup}")
+    return digests, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк хеширования небольших файлов")
+    parser.add_argument("--files", type=int, default=20000, help="Количество файлов")
+    parser.add_argument("--size", type=int, default=1024, help="Размер файла в байтах")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Количество процессов")
+    parser.add_argument("--dir", default=None, help="Папка для временного дерева")
+    parser.add_argument("--repeat", type=int, default=3, help="Число запусков каждого варианта")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="md5_small_files_", dir=args.dir)
+    try:
+        make_tree(root, args.files, args.size)
+        entries = walk_files(root)
+        paths = [entry.path for entry in entries]
+        print(f"{args.files} файлов по {args.size} байт, процессов: {args.workers}, CPU: {os.cpu_count()}")
+
+        baseline, baseline_time = timed("цикл md5_file", lambda: [md5_file(path) for path in paths],
+                                        args.files, repeat=args.repeat)
+
+        def per_file_pool():
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                return list(executor.map(md5_file, paths))
+        results = [timed(f"пул, задача на файл ({args.workers})", per_file_pool, args.files, baseline_time,
+                         args.repeat)]
+
+        def batched(workers):
+            return lambda: [digest for _, digest, _ in hash_entries(entries, workers)]
+        results.append(timed("hash_entries, в текущем процессе", batched(1), args.files, baseline_time,
+                             args.repeat))
+        if args.workers > 1:
+            results.append(timed(f"hash_entries, пакеты ({args.workers})", batched(args.workers),
+                                 args.files, baseline_time, args.repeat))
+
+        for digests, _ in results:
+            if digests != baseline:
+                raise SystemExit("Хеши не совпадают с циклом md5_file")
+
+        data = [os.urandom(args.size) for _ in range(min(args.files, 2000))]
+        timed("только md5 в памяти (нижняя граница)", lambda: [md5(item) for item in data], len(data),
+              baseline_time * len(data) / args.files, args.repeat)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,10 @@ from PyQt6.QtWidgets import QApplication, QWidget
 from md5_hasher_ui import Ui_MD5HasherApp
 from md5_gui_handlers import *
 from md5_core import MD5StepByStep
+from md5_trace import TraceRecorder
+from md5_gui_models import StepTableModel, FileTableModel, FileFilterProxyModel
+from md5_realtime import RealtimeHasher
+from md5_throttle import Throttle
 
 class MD5HasherApp(QWidget):
     """
@@ -36,11 +40,44 @@ class MD5HasherApp(QWidget):
         self.reference_file_path = None
         self.current_file_path = None
 
+        # Индекс известных хешей для отметки файлов при хешировании папки
+        self.known_index = None
+
+        # Модели таблиц файлов и результатов сравнения
+        self.files_model = FileTableModel(self)
+        self.compare_model = FileTableModel(self)
+        self.files_proxy = self.setup_file_table(self.ui.files_table, self.files_model)
+        self.compare_proxy = self.setup_file_table(self.ui.compare_table, self.compare_model)
+
         self.md5_stepper = None
+        self.viz_model = None
+
+        # Фоновое вычисление хешей при вводе текста
+        self.string_hasher = RealtimeHasher(self)
+        self.hmac_hasher = RealtimeHasher(self)
+
+        # Ограничения фонового хеширования файлов и папок
+        self.throttle = Throttle()
 
         # Подключение сигналов и слотов
         self.setup_connections()
 
+    def setup_file_table(self, table, model):
+        """
+        Подключает модель файлов к таблице через прокси сортировки и фильтрации.
+        
+        Args:
+            table: QTableView для отображения
+            model: FileTableModel с данными
+            
+        Returns:
+            FileFilterProxyModel: Прокси-модель таблицы
+        """
+        proxy = FileFilterProxyModel(self)
+        proxy.setSourceModel(model)
+        table.setModel(proxy)
+        return proxy
+
     def setup_connections(self):
         """
         Устанавливает связи между сигналами и слотами для всех элементов интерфейса.
@@ -49,6 +86,10 @@ class MD5HasherApp(QWidget):
         """
         # Вкладка 1: Хеширование строки
         self.ui.input_field.textChanged.connect(self.update_hash_realtime)
+        self.string_hasher.hash_ready.connect(
+            lambda hash_text: show_realtime_hash(hash_text, self.ui.hash_output))
+        self.string_hasher.hash_failed.connect(
+            lambda message: show_realtime_error(message, self.ui.hash_output))
         self.ui.check_button.clicked.connect(self.check_hash_string)
 
         # Вкладка 2: Хеширование файла
@@ -57,24 +98,60 @@ class MD5HasherApp(QWidget):
 
         # Вкладка 3: Сравнение файлов
         self.ui.folder_button.clicked.connect(self.on_folder_button_click)
+        self.ui.known_index_button.clicked.connect(self.load_known_index)
+        self.ui.archive_button.clicked.connect(self.on_archive_button_click)
+        self.ui.copy_button.clicked.connect(self.on_copy_button_click)
+        self.ui.files_filter.textChanged.connect(self.files_proxy.set_filter_text)
+        self.ui.compare_filter.textChanged.connect(self.compare_proxy.set_filter_text)
+        self.ui.files_digest_filter.textChanged.connect(self.files_proxy.set_digest_filter)
+        self.ui.compare_digest_filter.textChanged.connect(self.compare_proxy.set_digest_filter)
+        for spin in (self.ui.files_min_size_spin, self.ui.files_max_size_spin):
+            spin.valueChanged.connect(lambda _: self.update_size_filter(
+                self.files_proxy, self.ui.files_min_size_spin, self.ui.files_max_size_spin))
+        for spin in (self.ui.compare_min_size_spin, self.ui.compare_max_size_spin):
+            spin.valueChanged.connect(lambda _: self.update_size_filter(
+                self.compare_proxy, self.ui.compare_min_size_spin, self.ui.compare_max_size_spin))
         self.ui.select_ref_button.clicked.connect(self.select_reference_file)
         self.ui.select_curr_button.clicked.connect(self.select_current_file)
         self.ui.compare_button.clicked.connect(self.compare_files)
+        self.ui.verify_button.clicked.connect(self.verify_folder)
 
         # Вкладка 4: Хеширование папки
         self.ui.folder_hash_button.clicked.connect(self.calculate_folder_hash)
         self.ui.folder_check_button.clicked.connect(self.check_folder_hash)
+        self.ui.throttle_rate_spin.valueChanged.connect(self.update_throttle)
+        self.ui.throttle_workers_spin.valueChanged.connect(self.update_throttle)
+        self.ui.throttle_priority_check.toggled.connect(self.update_throttle)
 
         # Вкладка 5: Визуализация хеширования
         self.ui.viz_start_button.clicked.connect(self.start_visualization)
         self.ui.viz_next_button.clicked.connect(self.next_visualization_step)
+        self.ui.viz_run_n_button.clicked.connect(self.run_visualization_steps)
+        self.ui.viz_run_chunk_button.clicked.connect(self.run_visualization_to_chunk_end)
 
         # Add HMAC connections
         self.ui.hmac_input.textChanged.connect(self.update_hmac_realtime)
         self.ui.hmac_key.textChanged.connect(self.update_hmac_realtime)
+        self.hmac_hasher.hash_ready.connect(
+            lambda hash_text: show_realtime_hash(hash_text, self.ui.hmac_output))
+        self.hmac_hasher.hash_failed.connect(
+            lambda message: show_realtime_error(message, self.ui.hmac_output))
         self.ui.hmac_file_button.clicked.connect(self.calculate_file_hmac)
 
     # Функции-обработчики событий
+    def update_size_filter(self, proxy, min_spin, max_spin):
+        """
+        Применяет диапазон размера из полей фильтра (в КБ, 0 - без ограничения).
+        
+        Args:
+            proxy: FileFilterProxyModel таблицы
+            min_spin: Поле минимального размера
+            max_spin: Поле максимального размера
+        """
+        min_size = min_spin.value() * 1024 if min_spin.value() else None
+        max_size = max_spin.value() * 1024 if max_spin.value() else None
+        proxy.set_size_range(min_size, max_size)
+
     def update_hash_realtime(self, text):
         """
         Обновляет хеш в реальном времени при изменении входного текста.
@@ -82,7 +159,7 @@ class MD5HasherApp(QWidget):
         Args:
             text (str): Текущий текст в поле ввода
         """
-        update_hash_realtime(text, self.ui.hash_output)
+        update_hash_realtime(text, self.ui.hash_output, self.string_hasher)
 
     def check_hash_string(self):
         """
@@ -95,7 +172,7 @@ class MD5HasherApp(QWidget):
         Обрабатывает нажатие кнопки выбора файла.
         Открывает диалог выбора файла и вычисляет его хеш.
         """
-        on_file_button_click(self, self.ui.hash_output_file)
+        on_file_button_click(self, self.ui.hash_output_file, self.throttle)
 
     def check_hash_file(self):
         """
@@ -108,7 +185,34 @@ class MD5HasherApp(QWidget):
         Обрабатывает нажатие кнопки выбора папки.
         Открывает диалог выбора папки и отображает список файлов.
         """
-        on_folder_button_click(self, self.ui.files_list)
+        on_folder_button_click(
+            self, self.files_model, self.ui.files_status, self.known_index, self.ui.folder_hash_output,
+            self.throttle
+        )
+
+    def on_archive_button_click(self):
+        """
+        Обрабатывает нажатие кнопки выбора архива.
+        Хеширует файлы архива без распаковки и отображает их список.
+        """
+        on_archive_button_click(self, self.files_model, self.ui.files_status)
+
+    def on_copy_button_click(self):
+        """
+        Обрабатывает нажатие кнопки копирования папки.
+        Копирует папку с хешированием за один проход и отображает список файлов.
+        """
+        on_copy_button_click(self, self.files_model, self.ui.files_status)
+
+    def load_known_index(self):
+        """
+        Загружает базу известных хешей для отметки файлов в списке.
+        """
+        index = load_known_index(self, self.ui.files_status)
+        if index is not None:
+            if self.known_index is not None:
+                self.known_index.close()
+            self.known_index = index
 
     def select_reference_file(self):
         """
@@ -117,7 +221,7 @@ class MD5HasherApp(QWidget):
         Returns:
             str: Путь к выбранному файлу
         """
-        self.reference_file_path = select_reference_file(self, self.ui.compare_results)
+        self.reference_file_path = select_reference_file(self, self.ui.compare_status)
 
     def select_current_file(self):
         """
@@ -126,21 +230,43 @@ class MD5HasherApp(QWidget):
         Returns:
             str: Путь к выбранному файлу
         """
-        self.current_file_path = select_current_file(self, self.ui.compare_results)
+        self.current_file_path = select_current_file(self, self.ui.compare_status)
 
     def compare_files(self):
         """
         Сравнивает MD5 хеши эталонного и текущего файлов.
         Отображает результат сравнения в интерфейсе.
         """
-        compare_files(self.reference_file_path, self.current_file_path, self.ui.compare_results)
+        compare_files(self.reference_file_path, self.current_file_path, self.compare_model, self.ui.compare_status)
+
+    def verify_folder(self):
+        """
+        Проверяет файлы папки по выбранному эталонному файлу с хешами.
+        Результаты выводятся по мере проверки.
+        """
+        verify_folder_against_manifest(
+            self, self.reference_file_path, self.compare_model, self.ui.compare_status,
+            self.ui.verify_fail_fast_check.isChecked()
+        )
 
     def calculate_folder_hash(self):
         """
         Вычисляет MD5 хеш для всех файлов в выбранной папке.
         Отображает результат в интерфейсе.
         """
-        calculate_folder_hash(self, self.ui.folder_hash_output)
+        calculate_folder_hash(
+            self, self.ui.folder_hash_output, self.ui.folder_job_log_check.isChecked(), self.throttle
+        )
+
+    def update_throttle(self):
+        """
+        Применяет настройки ограничения фонового хеширования
+        (в том числе во время выполнения задания).
+        """
+        update_throttle(
+            self.throttle, self.ui.throttle_rate_spin.value(), self.ui.throttle_workers_spin.value(),
+            self.ui.throttle_priority_check.isChecked()
+        )
 
     def check_folder_hash(self):
         """
@@ -155,47 +281,82 @@ class MD5HasherApp(QWidget):
     def start_visualization(self):
         """
         Начинает пошаговую визуализацию процесса MD5 хеширования.
-        Инициализирует MD5StepByStep для введенного текста.
+        Инициализирует MD5StepByStep для введенного текста и таблицу шагов.
         """
+        self.md5_stepper = None
+        self.ui.viz_table.setModel(None)
+        self.set_visualization_enabled(False)
+
         input_text = self.ui.viz_input.text()
         if not input_text:
-            self.ui.viz_output.clear()
+            self.ui.viz_status.clear()
             return
             
         try:
-            self.md5_stepper = MD5StepByStep(bytearray(input_text, 'utf-8'))
-            self.ui.viz_next_button.setEnabled(True)
-            self.ui.viz_output.clear()
-            self.ui.viz_output.append("Процесс хеширования начат. Нажмите 'Следующий шаг', чтобы продолжить.")
+            recorder = TraceRecorder()
+            self.md5_stepper = MD5StepByStep(bytearray(input_text, 'utf-8'), recorder)
+            self.viz_model = StepTableModel(recorder, self)
+            self.ui.viz_table.setModel(self.viz_model)
+            self.set_visualization_enabled(True)
+            self.ui.viz_status.setText("Процесс хеширования начат. Нажмите 'Следующий шаг', чтобы продолжить.")
         except Exception as e:
-            self.ui.viz_output.append(f"Ошибка: {str(e)}")
-            self.ui.viz_next_button.setEnabled(False)
+            self.ui.viz_status.setText(f"Ошибка: {str(e)}")
+
+    def set_visualization_enabled(self, enabled):
+        """
+        Включает или отключает кнопки выполнения шагов визуализации.
+        
+        Args:
+            enabled (bool): Новое состояние кнопок
+        """
+        self.ui.viz_next_button.setEnabled(enabled)
+        self.ui.viz_run_n_button.setEnabled(enabled)
+        self.ui.viz_run_chunk_button.setEnabled(enabled)
 
     def next_visualization_step(self):
         """
         Выполняет следующий шаг визуализации MD5 хеширования.
         Отображает промежуточные результаты в интерфейсе.
         """
+        self.advance_visualization(1)
+
+    def run_visualization_steps(self):
+        """Выполняет заданное количество шагов визуализации."""
+        self.advance_visualization(self.ui.viz_steps_spin.value())
+
+    def run_visualization_to_chunk_end(self):
+        """Выполняет шаги визуализации до конца текущего чанка."""
+        self.advance_visualization(0, to_chunk_end=True)
+
+    def advance_visualization(self, count, to_chunk_end=False):
+        """
+        Выполняет шаги визуализации и прокручивает таблицу к последнему шагу.
+        
+        Args:
+            count (int): Количество шагов
+            to_chunk_end (bool): Выполнить шаги до конца текущего чанка
+        """
         if not self.md5_stepper:
             return
-            
-        step_info, completion_msg = self.md5_stepper.next_step()
-        
-        if completion_msg:
-            self.ui.viz_output.append(completion_msg)
-            if "completed" in completion_msg.lower():
-                self.ui.viz_output.append(f"\nФинальный хеш: {self.md5_stepper.get_final_hash()}")
-                self.ui.viz_next_button.setEnabled(False)
-                self.md5_stepper = None
-        elif step_info:
-            self.ui.viz_output.append(format_step_info(step_info))
+
+        self.set_visualization_enabled(False)
+        finished = run_visualization_steps(
+            self.md5_stepper, self.viz_model, count, self.ui.viz_status, to_chunk_end
+        )
+        self.ui.viz_table.scrollToBottom()
+
+        if finished:
+            self.md5_stepper = None
+        else:
+            self.set_visualization_enabled(True)
 
     def update_hmac_realtime(self):
         """Обновляет HMAC в реальном времени."""
         update_hmac_realtime(
             self.ui.hmac_input.text(),
             self.ui.hmac_key.text(),
-            self.ui.hmac_output
+            self.ui.hmac_output,
+            self.hmac_hasher
         )
 
     def calculate_file_hmac(self):
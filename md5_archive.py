@@ -0,0 +1,224 @@
+import gzip
+import os
+import posixpath
+import tarfile
+import zipfile
+from collections import namedtuple
+from md5_core import MD5State, READ_SIZE, md5_string
+from md5_scan import MANIFEST_NAME, is_manifest
+
+# Файл архива: путь (с разделителями os.sep, как в манифесте), размер и MD5 хеш
+ArchiveEntry = namedtuple('ArchiveEntry', 'rel_path size md5')
+
+
+# Максимальная длина цепочки символических ссылок (как ELOOP в Linux)
+MAX_SYMLINK_DEPTH = 40
+
+
+def _archive_name(name):
+    """Приводит имя элемента архива к относительному пути с '/' или None за пределами архива."""
+    name = posixpath.normpath(name.replace('\\', '/')).lstrip('/')
+    if name in ('', '.') or name == '..' or name.startswith('../'):
+        return None
+    return name
+
+
+def _normalize_name(name):
+    """Приводит имя элемента архива к относительному пути, как после распаковки."""
+    name = _archive_name(name)
+    return name.replace('/', os.sep) if name is not None else None
+
+
+def _hash_fileobj(fileobj):
+    """Хеширует поток элемента архива, не сохраняя его на диск."""
+    state = MD5State()
+    chunk = fileobj.read(READ_SIZE)
+    while chunk:
+        state.update(chunk)
+        chunk = fileobj.read(READ_SIZE)
+    return state.hexdigest(), state.total_length
+
+
+def _iter_tar(archive_path):
+    """
+    Хеширует файлы tar, включая жесткие и символические ссылки на файлы.
+
+    Жесткая ссылка получает хеш и размер своего элемента-цели (цель
+    всегда находится раньше ссылки). Символические ссылки разрешаются
+    после чтения всего архива, так как цель может идти позже; ссылки на
+    папки пропускаются, как при обходе распакованной папки.
+
+    Raises:
+        ValueError: Если ссылку нельзя разрешить внутри архива
+    """
+    files = {}
+    directories = set()
+    symlinks = {}
+    # Потоковый режим 'r|*' читает tar и tar.gz/bz2/xz последовательно, без перемотки
+    with tarfile.open(archive_path, mode='r|*') as archive:
+        for member in archive:
+            name = _archive_name(member.name)
+            if name is None:
+                continue
+            if member.isdir():
+                directories.add(name)
+            elif member.isreg():
+                digest, size = _hash_fileobj(archive.extractfile(member))
+                files[name] = (size, digest)
+                symlinks.pop(name, None)
+                yield ArchiveEntry(name.replace('/', os.sep), size, digest)
+            elif member.islnk():
+                target = _archive_name(member.linkname)
+                if target not in files:
+                    raise ValueError(f"Не найдена цель жесткой ссылки {member.name}: {member.linkname}")
+                files[name] = files[target]
+                symlinks.pop(name, None)
+                yield ArchiveEntry(name.replace('/', os.sep), *files[target])
+            elif member.issym():
+                symlinks[name] = member.linkname
+                files.pop(name, None)
+
+    for name in symlinks:
+        target = _resolve_symlink(name, symlinks, files, directories)
+        if target is not None:
+            yield ArchiveEntry(name.replace('/', os.sep), *files[target])
+
+
+def _resolve_symlink(name, symlinks, files, directories):
+    """
+    Находит файл, на который указывает символическая ссылка в архиве.
+
+    Returns:
+        str: Имя файла-цели или None, если ссылка указывает на папку
+
+    Raises:
+        ValueError: Если цель вне архива, отсутствует или ссылки зациклены
+    """
+    path = name
+    for _ in range(MAX_SYMLINK_DEPTH):
+        link = symlinks[path]
+        if posixpath.isabs(link):
+            raise ValueError(f"Символическая ссылка {name} указывает за пределы архива: {link}")
+        path = _archive_name(posixpath.join(posixpath.dirname(path), link))
+        if path is None:
+            raise ValueError(f"Символическая ссылка {name} указывает за пределы архива: {link}")
+        if path in files:
+            return path
+        if path not in symlinks:
+            prefix = path + '/'
+            if path in directories or any(other.startswith(prefix) for other in files):
+                return None
+            raise ValueError(f"Не найдена цель символической ссылки {name}: {link}")
+    raise ValueError(f"Слишком длинная цепочка символических ссылок: {name}")
+
+
+def _iter_zip(archive_path):
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            with archive.open(info) as fileobj:
+                yield info.filename, fileobj
+
+
+def _iter_gzip(archive_path):
+    name = os.path.basename(archive_path)
+    name = name[:-3] if name.lower().endswith('.gz') else name + '.out'
+    with gzip.open(archive_path, 'rb') as fileobj:
+        yield name, fileobj
+
+
+def iter_archive_files(archive_path):
+    """
+    Хеширует обычные файлы архива в порядке их следования.
+
+    Поддерживаются tar (в том числе сжатые gzip/bz2/xz), zip и одиночные
+    файлы .gz. Жесткие и символические ссылки tar на файлы хешируются как
+    их цели (символические - после остальных файлов); папки, ссылки на
+    папки и специальные файлы пропускаются; элементы с путями за
+    пределами архива (абсолютные, '..') игнорируются.
+
+    Args:
+        archive_path: Путь к архиву
+
+    Yields:
+        ArchiveEntry: Путь, размер и хеш каждого файла
+
+    Raises:
+        ValueError: Если формат архива не распознан или ссылку tar нельзя
+            разрешить внутри архива
+    """
+    if tarfile.is_tarfile(archive_path):
+        yield from _iter_tar(archive_path)
+        return
+    if zipfile.is_zipfile(archive_path):
+        members = _iter_zip(archive_path)
+    else:
+        with open(archive_path, 'rb') as f:
+            magic = f.read(2)
+        if magic != b'\x1f\x8b':
+            raise ValueError(f"Неизвестный формат архива: {archive_path}")
+        members = _iter_gzip(archive_path)
+
+    for name, fileobj in members:
+        rel_path = _normalize_name(name)
+        if rel_path is None:
+            continue
+        digest, size = _hash_fileobj(fileobj)
+        yield ArchiveEntry(rel_path, size, digest)
+
+
+def hash_archive(archive_path, progress=None):
+    """
+    Хеширует все файлы архива без распаковки.
+
+    Повторяющиеся пути (в tar более поздний элемент перезаписывает
+    предыдущий при распаковке) учитываются один раз, по последнему вхождению.
+
+    Args:
+        archive_path: Путь к архиву
+        progress: Функция progress(ArchiveEntry, обработано) или None
+
+    Returns:
+        list: ArchiveEntry, отсортированные так же, как файлы распакованной папки
+    """
+    entries = {}
+    for processed, entry in enumerate(iter_archive_files(archive_path), 1):
+        entries[entry.rel_path] = entry
+        if progress is not None:
+            progress(entry, processed)
+    return [entries[name] for name in sorted(entries)]
+
+
+def write_archive_manifest(entries, output_path):
+    """
+    Записывает манифест в формате file_hashes.txt.
+
+    Манифест в корне архива, если он есть, в список не включается
+    (те же правила, что у scan_folder).
+
+    Args:
+        entries: Список ArchiveEntry из hash_archive
+        output_path: Путь к создаваемому манифесту
+    """
+    with open(output_path, "w", buffering=65536) as output_file:
+        output_file.write("Файл\tMD5 Хеш\n")
+        for entry in entries:
+            if not is_manifest(entry.rel_path):
+                output_file.write(f"{entry.rel_path}: {entry.md5}\n")
+
+
+def archive_folder_hash(entries):
+    """
+    Вычисляет хеш папки, которую дала бы распаковка архива.
+
+    Результат совпадает с calculate_folder_hash для распакованного дерева:
+    манифест в корне архива не учитывается.
+
+    Args:
+        entries: Список ArchiveEntry из hash_archive
+
+    Returns:
+        str: MD5 хеш папки
+    """
+    return md5_string(''.join(entry.md5 for entry in entries if not is_manifest(entry.rel_path)))
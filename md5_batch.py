@@ -0,0 +1,234 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from md5_core import SMALL_FILE_THRESHOLD, md5_digest, md5_many, md5_small_file
+from md5_io import md5_file_sequential
+from md5_throttle import init_worker, worker_throttle
+
+# Ограничения одного пакета небольших файлов
+BATCH_FILES = 512
+BATCH_BYTES = 8 * 1024 * 1024
+
+
+def _read_small_file(path, threshold):
+    """
+    Читает небольшой файл одним os.read.
+
+    Returns:
+        bytes: Содержимое файла или None, если файл оказался больше threshold
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        # Для обычного файла неполное чтение означает конец файла
+        data = os.read(fd, threshold + 1)
+    finally:
+        os.close(fd)
+    return data if len(data) <= threshold else None
+
+
+def _hash_small_timed(path, threshold, timings):
+    """Хеширует небольшой файл, добавляя в timings (время чтения, время хеширования)."""
+    clock = time.perf_counter
+    started = clock()
+    data = _read_small_file(path, threshold)
+    read_time = clock() - started
+    started = clock()
+    digest = md5_digest(data) if data is not None else md5_small_file(path, threshold)
+    timings.append((read_time, clock() - started))
+    return digest
+
+
+def _hash_small_batch(paths, threshold, sizes=None, throttle=None, timed=False):
+    """
+    Хеширует пакет небольших файлов (выполняется в процессе-обработчике).
+
+    Сначала читаются все файлы пакета, затем их содержимое хешируется
+    одним вызовом md5_many (и может быть передано движку, заданному
+    set_many_engine). Файлы, выросшие больше threshold, хешируются
+    потоково по отдельности. При timed каждый файл хешируется сразу
+    после чтения, чтобы измерить время по файлам.
+
+    Args:
+        paths: Пути к файлам
+        threshold: Порог размера небольшого файла
+        sizes: Размеры файлов для учета ограничения скорости или None
+        throttle: Throttle или None (в процессе пула - ограничения пула)
+        timed: Измерять время чтения и хеширования каждого файла
+
+    Returns:
+        tuple: (хеши подряд по 16 байт, {номер файла: текст ошибки},
+            список пар (время чтения, время хеширования) по файлам или None)
+    """
+    throttle = throttle or worker_throttle()
+    if throttle is not None:
+        throttle.acquire_worker()
+    try:
+        digests = bytearray(16 * len(paths))
+        errors = {}
+        timings = [] if timed else None
+        # Номера и содержимое файлов, хешируемых одним вызовом md5_many
+        batched = []
+        contents = []
+        for i, path in enumerate(paths):
+            try:
+                if timed:
+                    digests[16 * i:16 * i + 16] = _hash_small_timed(path, threshold, timings)
+                else:
+                    data = _read_small_file(path, threshold)
+                    if data is None:
+                        digests[16 * i:16 * i + 16] = md5_small_file(path, threshold)
+                    else:
+                        batched.append(i)
+                        contents.append(data)
+            except OSError as e:
+                errors[i] = str(e)
+                if timed:
+                    timings.append((0.0, 0.0))
+            if throttle is not None and sizes is not None:
+                throttle.consume(sizes[i])
+        packed = md5_many(contents)
+        for n, i in enumerate(batched):
+            digests[16 * i:16 * i + 16] = packed[16 * n:16 * n + 16]
+        return bytes(digests), errors, timings
+    finally:
+        if throttle is not None:
+            throttle.release_worker()
+
+
+def _hash_large_file(path, throttle=None, timed=False):
+    throttle = throttle or worker_throttle()
+    if throttle is not None:
+        throttle.acquire_worker()
+    timings = [] if timed else None
+    try:
+        return bytes.fromhex(md5_file_sequential(path, throttle=throttle, timings=timings)), {}, timings
+    except OSError as e:
+        return bytes(16), {0: str(e)}, [(0.0, 0.0)] if timed else None
+    finally:
+        if throttle is not None:
+            throttle.release_worker()
+
+
+def _iter_batches(entries, threshold, batch_files, batch_bytes):
+    """Группирует записи: небольшие файлы пакетами, большие - по одному."""
+    batch = []
+    batch_size = 0
+    for entry in entries:
+        if entry.size > threshold:
+            if batch:
+                yield batch, True
+                batch, batch_size = [], 0
+            yield [entry], False
+            continue
+        batch.append(entry)
+        batch_size += entry.size
+        if len(batch) >= batch_files or batch_size >= batch_bytes:
+            yield batch, True
+            batch, batch_size = [], 0
+    if batch:
+        yield batch, True
+
+
+def _results(batch, digests, errors, timings, job_log=None):
+    for i, entry in enumerate(batch):
+        error = errors.get(i)
+        if job_log is not None:
+            read_time, hash_time = timings[i]
+            job_log.record(entry.path, entry.size if error is None else 0, read_time, hash_time, error)
+        yield entry, None if error is not None else digests[16 * i:16 * i + 16].hex(), error
+
+
+def _hash_entry(entry, threshold, throttle, job_log=None):
+    """Хеширует один файл в текущем процессе."""
+    timings = [] if job_log is not None else None
+    error = None
+    if throttle is not None:
+        throttle.acquire_worker()
+    try:
+        if entry.size > threshold:
+            digest = md5_file_sequential(entry.path, throttle=throttle, timings=timings)
+        else:
+            if timings is not None:
+                digest = _hash_small_timed(entry.path, threshold, timings).hex()
+            else:
+                digest = md5_small_file(entry.path, threshold).hex()
+            if throttle is not None:
+                throttle.consume(entry.size)
+    except OSError as e:
+        digest, error = None, str(e)
+    finally:
+        if throttle is not None:
+            throttle.release_worker()
+    if job_log is not None:
+        read_time, hash_time = timings[0] if timings else (0.0, 0.0)
+        job_log.record(entry.path, entry.size if error is None else 0, read_time, hash_time, error)
+    return entry, digest, error
+
+
+def hash_entries(entries, workers=None, threshold=SMALL_FILE_THRESHOLD,
+                 batch_files=BATCH_FILES, batch_bytes=BATCH_BYTES, throttle=None, job_log=None):
+    """
+    Хеширует файлы из обходчика папок, сохраняя их порядок.
+
+    Файлы не больше threshold читаются одним os.read. В пуле процессов
+    они передаются пакетами (до batch_files файлов или batch_bytes байт):
+    процесс читает весь пакет и хеширует его одним вызовом md5_many, а
+    возвращает хеши одним блоком, поэтому межпроцессное взаимодействие
+    приходится на пакет, а не на файл. Большие файлы хешируются потоково,
+    по одному на задачу.
+
+    В одном процессе пакеты не формируются: время хеширования чистым
+    Python на порядки больше открытия и чтения небольшого файла, и
+    пакетирование не дает выигрыша (см. benchmarks/small_files_bench.py).
+
+    Args:
+        entries: Итерируемый объект WalkEntry (нужны поля path и size)
+        workers: Количество процессов (по умолчанию os.cpu_count(); 1 - без процессов)
+        threshold: Порог размера небольшого файла в байтах
+        batch_files: Максимальное число файлов в пакете
+        batch_bytes: Максимальный суммарный размер пакета
+        throttle: md5_throttle.Throttle или None. Скорость чтения и число
+            одновременно работающих процессов можно менять во время
+            задания; приоритет (nice, ioprio) применяется только к
+            процессам пула, поэтому при его наличии пул создается и для
+            одного процесса
+        job_log: md5_metrics.JobLog или None. Время чтения и хеширования
+            измеряется там, где файл хешируется (в том числе в процессах
+            пула), и записывается в журнал при выдаче результата
+
+    Yields:
+        tuple: (WalkEntry, хеш или None, текст ошибки или None) в порядке entries
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 and (throttle is None or not throttle.has_priority):
+        for entry in entries:
+            yield _hash_entry(entry, threshold, throttle, job_log)
+        return
+    workers = max(workers, 1)
+
+    # Результаты выдаются по порядку, поэтому очередь задач ограничена окном
+    max_pending = workers * 4
+    pending = deque()
+    timed = job_log is not None
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(throttle,)) as executor:
+        try:
+            for batch, small in _iter_batches(entries, threshold, batch_files, batch_bytes):
+                if small:
+                    future = executor.submit(_hash_small_batch, [entry.path for entry in batch], threshold,
+                                             [entry.size for entry in batch] if throttle is not None else None,
+                                             None, timed)
+                else:
+                    future = executor.submit(_hash_large_file, batch[0].path, None, timed)
+                pending.append((batch, future))
+                while len(pending) >= max_pending:
+                    batch, future = pending.popleft()
+                    yield from _results(batch, *future.result(), job_log)
+            while pending:
+                batch, future = pending.popleft()
+                yield from _results(batch, *future.result(), job_log)
+        finally:
+            for _, future in pending:
+                future.cancel()
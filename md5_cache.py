@@ -0,0 +1,294 @@
+import hashlib
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from md5_core import md5, md5_string, hmac_md5_string
+
+# Политики вытеснения
+POLICY_LRU = 'lru'
+POLICY_TINYLFU = 'tinylfu'
+
+# Оценка накладных расходов на одну запись (объекты ключа, узел словаря, хеш)
+ENTRY_OVERHEAD = 160
+
+# Число счетчиков каждой строки, уменьшаемых за одно добавление в FrequencySketch
+AGE_CHUNK = 4096
+# Таблица деления счетчика пополам для bytes.translate
+_HALVE = bytes(value >> 1 for value in range(256))
+
+# Значения по умолчанию: общий бюджет и максимальный размер кэшируемого входа
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ITEM_SIZE = 64 * 1024
+
+
+class FrequencySketch:
+    """
+    Приблизительный счетчик частот (count-min sketch) для политики TinyLFU.
+
+    Счетчики 8-битные; после sample_size добавлений все счетчики
+    делятся пополам, чтобы старая популярность со временем забывалась.
+    Уменьшение выполняется постепенно, по AGE_CHUNK счетчиков за
+    добавление, чтобы не задерживать обращения к кэшу.
+    """
+
+    DEPTH = 4
+
+    def __init__(self, width=4096, sample_size=40960):
+        """
+        Args:
+            width: Число счетчиков в строке (округляется до степени двойки)
+            sample_size: Число добавлений между уменьшениями счетчиков
+        """
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.sample_size = sample_size
+        self._rows = [array('B', bytes(self.width)) for _ in range(self.DEPTH)]
+        self._additions = 0
+        self._aging_pos = None
+
+    def _indexes(self, key):
+        mask = self.width - 1
+        return [hash((seed, key)) & mask for seed in range(self.DEPTH)]
+
+    def add(self, key):
+        """Учитывает одно обращение к ключу."""
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < 255:
+                row[index] += 1
+        self._additions += 1
+        if self._aging_pos is None and self._additions >= self.sample_size:
+            self._aging_pos = 0
+            self._additions //= 2
+        if self._aging_pos is not None:
+            self._age_step()
+
+    def estimate(self, key):
+        """Возвращает оценку числа обращений к ключу."""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _age_step(self):
+        start = self._aging_pos
+        end = min(start + AGE_CHUNK, self.width)
+        for row in self._rows:
+            row[start:end] = array('B', row[start:end].tobytes().translate(_HALVE))
+        self._aging_pos = end if end < self.width else None
+
+
+class HashCache:
+    """
+    Потокобезопасный кэш результатов хеширования с ограничением по объему.
+
+    Объем записи оценивается как размер входных данных плюс ENTRY_OVERHEAD;
+    суммарный объем никогда не превышает max_bytes, а входы больше
+    max_item_size не кэшируются. Вытесняется давно не использованная
+    запись (LRU); с политикой TinyLFU новая запись допускается в
+    заполненный кэш, только если к ней обращались чаще, чем к вытесняемой.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_item_size=DEFAULT_MAX_ITEM_SIZE, policy=POLICY_LRU):
+        """
+        Args:
+            max_bytes: Бюджет памяти кэша в байтах
+            max_item_size: Максимальный размер кэшируемого входа в байтах
+            policy: POLICY_LRU или POLICY_TINYLFU
+
+        Raises:
+            ValueError: Если политика неизвестна
+        """
+        if policy not in (POLICY_LRU, POLICY_TINYLFU):
+            raise ValueError(f"Неизвестная политика кэша: {policy}")
+        self.max_bytes = max_bytes
+        self.max_item_size = max_item_size
+        self.policy = policy
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._sketch = None
+        if policy == POLICY_TINYLFU:
+            width = max(16, max_bytes // (ENTRY_OVERHEAD + 64))
+            self._sketch = FrequencySketch(width, width * 10)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def get(self, key):
+        """
+        Возвращает сохраненный результат или None.
+
+        Args:
+            key: Неизменяемый ключ (кортеж из типа операции и входных данных)
+        """
+        with self._lock:
+            if self._sketch is not None:
+                self._sketch.add(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Сохраняет результат, вытесняя старые записи при необходимости.
+
+        Args:
+            key: Неизменяемый ключ
+            value: Результат хеширования
+            size: Размер входных данных в байтах
+        """
+        cost = size + ENTRY_OVERHEAD
+        with self._lock:
+            if size > self.max_item_size or cost > self.max_bytes:
+                self.rejected += 1
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if self._sketch is not None and self.bytes + cost > self.max_bytes and self._entries:
+                victim = next(iter(self._entries))
+                if self._sketch.estimate(key) <= self._sketch.estimate(victim):
+                    self.rejected += 1
+                    return
+            while self.bytes + cost > self.max_bytes:
+                _, (_, victim_cost) = self._entries.popitem(last=False)
+                self.bytes -= victim_cost
+                self.evictions += 1
+            self._entries[key] = (value, cost)
+            self.bytes += cost
+
+    def clear(self):
+        """Удаляет все записи (статистика сохраняется)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            dict: entries, bytes, hits, misses, evictions, rejected, hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoizedHasher:
+    """
+    Кэширующие версии md5, md5_string и hmac_md5_string.
+
+    Входы больше max_item_size кэша хешируются напрямую, без копирования.
+    Ключи HMAC в кэше не хранятся: запись находится по BLAKE2b от ключа,
+    вычисленному со случайным ключом этого объекта (hashlib, а не чистый
+    Python, чтобы попадание в кэш стоило меньше самого хеширования).
+    """
+
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache: HashCache или None для кэша с параметрами по умолчанию
+        """
+        self.cache = cache if cache is not None else HashCache()
+        self._key_salt = os.urandom(16)
+
+    def md5(self, data):
+        """Кэширующий аналог md5_core.md5."""
+        size = len(data) if isinstance(data, (bytes, bytearray)) else memoryview(data).nbytes
+        if size > self.cache.max_item_size:
+            return md5(data)
+        key = ('md5', bytes(data))
+        result = self.cache.get(key)
+        if result is None:
+            result = md5(key[1])
+            self.cache.put(key, result, size)
+        return result
+
+    def md5_string(self, input_string):
+        """Кэширующий аналог md5_core.md5_string."""
+        size = _text_size(input_string)
+        if size > self.cache.max_item_size:
+            return md5_string(input_string)
+        key = ('md5_string', input_string)
+        result = self.cache.get(key)
+        if result is None:
+            result = md5_string(input_string)
+            self.cache.put(key, result, size)
+        return result
+
+    def hmac_md5_string(self, key, message):
+        """Кэширующий аналог md5_core.hmac_md5_string."""
+        if _text_size(key) + _text_size(message) > self.cache.max_item_size:
+            return hmac_md5_string(key, message)
+        key_id = hashlib.blake2b(key.encode('utf-8'), key=self._key_salt, digest_size=16).digest()
+        cache_key = ('hmac_md5_string', key_id, message)
+        result = self.cache.get(cache_key)
+        if result is None:
+            result = hmac_md5_string(key, message)
+            self.cache.put(cache_key, result, len(key_id) + _text_size(message))
+        return result
+
+
+def _text_size(text):
+    """Оценка сверху объема строки в памяти (до 4 байт на символ)."""
+    return len(text) if text.isascii() else 4 * len(text)
+
+
+_default_hasher = None
+_default_lock = threading.Lock()
+
+
+def configure_cache(max_bytes=DEFAULT_MAX_BYTES, max_item_size=DEFAULT_MAX_ITEM_SIZE, policy=POLICY_LRU):
+    """
+    Создает общий кэш для функций memoized_*.
+
+    Returns:
+        HashCache: Новый общий кэш
+    """
+    global _default_hasher
+    with _default_lock:
+        _default_hasher = MemoizedHasher(HashCache(max_bytes, max_item_size, policy))
+        return _default_hasher.cache
+
+
+def _hasher():
+    global _default_hasher
+    if _default_hasher is None:
+        with _default_lock:
+            if _default_hasher is None:
+                _default_hasher = MemoizedHasher()
+    return _default_hasher
+
+
+def memoized_md5(data):
+    """md5 с общим кэшем (см. configure_cache)."""
+    return _hasher().md5(data)
+
+
+def memoized_md5_string(input_string):
+    """md5_string с общим кэшем (см. configure_cache)."""
+    return _hasher().md5_string(input_string)
+
+
+def memoized_hmac_md5_string(key, message):
+    """hmac_md5_string с общим кэшем (см. configure_cache)."""
+    return _hasher().hmac_md5_string(key, message)
+
+
+def cache_stats():
+    """Возвращает статистику общего кэша."""
+    return _hasher().cache.stats()
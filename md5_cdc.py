@@ -0,0 +1,179 @@
+from collections import namedtuple
+from md5_core import md5_digest
+from md5_walk import walk_files
+
+# Параметры разбиения по умолчанию
+CDC_MIN_SIZE = 2 * 1024
+CDC_AVG_SIZE = 8 * 1024
+CDC_MAX_SIZE = 64 * 1024
+
+_READ_SIZE = 1024 * 1024
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+# Таблица Gear: 256 псевдослучайных 64-битных чисел. Получается из MD5
+# номера байта, поэтому границы чанков одинаковы на всех машинах.
+GEAR = tuple(int.from_bytes(md5_digest(bytes([i]))[:8], 'little') for i in range(256))
+
+# Чанк файла: смещение, длина и MD5 хеш содержимого
+Chunk = namedtuple('Chunk', 'offset length md5')
+
+
+def _masks(avg_size):
+    """
+    Строит маски нормализованного разбиения FastCDC.
+
+    До среднего размера используется более строгая маска (на бит больше),
+    после - более слабая, что сужает разброс размеров чанков. Проверяются
+    старшие биты отпечатка, зависящие от большего числа последних байтов.
+    """
+    bits = max(1, avg_size.bit_length() - 1)
+    mask_s = ((1 << (bits + 1)) - 1) << (64 - bits - 1)
+    mask_l = ((1 << (bits - 1)) - 1) << (64 - bits + 1) if bits > 1 else 0
+    return mask_s, mask_l
+
+
+def find_cut_point(data, start, end, min_size, avg_size, max_size, mask_s, mask_l):
+    """
+    Находит длину очередного чанка скользящим хешем Gear (FastCDC).
+
+    Args:
+        data: Буфер с данными
+        start: Начало чанка в буфере
+        end: Конец доступных данных в буфере
+        min_size, avg_size, max_size: Ограничения размера чанка
+        mask_s, mask_l: Маски до и после среднего размера
+
+    Returns:
+        int: Длина чанка
+    """
+    n = end - start
+    if n <= min_size:
+        return n
+    if n > max_size:
+        n = max_size
+    normal = min(avg_size, n)
+
+    gear = GEAR
+    fp = 0
+    i = start + min_size
+    stop = start + normal
+    while i < stop:
+        fp = ((fp << 1) + gear[data[i]]) & _MASK64
+        if not fp & mask_s:
+            return i - start + 1
+        i += 1
+    stop = start + n
+    while i < stop:
+        fp = ((fp << 1) + gear[data[i]]) & _MASK64
+        if not fp & mask_l:
+            return i - start + 1
+        i += 1
+    return n
+
+
+def iter_chunks(stream, min_size=CDC_MIN_SIZE, avg_size=CDC_AVG_SIZE, max_size=CDC_MAX_SIZE):
+    """
+    Разбивает поток на чанки по содержимому и хеширует каждый чанк.
+
+    Границы чанков определяются содержимым, а не смещением, поэтому вставка
+    или удаление байтов меняет только соседние чанки, и одинаковые участки
+    похожих файлов дают одинаковые хеши.
+
+    Args:
+        stream: Бинарный поток
+        min_size: Минимальный размер чанка
+        avg_size: Ожидаемый средний размер чанка
+        max_size: Максимальный размер чанка
+
+    Yields:
+        Chunk: (offset, length, md5) для каждого чанка
+
+    Raises:
+        ValueError: Если не выполняется 0 < min_size <= avg_size <= max_size
+    """
+    if not 0 < min_size <= avg_size <= max_size:
+        raise ValueError("Размеры чанков должны удовлетворять 0 < min <= avg <= max")
+
+    mask_s, mask_l = _masks(avg_size)
+    buffer = bytearray()
+    start = 0
+    offset = 0
+    eof = False
+
+    while True:
+        # Дочитываем данные, пока в буфере нет максимального чанка
+        while not eof and len(buffer) - start < max_size:
+            if start:
+                del buffer[:start]
+                start = 0
+            block = stream.read(_READ_SIZE)
+            if not block:
+                eof = True
+            else:
+                buffer += block
+
+        end = len(buffer)
+        if start >= end:
+            return
+
+        length = find_cut_point(buffer, start, end, min_size, avg_size, max_size, mask_s, mask_l)
+        with memoryview(buffer) as view:
+            digest = md5_digest(view[start:start + length]).hex()
+        yield Chunk(offset, length, digest)
+        start += length
+        offset += length
+
+
+def chunk_file(filepath, min_size=CDC_MIN_SIZE, avg_size=CDC_AVG_SIZE, max_size=CDC_MAX_SIZE):
+    """
+    Разбивает файл на чанки по содержимому.
+
+    Args:
+        filepath: Путь к файлу
+        min_size, avg_size, max_size: Ограничения размера чанка
+
+    Returns:
+        list: Список Chunk (offset, length, md5)
+    """
+    with open(filepath, "rb", buffering=0) as f:
+        return list(iter_chunks(f, min_size, avg_size, max_size))
+
+
+def dedup_report(folder_path, min_size=CDC_MIN_SIZE, avg_size=CDC_AVG_SIZE, max_size=CDC_MAX_SIZE):
+    """
+    Оценивает возможность блочной дедупликации файлов папки.
+
+    Args:
+        folder_path: Путь к папке
+        min_size, avg_size, max_size: Ограничения размера чанка
+
+    Returns:
+        dict: Статистика дедупликации:
+            - 'files': Количество файлов
+            - 'chunks': Общее количество чанков
+            - 'unique_chunks': Количество уникальных чанков
+            - 'total_bytes': Общий объем данных
+            - 'unique_bytes': Объем уникальных чанков
+            - 'dedup_ratio': total_bytes / unique_bytes
+    """
+    all_files = walk_files(folder_path)
+
+    seen = {}
+    chunks = 0
+    total_bytes = 0
+    for entry in all_files:
+        with open(entry.path, "rb", buffering=0) as f:
+            for chunk in iter_chunks(f, min_size, avg_size, max_size):
+                chunks += 1
+                total_bytes += chunk.length
+                seen.setdefault(chunk.md5, chunk.length)
+
+    unique_bytes = sum(seen.values())
+    return {
+        "files": len(all_files),
+        "chunks": chunks,
+        "unique_chunks": len(seen),
+        "total_bytes": total_bytes,
+        "unique_bytes": unique_bytes,
+        "dedup_ratio": total_bytes / unique_bytes if unique_bytes else 1.0,
+    }
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from md5_io import PIPELINE_DEPTH, PIPELINE_BUFFER_SIZE, md5_stream_pipelined, md5_file_sequential
+from md5_scan import MANIFEST_NAME, scan_filter
+from md5_walk import walk_files
+
+# Результат копирования файла: verified = None (не проверялся) | True | False
+CopyResult = namedtuple('CopyResult', 'rel_path size md5 verified')
+
+
+class _TeeReader:
+    """
+    Источник для md5_stream_pipelined, который записывает каждый
+    прочитанный буфер в файл назначения до того, как буфер будет
+    передан на хеширование.
+    """
+
+    def __init__(self, source, destination):
+        self.source = source
+        self.destination = destination
+        self.bytes_copied = 0
+
+    def readinto(self, buffer):
+        n = self.source.readinto(buffer)
+        if n:
+            with memoryview(buffer)[:n] as chunk:
+                # Небуферизованная запись может записать только часть данных
+                written = 0
+                while written < n:
+                    written += self.destination.write(chunk[written:])
+            self.bytes_copied += n
+        return n
+
+
+def _drop_cache(path):
+    """
+    Удаляет страницы уже сброшенного на диск файла из кэша, чтобы
+    повторное чтение шло с носителя, а не из памяти. Там, где
+    posix_fadvise недоступен (Windows, macOS), ничего не делает.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def copy_and_hash(source_path, destination_path, verify=False,
+                  depth=PIPELINE_DEPTH, buffer_size=PIPELINE_BUFFER_SIZE):
+    """
+    Копирует файл, одновременно вычисляя его MD5 хеш.
+
+    Каждый буфер читается из источника один раз: поток чтения записывает
+    его в файл назначения, а основной поток хеширует тот же буфер.
+    Данные пишутся во временный файл с уникальным именем рядом с
+    назначением, который сбрасывается на диск и переименовывается после
+    успешного копирования; время изменения и права копируются с источника.
+
+    Args:
+        source_path: Путь к исходному файлу
+        destination_path: Путь к файлу назначения
+        verify: Перечитать копию и сравнить хеш. На Linux страницы копии
+            предварительно удаляются из кэша, и чтение идет с носителя;
+            на других системах копия может быть прочитана из кэша
+        depth: Количество буферов в кольце
+        buffer_size: Размер каждого буфера в байтах
+
+    Returns:
+        CopyResult: Путь назначения, размер, хеш и результат проверки
+
+    Raises:
+        OSError: При ошибке чтения или записи (временный файл удаляется)
+    """
+    directory, name = os.path.split(os.path.abspath(destination_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".part", dir=directory)
+    try:
+        with os.fdopen(fd, "wb", buffering=0) as destination, open(source_path, "rb", buffering=0) as source:
+            tee = _TeeReader(source, destination)
+            digest = md5_stream_pipelined(tee, depth, buffer_size)
+            # Сброс через дескриптор записи (на Windows fsync требует права записи)
+            os.fsync(destination.fileno())
+        shutil.copystat(source_path, tmp_path)
+        os.replace(tmp_path, destination_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    verified = None
+    if verify:
+        _drop_cache(destination_path)
+        verified = md5_file_sequential(destination_path) == digest
+    return CopyResult(destination_path, tee.bytes_copied, digest, verified)
+
+
+def copy_tree_and_hash(source_root, destination_root, verify=False, manifest_path=None,
+                       walk_filter=None, progress=None):
+    """
+    Копирует папку, хешируя файлы за тот же проход, и записывает манифест
+    в формате file_hashes.txt.
+
+    Args:
+        source_root: Исходная папка
+        destination_root: Папка назначения (создается при необходимости)
+        verify: Перечитывать каждую копию в обход кэша и сравнивать хеш
+        manifest_path: Путь к манифесту (по умолчанию file_hashes.txt в папке назначения)
+        walk_filter: WalkFilter для отбора файлов (манифест в корне исключается всегда)
+        progress: Функция progress(CopyResult, обработано, всего) или None
+
+    Returns:
+        list: CopyResult с относительными путями в порядке манифеста
+    """
+    if manifest_path is None:
+        manifest_path = os.path.join(destination_root, MANIFEST_NAME)
+    entries = walk_files(source_root, scan_filter(walk_filter))
+    os.makedirs(destination_root, exist_ok=True)
+    results = []
+    with open(manifest_path, "w", buffering=65536) as manifest:
+        manifest.write("Файл\tMD5 Хеш\n")
+        for processed, entry in enumerate(entries, 1):
+            destination_path = os.path.join(destination_root, entry.rel_path)
+            os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            result = copy_and_hash(entry.path, destination_path, verify)._replace(rel_path=entry.rel_path)
+            manifest.write(f"{entry.rel_path}: {result.md5}\n")
+            results.append(result)
+            if progress is not None:
+                progress(result, processed, len(entries))
+    return results
@@ -1,3 +1,4 @@
+import os
 import struct
 import math
 
@@ -63,6 +64,165 @@ shift_amounts = [
     6, 10, 15, 21, 6, 10, 15, 21
 ]
 
+# Размер блока чтения при потоковом хешировании
+READ_SIZE = 65536
+
+# Формат сериализованного состояния: сигнатура, версия, A, B, C, D,
+# длина данных в байтах, длина неполного блока и сам блок (64 байта)
+_STATE_MAGIC = b'MD5S'
+_STATE_VERSION = 1
+_STATE_FORMAT = struct.Struct('<4sB4IQB64s')
+
+def byte_view(data):
+    """
+    Возвращает байтовый memoryview для объекта с протоколом буфера.
+    
+    Для непрерывных буферов (bytes, bytearray, memoryview, mmap, array,
+    массивы NumPy) данные не копируются.
+    
+    Args:
+        data: Объект, поддерживающий протокол буфера
+        
+    Returns:
+        memoryview: Одномерное представление данных с форматом 'B'
+        
+    Raises:
+        TypeError: Если объект не поддерживает протокол буфера
+    """
+    try:
+        view = memoryview(data)
+    except TypeError:
+        raise TypeError("Данные должны поддерживать протокол буфера "
+                        "(bytes, bytearray, memoryview и т.п.)") from None
+    if not view.c_contiguous:
+        return memoryview(view.tobytes())
+    if view.format != 'B' or view.ndim != 1:
+        return view.cast('B')
+    return view
+
+class MD5State:
+    """
+    Промежуточное состояние потокового вычисления MD5.
+    
+    Хранит хеш-буфер, длину обработанных данных и неполный блок, поэтому
+    данные можно подавать частями произвольного размера, а состояние -
+    сохранять и восстанавливать между запусками.
+    """
+    
+    def __init__(self):
+        """Инициализирует состояние для пустого сообщения."""
+        self.a, self.b, self.c, self.d = md5_init()
+        self.total_length = 0
+        self.buffer = bytearray()
+    
+    def update(self, data):
+        """
+        Добавляет данные к хешируемому сообщению.
+        
+        Args:
+            data: Очередная порция данных (любой объект с протоколом буфера)
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = byte_view(data)
+        length = len(data)
+        self.total_length += length
+        a, b, c, d = self.a, self.b, self.c, self.d
+        offset = 0
+        
+        # Дополняем неполный блок, оставшийся от предыдущего вызова
+        if self.buffer:
+            offset = min(64 - len(self.buffer), length)
+            self.buffer += data[:offset]
+            if len(self.buffer) < 64:
+                return
+            a, b, c, d = process_chunk(a, b, c, d, struct.unpack('<16I', self.buffer))
+            self.buffer = bytearray()
+        
+        end = offset + (length - offset) // 64 * 64
+        for pos in range(offset, end, 64):
+            a, b, c, d = process_chunk(a, b, c, d, struct.unpack_from('<16I', data, pos))
+        
+        self.buffer += data[end:]
+        self.a, self.b, self.c, self.d = a, b, c, d
+    
+    def copy(self):
+        """
+        Создает независимую копию состояния.
+        
+        Returns:
+            MD5State: Копия текущего состояния
+        """
+        other = MD5State.__new__(MD5State)
+        other.a, other.b, other.c, other.d = self.a, self.b, self.c, self.d
+        other.total_length = self.total_length
+        other.buffer = bytearray(self.buffer)
+        return other
+    
+    def digest(self):
+        """
+        Возвращает MD5 хеш данных, добавленных к этому моменту.
+        Само состояние не изменяется.
+        
+        Returns:
+            bytes: 16-байтовый хеш
+        """
+        tail = bytearray(self.buffer)
+        tail.append(0x80)
+        tail.extend(b'\x00' * ((56 - len(tail)) % 64))
+        tail.extend(struct.pack('<Q', (self.total_length * 8) & 0xFFFFFFFFFFFFFFFF))
+        
+        a, b, c, d = self.a, self.b, self.c, self.d
+        for pos in range(0, len(tail), 64):
+            a, b, c, d = process_chunk(a, b, c, d, struct.unpack_from('<16I', tail, pos))
+        return struct.pack('<4I', a, b, c, d)
+    
+    def hexdigest(self):
+        """
+        Возвращает MD5 хеш в виде шестнадцатеричной строки.
+        
+        Returns:
+            str: MD5 хеш в виде шестнадцатеричной строки
+        """
+        return self.digest().hex()
+    
+    def export_state(self):
+        """
+        Сериализует состояние для сохранения на диск.
+        
+        Returns:
+            bytes: Состояние в бинарном формате фиксированной длины
+        """
+        return _STATE_FORMAT.pack(_STATE_MAGIC, _STATE_VERSION, self.a, self.b, self.c, self.d,
+                                  self.total_length, len(self.buffer), bytes(self.buffer))
+    
+    @classmethod
+    def import_state(cls, blob):
+        """
+        Восстанавливает состояние, сохраненное методом export_state.
+        
+        Args:
+            blob: Сериализованное состояние
+            
+        Returns:
+            MD5State: Восстановленное состояние
+            
+        Raises:
+            ValueError: Если формат состояния не распознан
+        """
+        if len(blob) != _STATE_FORMAT.size:
+            raise ValueError("Некорректная длина состояния MD5")
+        magic, version, a, b, c, d, total_length, buffer_length, buffer = _STATE_FORMAT.unpack(blob)
+        if magic != _STATE_MAGIC or version != _STATE_VERSION or buffer_length >= 64:
+            raise ValueError("Неизвестный формат состояния MD5")
+        if total_length % 64 != buffer_length:
+            raise ValueError("Длина неполного блока не соответствует длине данных")
+        
+        state = cls.__new__(cls)
+        state.a, state.b, state.c, state.d = a, b, c, d
+        state.total_length = total_length
+        state.buffer = bytearray(buffer[:buffer_length])
+        return state
+
 def md5_stream(stream):
     """
     Вычисляет MD5 хеш для входного потока данных.
@@ -73,40 +233,88 @@ def md5_stream(stream):
     Returns:
         str: MD5 хеш в виде шестнадцатеричной строки
     """
-    a, b, c, d = md5_init()
-    total_length = 0
-    
-    # Обрабатываем данные блоками по 64 байта
-    chunk = stream.read(64)
+    state = MD5State()
+    chunk = stream.read(READ_SIZE)
     while chunk:
-        total_length += len(chunk)
-        if len(chunk) < 64:
-            break
-        M = struct.unpack('<16I', chunk)
-        a, b, c, d = process_chunk(a, b, c, d, M)
-        chunk = stream.read(64)
-    
-    # Обрабатываем последний блок данных с учетом добавления бита 1 и длины данных
-    chunk = bytearray(chunk)
-    total_length_bits = total_length * 8
-    
-    # Дообавляем бит 1
-    chunk.append(0x80)
-    chunk.extend([0] * (56 - len(chunk) if len(chunk) <= 56 else (120 - len(chunk))))
-    chunk.extend(struct.pack('<Q', total_length_bits))
-    
-    # Обрабатываем последний блок
-    for i in range(0, len(chunk), 64):
-        block = chunk[i:i+64]
-        if len(block) < 64:  # Pad last block if needed
-            block.extend([0] * (64 - len(block)))
-        M = struct.unpack('<16I', block)
-        a, b, c, d = process_chunk(a, b, c, d, M)
-    
-    # Конвертируем результат в шестнадцатеричную строку
-    return '{:08x}{:08x}{:08x}{:08x}'.format(
-        *[struct.unpack('<I', struct.pack('>I', x))[0] for x in (a, b, c, d)]
-    )
+        state.update(chunk)
+        chunk = stream.read(READ_SIZE)
+    return state.hexdigest()
+
+class IncrementalHasher:
+    """
+    Повторное хеширование изменяющихся данных (например, текста в поле ввода).
+
+    Хранит промежуточные состояния на границах 64-байтовых блоков: через
+    каждые checkpoint_interval байт и на последнем полном блоке. При новом
+    вызове hash() вычисление продолжается с последнего состояния, префикс
+    которого не изменился, поэтому дописывание в конец не пересчитывает
+    начало данных.
+    """
+
+    def __init__(self, state=None, checkpoint_interval=READ_SIZE):
+        """
+        Args:
+            state: Начальное MD5State (например, внутреннее состояние HMAC) или None
+            checkpoint_interval: Шаг сохранения промежуточных состояний (кратен 64)
+        """
+        self.checkpoint_interval = max(64, checkpoint_interval // 64 * 64)
+        self.reset(state)
+
+    def reset(self, state=None):
+        """
+        Сбрасывает сохраненные состояния.
+
+        Args:
+            state: Новое начальное MD5State или None
+        """
+        self._data = b''
+        self._checkpoints = [(0, state.copy() if state is not None else MD5State())]
+
+    def _resume_point(self, data):
+        """Находит последнее сохраненное состояние с неизменившимся префиксом."""
+        previous = memoryview(self._data)
+        low, high = 0, len(self._checkpoints) - 1
+        # Совпадение префикса монотонно по смещению, поэтому ищем двоичным поиском
+        while low < high:
+            middle = (low + high + 1) // 2
+            offset = self._checkpoints[middle][0]
+            if offset <= len(data) and data.startswith(previous[:offset]):
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def hash(self, data, cancelled=None):
+        """
+        Вычисляет состояние MD5 после данных data.
+
+        Args:
+            data: Данные (bytes)
+            cancelled: Функция без аргументов; если она возвращает True,
+                вычисление прерывается между порциями
+
+        Returns:
+            MD5State: Состояние после всех данных или None, если вычисление прервано
+        """
+        index = self._resume_point(data)
+        del self._checkpoints[index + 1:]
+        offset, state = self._checkpoints[index]
+        state = state.copy()
+        # Все оставшиеся и новые состояния соответствуют префиксам data
+        self._data = data
+
+        view = memoryview(data)
+        last_block = len(data) // 64 * 64
+        while offset < last_block:
+            if cancelled is not None and cancelled():
+                return None
+            end = min(offset + self.checkpoint_interval, last_block)
+            state.update(view[offset:end])
+            offset = end
+            self._checkpoints.append((offset, state.copy()))
+
+        state.update(view[last_block:])
+        return state
 
 def process_chunk(a, b, c, d, M):
     """
@@ -148,19 +356,180 @@ def md5(data):
     """
     Вычисляет MD5 хеш для входных данных.
     
+    Данные хешируются напрямую через memoryview, без промежуточных копий.
+    
     Args:
-        data: Входные данные в виде bytes или bytearray
+        data: Входные данные: bytes, bytearray, memoryview, mmap, array
+            или другой объект с протоколом буфера
         
     Returns:
         str: MD5 хеш в виде шестнадцатеричной строки
         
     Raises:
-        TypeError: Если входные данные не bytes или bytearray
+        TypeError: Если входные данные не поддерживают протокол буфера
+    """
+    state = MD5State()
+    state.update(data if isinstance(data, (bytes, bytearray)) else byte_view(data))
+    return state.hexdigest()
+
+# Предкомпилированные форматы блока и результата
+_BLOCK = struct.Struct('<16I')
+_DIGEST = struct.Struct('<4I')
+
+def _md5_digest_from(a, b, c, d, offset, view):
+    """
+    Завершает вычисление MD5 с состояния (a, b, c, d) после offset байт
+    (offset кратен 64) для оставшихся данных view.
+    """
+    length = len(view)
+    unpack_from = _BLOCK.unpack_from
+    
+    end = length - length % 64
+    for pos in range(0, end, 64):
+        a, b, c, d = process_chunk(a, b, c, d, unpack_from(view, pos))
+    
+    tail = bytearray(view[end:])
+    tail.append(0x80)
+    tail.extend(bytes((55 - length) % 64))
+    tail.extend(struct.pack('<Q', ((offset + length) * 8) & 0xFFFFFFFFFFFFFFFF))
+    for pos in range(0, len(tail), 64):
+        a, b, c, d = process_chunk(a, b, c, d, unpack_from(tail, pos))
+    return _DIGEST.pack(a, b, c, d)
+
+def md5_digest(data):
+    """
+    Вычисляет MD5 хеш данных одним вызовом, без создания MD5State.
+    
+    Args:
+        data: Входные данные (объект с протоколом буфера)
+        
+    Returns:
+        bytes: 16-байтовый хеш
+    """
+    view = data if isinstance(data, (bytes, bytearray)) else byte_view(data)
+    return _md5_digest_from(0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0, view)
+
+class MD5Prefix:
+    """
+    Общий префикс, сжатый один раз, для хеширования множества
+    сообщений вида префикс + суффикс.
+    
+    Хранит состояние после последнего полного блока префикса и
+    оставшийся хвост (меньше 64 байт), поэтому стоимость хеша каждого
+    сообщения зависит только от длины суффикса.
+    """
+    
+    __slots__ = ('a', 'b', 'c', 'd', 'offset', 'tail')
+    
+    def __init__(self, prefix):
+        """
+        Args:
+            prefix: Префикс (str кодируется в UTF-8 или объект с протоколом буфера)
+        """
+        state = MD5State()
+        state.update(prefix.encode('utf-8') if isinstance(prefix, str) else prefix)
+        self.a, self.b, self.c, self.d = state.a, state.b, state.c, state.d
+        self.tail = bytes(state.buffer)
+        self.offset = state.total_length - len(self.tail)
+    
+    def __len__(self):
+        return self.offset + len(self.tail)
+    
+    def digest(self, suffix=b''):
+        """
+        Вычисляет MD5 хеш префикса с суффиксом.
+        
+        Args:
+            suffix: Суффикс (str кодируется в UTF-8 или объект с протоколом буфера)
+            
+        Returns:
+            bytes: 16-байтовый хеш
+        """
+        if isinstance(suffix, str):
+            suffix = suffix.encode('utf-8')
+        elif not isinstance(suffix, (bytes, bytearray)):
+            suffix = byte_view(suffix)
+        view = self.tail + suffix if self.tail else suffix
+        return _md5_digest_from(self.a, self.b, self.c, self.d, self.offset, view)
+    
+    def hexdigest(self, suffix=b''):
+        """
+        Вычисляет MD5 хеш префикса с суффиксом в виде шестнадцатеричной строки.
+        """
+        return self.digest(suffix).hex()
+    
+    def state(self):
+        """
+        Возвращает MD5State после префикса для потокового продолжения.
+        
+        Returns:
+            MD5State: Новое состояние
+        """
+        state = MD5State()
+        state.a, state.b, state.c, state.d = self.a, self.b, self.c, self.d
+        state.total_length = len(self)
+        state.buffer = bytearray(self.tail)
+        return state
+
+# Внешний векторизованный движок для больших пакетов (см. set_many_engine)
+_many_engine = None
+_many_engine_min_batch = 0
+
+def set_many_engine(engine, min_batch=1024):
+    """
+    Регистрирует движок, которому md5_many передает большие пакеты.
+    
+    Args:
+        engine: Функция, принимающая список bytes-подобных объектов и
+            возвращающая bytes из 16-байтовых хешей в том же порядке,
+            или None для отключения движка
+        min_batch: Минимальный размер пакета для передачи движку
+    """
+    global _many_engine, _many_engine_min_batch
+    _many_engine = engine
+    _many_engine_min_batch = min_batch
+
+def md5_many(items, hex=False, prefix=None):
+    """
+    Вычисляет MD5 хеши для набора строк или байтовых объектов.
+    
+    Строки кодируются в UTF-8. Для последовательностей не меньше
+    min_batch элементов вычисление передается движку, зарегистрированному
+    через set_many_engine (кроме вызовов с общим префиксом).
+    
+    Args:
+        items: Итерируемый объект из str или объектов с протоколом буфера
+        hex: Вернуть список шестнадцатеричных строк вместо упакованных хешей
+        prefix: Общий префикс всех элементов (MD5Prefix, str или байты) или None;
+            префикс сжимается один раз, элементы хешируются как его суффиксы
+        
+    Returns:
+        bytes: Хеши подряд, по 16 байт на элемент (или list[str] при hex=True)
+        
+    Raises:
+        ValueError: Если движок вернул результат неверной длины
     """
-    if isinstance(data, (bytes, bytearray)):
-        from io import BytesIO
-        return md5_stream(BytesIO(data))
-    raise TypeError("Данные должны быть типа bytes или bytearray")
+    engine = _many_engine
+    if prefix is not None:
+        if not isinstance(prefix, MD5Prefix):
+            prefix = MD5Prefix(prefix)
+        out = bytearray()
+        for item in items:
+            out += prefix.digest(item)
+    elif engine is not None and hasattr(items, '__len__') and len(items) >= _many_engine_min_batch:
+        batch = [item.encode('utf-8') if isinstance(item, str) else item for item in items]
+        out = engine(batch)
+        if len(out) != 16 * len(batch):
+            raise ValueError("Движок md5_many вернул результат неверной длины")
+    else:
+        out = bytearray()
+        for item in items:
+            out += md5_digest(item.encode('utf-8') if isinstance(item, str) else item)
+    
+    if hex:
+        hex_out = out.hex()
+        return [hex_out[i:i + 32] for i in range(0, len(hex_out), 32)]
+    return bytes(out)
 
 def md5_file(filepath):
     """
@@ -175,6 +544,119 @@ def md5_file(filepath):
     with open(filepath, "rb", buffering=65536) as f:
         return md5_stream(f)
 
+# Файлы не больше этого размера читаются одним вызовом os.read
+SMALL_FILE_THRESHOLD = 256 * 1024
+
+def md5_small_file(filepath, threshold=SMALL_FILE_THRESHOLD):
+    """
+    Вычисляет MD5 хеш небольшого файла без буферизованного открытия.
+    
+    Файл читается одним os.read по дескриптору и хешируется одним
+    вызовом md5_digest. Если файл оказался больше threshold, он
+    дочитывается и хешируется потоково.
+    
+    Args:
+        filepath: Путь к файлу
+        threshold: Максимальный размер, читаемый за один вызов
+        
+    Returns:
+        bytes: 16-байтовый хеш
+    """
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        # Для обычного файла неполное чтение означает конец файла
+        data = os.read(fd, threshold + 1)
+        if len(data) <= threshold:
+            return md5_digest(data)
+        state = MD5State()
+        state.update(data)
+        chunk = os.read(fd, READ_SIZE)
+        while chunk:
+            state.update(chunk)
+            chunk = os.read(fd, READ_SIZE)
+        return state.digest()
+    finally:
+        os.close(fd)
+
+# Формат контрольной точки: сигнатура, размер файла и время его изменения
+_CHECKPOINT_MAGIC = b'MD5C'
+_CHECKPOINT_HEADER = struct.Struct('<4sQq')
+
+def _load_checkpoint(checkpoint_path, file_stat):
+    """
+    Загружает состояние из контрольной точки, если она относится к тому же файлу.
+    
+    Returns:
+        MD5State: Сохраненное состояние или None
+    """
+    try:
+        with open(checkpoint_path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    
+    if len(blob) != _CHECKPOINT_HEADER.size + _STATE_FORMAT.size:
+        return None
+    magic, size, mtime_ns = _CHECKPOINT_HEADER.unpack_from(blob)
+    if magic != _CHECKPOINT_MAGIC or size != file_stat.st_size or mtime_ns != file_stat.st_mtime_ns:
+        return None
+    try:
+        state = MD5State.import_state(blob[_CHECKPOINT_HEADER.size:])
+    except ValueError:
+        return None
+    return state if state.total_length <= size else None
+
+def _save_checkpoint(checkpoint_path, file_stat, state):
+    """Атомарно записывает контрольную точку на диск."""
+    tmp_path = os.fspath(checkpoint_path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_CHECKPOINT_HEADER.pack(_CHECKPOINT_MAGIC, file_stat.st_size, file_stat.st_mtime_ns))
+        f.write(state.export_state())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+def md5_file_resumable(filepath, checkpoint_path=None, checkpoint_every=256 * 1024 * 1024):
+    """
+    Вычисляет MD5 хеш файла с периодическим сохранением прогресса.
+    
+    Каждые checkpoint_every байт состояние и смещение записываются в
+    контрольную точку. Повторный вызов после сбоя продолжает хеширование
+    с последней точки, если размер и время изменения файла не изменились.
+    После успешного завершения контрольная точка удаляется.
+    
+    Args:
+        filepath: Путь к файлу
+        checkpoint_path: Путь к контрольной точке (по умолчанию filepath + '.md5state')
+        checkpoint_every: Интервал сохранения в байтах
+        
+    Returns:
+        str: MD5 хеш файла в виде шестнадцатеричной строки
+    """
+    if checkpoint_path is None:
+        checkpoint_path = os.fspath(filepath) + ".md5state"
+    
+    with open(filepath, "rb", buffering=0) as f:
+        file_stat = os.fstat(f.fileno())
+        state = _load_checkpoint(checkpoint_path, file_stat) or MD5State()
+        f.seek(state.total_length)
+        
+        next_checkpoint = state.total_length + checkpoint_every
+        chunk = f.read(READ_SIZE)
+        while chunk:
+            state.update(chunk)
+            if state.total_length >= next_checkpoint:
+                _save_checkpoint(checkpoint_path, file_stat, state)
+                next_checkpoint = state.total_length + checkpoint_every
+            chunk = f.read(READ_SIZE)
+    
+    result = state.hexdigest()
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass
+    return result
+
 # Хеширование строки
 def md5_string(input_string):
     """
@@ -186,7 +668,7 @@ def md5_string(input_string):
     Returns:
         str: MD5 хеш строки в виде шестнадцатеричной строки
     """
-    return md5(bytearray(input_string, 'utf-8'))
+    return md5(input_string.encode('utf-8'))
 
 def integrity_check(file1_hash, file2_hash):
     """
@@ -221,37 +703,37 @@ def print_step(round_num, step_num, a, b, c, d, f, g, temp):
             f"f: {f:08x}  g: {g}\n"
             f"Temp result: {temp:08x}")
 
-def process_chunk_with_viz(a, b, c, d, M):
+def process_chunk_with_viz(a, b, c, d, M, recorder, chunk_num):
     """
-    Обрабатывает один 512-битный блок данных с визуализацией.
+    Обрабатывает один 512-битный блок данных с записью шагов в журнал.
     
     Args:
         a, b, c, d: Текущие значения хеш-буфера
         M: 16 32-битных слов обрабатываемого блока
+        recorder: TraceRecorder для записи промежуточных состояний
+        chunk_num: Номер обрабатываемого чанка (с 1)
         
     Returns:
-        tuple: Новые значения хеш-буфера и строка с визуализацией процесса
+        tuple: Новые значения хеш-буфера
     """
     AA, BB, CC, DD = a, b, c, d
-    output = []
+    wants_step = recorder.wants_step
+    record = recorder.record
     
     for i in range(64):
         if i < 16:
             f = F(BB, CC, DD)
             g = i
-            round_num = 1
         elif i < 32:
             f = G(BB, CC, DD)
             g = (5 * i + 1) % 16
-            round_num = 2
         elif i < 48:
             f = H(BB, CC, DD)
             g = (3 * i + 5) % 16
-            round_num = 3
         else:
             f = I(BB, CC, DD)
             g = (7 * i) % 16
-            round_num = 4
+        f &= 0xFFFFFFFF
         
         temp = DD
         DD = CC
@@ -260,29 +742,33 @@ def process_chunk_with_viz(a, b, c, d, M):
         BB = (BB + left_rotate(temp_calc, shift_amounts[i])) & 0xFFFFFFFF
         AA = temp
         
-        output.append(print_step(round_num, i % 16 + 1, AA, BB, CC, DD, f, g, temp_calc))
+        if wants_step(chunk_num, i):
+            record(chunk_num, i, AA, BB, CC, DD, f, g, temp_calc)
     
     return ((a + AA) & 0xFFFFFFFF, (b + BB) & 0xFFFFFFFF,
-            (c + CC) & 0xFFFFFFFF, (d + DD) & 0xFFFFFFFF), "\n".join(output)
+            (c + CC) & 0xFFFFFFFF, (d + DD) & 0xFFFFFFFF)
 
-def md5_with_viz(data):
+def md5_with_viz(data, recorder=None):
     """
     Вычисляет MD5 хеш с визуализацией процесса.
     
+    Шаги записываются в recorder (TraceRecorder из md5_trace) с учетом
+    его выборки. Без журнала чанки обрабатываются обычным process_chunk.
+    
     Args:
-        data: Входные данные в виде bytes или bytearray
+        data: Входные данные (объект с протоколом буфера)
+        recorder: TraceRecorder для записи шагов или None
         
     Returns:
         str: MD5 хеш в виде шестнадцатеричной строки
         
     Raises:
-        TypeError: Если входные данные не bytes или bytearray
+        TypeError: Если входные данные не поддерживают протокол буфера
     """
-    if isinstance(data, (bytes, bytearray)):
-        output = []
+    if not isinstance(data, str):
         a, b, c, d = md5_init()
         
-        data = bytearray(data)
+        data = bytearray(byte_view(data))
         orig_length = len(data)
         
         data.append(0x80)
@@ -292,18 +778,18 @@ def md5_with_viz(data):
         data.extend(struct.pack('<Q', orig_length * 8))
         
         for chunk_start in range(0, len(data), 64):
-            chunk = data[chunk_start:chunk_start + 64]
-            M = struct.unpack('<16I', chunk)
-            output.append(f"\nProcessing chunk {chunk_start//64 + 1}:")
-            result, viz_output = process_chunk_with_viz(a, b, c, d, M)
-            a, b, c, d = result
-            output.append(viz_output)
+            M = struct.unpack_from('<16I', data, chunk_start)
+            chunk_num = chunk_start // 64 + 1
+            if recorder is not None and recorder.wants_chunk(chunk_num):
+                a, b, c, d = process_chunk_with_viz(a, b, c, d, M, recorder, chunk_num)
+            else:
+                a, b, c, d = process_chunk(a, b, c, d, M)
         
         final_hash = '{:08x}{:08x}{:08x}{:08x}'.format(
             *[struct.unpack('<I', struct.pack('>I', x))[0] for x in (a, b, c, d)]
         )
         return final_hash
-    raise TypeError("Data must be bytes or bytearray")
+    raise TypeError("Data must support the buffer protocol")
 
 class MD5StepByStep:
     """
@@ -312,25 +798,27 @@ class MD5StepByStep:
     Позволяет выполнять и отслеживать процесс хеширования шаг за шагом.
     """
     
-    def __init__(self, data):
+    def __init__(self, data, recorder=None):
         """
         Инициализирует объект для пошагового вычисления MD5.
         
         Args:
-            data: Входные данные в виде bytes или bytearray
+            data: Входные данные (объект с протоколом буфера)
+            recorder: TraceRecorder для записи выполненных шагов или None
             
         Raises:
-            TypeError: Если входные данные не bytes или bytearray
+            TypeError: Если входные данные не поддерживают протокол буфера
         """
-        if not isinstance(data, (bytes, bytearray)):
-            raise TypeError("Data must be bytes or bytearray")
+        if isinstance(data, str):
+            raise TypeError("Data must support the buffer protocol")
         
-        self.data = bytearray(data)
+        self.data = bytearray(byte_view(data))
         self.orig_length = len(self.data)
         self.a, self.b, self.c, self.d = md5_init()
         self.current_chunk = 0
         self.current_step = 0
         self.chunks = []
+        self.recorder = recorder
         self.prepare_chunks()
         
     def prepare_chunks(self):
@@ -391,6 +879,7 @@ class MD5StepByStep:
             f = I(self.b, self.c, self.d)
             g = (7 * i) % 16
             round_num = 4
+        f &= 0xFFFFFFFF
 
         temp = self.d
         self.d = self.c
@@ -400,6 +889,9 @@ class MD5StepByStep:
         self.a = temp
 
         self.current_step += 1
+        if self.recorder is not None:
+            self.recorder.record(self.current_chunk + 1, i, self.a, self.b, self.c, self.d,
+                                 f, g, temp_calc)
         step_info = {
             'round': round_num,
             'step': i % 16 + 1,
@@ -416,6 +908,41 @@ class MD5StepByStep:
         
         return step_info, None
 
+    @property
+    def finished(self):
+        """bool: True если все чанки обработаны."""
+        return self.current_chunk >= len(self.chunks)
+
+    def run_steps(self, count):
+        """
+        Выполняет до count шагов подряд, включая завершение чанков.
+        
+        Args:
+            count: Максимальное количество шагов
+            
+        Returns:
+            int: Количество выполненных шагов раундов
+        """
+        done = 0
+        while done < count and not self.finished:
+            step_info, _ = self.next_step()
+            if step_info:
+                done += 1
+        return done
+
+    def run_to_chunk_end(self):
+        """
+        Выполняет оставшиеся шаги текущего чанка и завершает его.
+        
+        Returns:
+            int: Количество выполненных шагов раундов
+        """
+        if self.finished:
+            return 0
+        done = self.run_steps(64 - self.current_step)
+        self.next_step()
+        return done
+
     def get_final_hash(self):
         """
         Возвращает финальный MD5 хеш.
@@ -427,34 +954,53 @@ class MD5StepByStep:
             *[struct.unpack('<I', struct.pack('>I', x))[0] for x in (self.a, self.b, self.c, self.d)]
         )
 
-def hmac_md5(key: bytes, message: bytes) -> str:
+def hmac_md5_state(key) -> tuple:
     """
-    Вычисляет HMAC-MD5 для сообщения с заданным ключом.
+    Подготавливает внутреннее и внешнее состояния HMAC-MD5 для ключа.
     
     Args:
-        key: Ключ для HMAC
-        message: Сообщение для хеширования
+        key: Ключ для HMAC (объект с протоколом буфера)
         
     Returns:
-        str: HMAC-MD5 в виде шестнадцатеричной строки
+        tuple: (внутреннее MD5State после i_key_pad, внешнее MD5State после o_key_pad)
     """
     block_size = 64  # размер блока для MD5 в байтах
     
     # Если ключ длиннее размера блока, хешируем его
+    key = byte_view(key)
     if len(key) > block_size:
-        key = bytes.fromhex(md5(key))
+        state = MD5State()
+        state.update(key)
+        key = state.digest()
     
     # Если ключ короче размера блока, дополняем нулями
-    if len(key) < block_size:
-        key = key + b'\x00' * (block_size - len(key))
+    key = bytes(key).ljust(block_size, b'\x00')
     
     # Создаем внутренний и внешний ключи
-    o_key_pad = bytes(x ^ 0x5c for x in key)
-    i_key_pad = bytes(x ^ 0x36 for x in key)
+    inner = MD5State()
+    inner.update(bytes(x ^ 0x36 for x in key))
+    outer = MD5State()
+    outer.update(bytes(x ^ 0x5c for x in key))
+    return inner, outer
+
+def hmac_md5(key: bytes, message: bytes) -> str:
+    """
+    Вычисляет HMAC-MD5 для сообщения с заданным ключом.
+    
+    Ключ и сообщение могут быть любыми объектами с протоколом буфера;
+    сообщение хешируется без объединения с ключом в новый объект.
     
-    # Вычисляем HMAC
-    inner_hash = md5(i_key_pad + message)
-    return md5(o_key_pad + bytes.fromhex(inner_hash))
+    Args:
+        key: Ключ для HMAC
+        message: Сообщение для хеширования
+        
+    Returns:
+        str: HMAC-MD5 в виде шестнадцатеричной строки
+    """
+    inner, outer = hmac_md5_state(key)
+    inner.update(message)
+    outer.update(inner.digest())
+    return outer.hexdigest()
 
 def hmac_md5_file(key: bytes, filepath: str) -> str:
     """
@@ -467,8 +1013,14 @@ def hmac_md5_file(key: bytes, filepath: str) -> str:
     Returns:
         str: HMAC-MD5 в виде шестнадцатеричной строки
     """
-    with open(filepath, "rb") as f:
-        return hmac_md5(key, f.read())
+    inner, outer = hmac_md5_state(key)
+    with open(filepath, "rb", buffering=0) as f:
+        chunk = f.read(READ_SIZE)
+        while chunk:
+            inner.update(chunk)
+            chunk = f.read(READ_SIZE)
+    outer.update(inner.digest())
+    return outer.hexdigest()
 
 def hmac_md5_string(key: str, message: str) -> str:
     """
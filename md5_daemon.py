@@ -0,0 +1,402 @@
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from md5_core import MD5State, md5, md5_file, hmac_md5
+from md5_daemon_client import DEFAULT_SOCKET_PATH, ProtocolError, recv_frame, send_frame
+from md5_verify import VerifyResult, VerifyStats, iter_manifest_entries
+from md5_walk import walk_files
+from md5_scan import scan_filter
+
+# Максимум задач, одновременно переданных пулу, на один процесс
+PENDING_PER_WORKER = 4
+
+
+def _pool_context():
+    """
+    Контекст процессов пула. Процессы, порожденные fork после bind,
+    унаследовали бы слушающий сокет и после гибели демона продолжали бы
+    принимать соединения, поэтому по возможности используется forkserver.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None
+
+
+class FileHashCache:
+    """
+    Потокобезопасный LRU-кэш хешей файлов.
+
+    Запись действительна, пока у файла не изменились размер, время
+    изменения и номер inode (ключ - кортеж из них, см. stat_key).
+    """
+
+    def __init__(self, max_entries=1000000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, key):
+        """Возвращает сохраненный хеш или None."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, path, key, digest):
+        """Сохраняет хеш файла."""
+        with self._lock:
+            self._entries[path] = (key, digest)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def stat_key(st):
+    """Ключ актуальности записи кэша по результату os.stat."""
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def entry_key(entry):
+    """Ключ актуальности записи кэша по WalkEntry (без повторного stat)."""
+    return entry.size, entry.mtime_ns, entry.inode
+
+
+class MD5Daemon:
+    """
+    Обработчик запросов демона: держит пул процессов и кэш хешей файлов.
+    """
+
+    def __init__(self, workers=None, cache_entries=1000000):
+        """
+        Args:
+            workers: Количество процессов пула (по умолчанию os.cpu_count())
+            cache_entries: Максимальное число записей кэша хешей файлов
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+        self.cache = FileHashCache(cache_entries)
+        self._executor_lock = threading.Lock()
+
+    def close(self):
+        """Останавливает пул процессов."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _restart_pool(self, broken):
+        """Заменяет сломанный пул (процесс-обработчик аварийно завершился) новым."""
+        with self._executor_lock:
+            if self.executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+
+    def hash_file(self, path):
+        """Хеширует файл с использованием кэша."""
+        path = os.path.abspath(path)
+        key = stat_key(os.stat(path))
+        digest = self.cache.get(path, key)
+        if digest is None:
+            digest = self.executor.submit(md5_file, path).result()
+            self.cache.put(path, key, digest)
+        return digest
+
+    def handle(self, header, body):
+        """
+        Выполняет запрос. Хеширование выполняется в пуле процессов; если
+        пул сломан, он пересоздается, а запрос завершается ошибкой.
+
+        Args:
+            header: Заголовок запроса с полем 'op'
+            body: Двоичное тело запроса
+
+        Returns:
+            tuple: (результат запроса, двоичное тело ответа)
+
+        Raises:
+            BrokenProcessPool: Если процесс пула аварийно завершился
+        """
+        executor = self.executor
+        try:
+            return self._dispatch(header, body)
+        except BrokenProcessPool:
+            self._restart_pool(executor)
+            raise
+
+    def _dispatch(self, header, body):
+        op = header.get("op")
+        if op == "ping":
+            return {"pong": True}, b''
+        if op == "hash":
+            return {"md5": self.executor.submit(md5, body).result()}, b''
+        if op == "hash_file":
+            return {"md5": self.hash_file(header["path"])}, b''
+        if op == "hmac":
+            key_length = header["key_length"]
+            key, message = bytes(body[:key_length]), bytes(body[key_length:])
+            return {"hmac": self.executor.submit(hmac_md5, key, message).result()}, b''
+        if op == "manifest":
+            return self.manifest(header["path"])
+        if op == "verify":
+            return self.verify(header["manifest"], header.get("root"), header.get("fail_fast", False)), b''
+        if op == "stats":
+            return {"cache_entries": len(self.cache), "cache_hits": self.cache.hits,
+                    "cache_misses": self.cache.misses, "workers": self.workers}, b''
+        raise ValueError(f"Неизвестная операция: {op}")
+
+    def manifest(self, folder_path):
+        """
+        Строит манифест папки и хеш папки, используя кэш хешей файлов.
+
+        Манифест передается в теле ответа, а не в JSON-заголовке, поэтому
+        его размер ограничен только MAX_BODY_SIZE клиента. Для каждого файла в теле
+        записаны 32 символа хеша, относительный путь в UTF-8 и нулевой байт
+        (см. parse_manifest_body). Актуальность кэша проверяется по данным
+        обхода, без повторного stat; пулу одновременно передается не
+        больше PENDING_PER_WORKER задач на процесс.
+
+        Returns:
+            tuple: ({'files': число файлов, 'folder_hash': хеш папки как в
+                scan_folder}, тело с манифестом без манифеста в корне)
+        """
+        entries = walk_files(folder_path, scan_filter())
+        body = bytearray()
+        folder_state = MD5State()
+        max_pending = self.workers * PENDING_PER_WORKER
+        pending = deque()
+
+        def emit(entry, digest):
+            digest_bytes = digest.encode('ascii')
+            folder_state.update(digest_bytes)
+            body.extend(digest_bytes)
+            body.extend(entry.rel_path.encode('utf-8', 'surrogateescape'))
+            body.append(0)
+
+        try:
+            for entry in entries:
+                key = entry_key(entry)
+                digest = self.cache.get(entry.path, key)
+                future = self.executor.submit(md5_file, entry.path) if digest is None else None
+                pending.append((entry, key, digest, future))
+                while pending and (pending[0][3] is None or len(pending) >= max_pending):
+                    emit(*self._complete(pending.popleft()))
+            while pending:
+                emit(*self._complete(pending.popleft()))
+        finally:
+            for _, _, _, future in pending:
+                if future is not None:
+                    future.cancel()
+
+        return {"files": len(entries), "folder_hash": folder_state.hexdigest()}, bytes(body)
+
+    def _complete(self, item):
+        entry, key, digest, future = item
+        if future is not None:
+            digest = future.result()
+            self.cache.put(entry.path, key, digest)
+        return entry, digest
+
+    def verify(self, manifest_path, root=None, fail_fast=False):
+        """
+        Проверяет папку по манифесту. Хеши неизменившихся файлов берутся
+        из кэша, остальные вычисляются в пуле процессов (не больше
+        PENDING_PER_WORKER задач на процесс) и сохраняются в кэш.
+
+        Args:
+            manifest_path: Путь к эталонному манифесту
+            root: Корневая папка проверяемых файлов (по умолчанию папка манифеста)
+            fail_fast: Остановиться на первом несовпадении, отсутствующем файле или ошибке
+
+        Returns:
+            dict: 'problems' - несовпадающие, отсутствующие и ошибочные файлы
+                в порядке манифеста, 'stats' - итоговые счетчики
+        """
+        if root is None:
+            root = os.path.dirname(os.path.abspath(manifest_path))
+        stats = VerifyStats()
+        problems = []
+        max_pending = self.workers * PENDING_PER_WORKER
+        pending = deque()
+
+        def emit(result):
+            stats.add(result)
+            if result.status != 'ok':
+                problems.append(result._asdict())
+            return not (fail_fast and result.status != 'ok')
+
+        try:
+            for name, expected in iter_manifest_entries(manifest_path):
+                path = os.path.abspath(os.path.join(root, name))
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    pending.append((VerifyResult(name, 'missing', expected, None, 0, None), None))
+                except OSError as e:
+                    pending.append((VerifyResult(name, 'error', expected, None, 0, str(e)), None))
+                else:
+                    key = stat_key(st)
+                    digest = self.cache.get(path, key)
+                    result = VerifyResult(name, None, expected, digest, st.st_size, None)
+                    future = self.executor.submit(md5_file, path) if digest is None else None
+                    pending.append((result, (path, key, future) if future is not None else None))
+                while pending and (pending[0][1] is None or len(pending) >= max_pending):
+                    if not emit(self._verified(*pending.popleft())):
+                        return self._verify_response(problems, stats)
+            while pending:
+                if not emit(self._verified(*pending.popleft())):
+                    break
+        finally:
+            for _, job in pending:
+                if job is not None:
+                    job[2].cancel()
+        return self._verify_response(problems, stats)
+
+    def _verified(self, result, job):
+        """Дожидается хеша файла из пула и определяет результат проверки."""
+        if job is not None:
+            path, key, future = job
+            try:
+                digest = future.result()
+            except FileNotFoundError:
+                return result._replace(status='missing', size=0)
+            except OSError as e:
+                return result._replace(status='error', size=0, error=str(e))
+            self.cache.put(path, key, digest)
+            result = result._replace(actual=digest)
+        if result.status is not None:
+            return result
+        return result._replace(status='ok' if result.actual.lower() == result.expected.lower() else 'mismatch')
+
+    @staticmethod
+    def _verify_response(problems, stats):
+        return {
+            "problems": problems,
+            "stats": {"files": stats.files, "matched": stats.matched, "mismatched": stats.mismatched,
+                      "missing": stats.missing, "errors": stats.errors, "bytes": stats.bytes,
+                      "elapsed": stats.elapsed},
+        }
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Обслуживает одно соединение: запросы обрабатываются последовательно."""
+
+    def handle(self):
+        daemon = self.server.daemon
+        while True:
+            try:
+                frame = recv_frame(self.request)
+            except (ProtocolError, OSError):
+                return
+            if frame is None:
+                return
+            header, body = frame
+            response_body = b''
+            try:
+                result, response_body = daemon.handle(header, body)
+                response = {"ok": True, "result": result}
+            except (KeyError, TypeError) as e:
+                response = {"ok": False, "error": f"Некорректный запрос: {e}"}
+            except BrokenProcessPool:
+                response = {"ok": False, "error": "Процесс пула хеширования аварийно завершился"}
+            except (OSError, ValueError) as e:
+                response = {"ok": False, "error": str(e)}
+            try:
+                send_frame(self.request, response, response_body)
+            except OSError:
+                return
+
+
+def serve(socket_path=DEFAULT_SOCKET_PATH, workers=None, cache_entries=1000000):
+    """
+    Запускает демон хеширования на Unix-сокете (до прерывания).
+
+    Args:
+        socket_path: Путь к сокету
+        workers: Количество процессов пула
+        cache_entries: Максимальное число записей кэша хешей файлов
+    """
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise OSError("Unix-сокеты не поддерживаются на этой платформе")
+
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    if not os.path.isdir(socket_dir):
+        os.makedirs(socket_dir, mode=0o700)
+    _remove_stale_socket(socket_path)
+
+    # Сокет создается сразу с правами 0600: umask действует на bind
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    daemon = MD5Daemon(workers, cache_entries)
+    try:
+        with server:
+            server.daemon_threads = True
+            server.daemon = daemon
+            server.serve_forever()
+    finally:
+        daemon.close()
+        try:
+            os.remove(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path):
+    """
+    Удаляет сокет, оставшийся от завершившегося демона.
+
+    Raises:
+        OSError: Если по пути находится не сокет или демон уже работает
+    """
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise OSError(f"{socket_path} существует и не является сокетом")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.remove(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Демон уже работает на {socket_path}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Демон MD5 хеширования на Unix-сокете")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Путь к сокету")
+    parser.add_argument("--workers", type=int, default=None, help="Количество процессов")
+    parser.add_argument("--cache-entries", type=int, default=1000000, help="Размер кэша хешей файлов")
+    args = parser.parse_args()
+
+    # SIGTERM завершает демон так же, как Ctrl+C: с удалением сокета
+    def _terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        serve(args.socket, args.workers, args.cache_entries)
+    except KeyboardInterrupt:
+        sys.exit(0)
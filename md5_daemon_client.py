@@ -0,0 +1,284 @@
+import json
+import os
+import socket
+import struct
+
+# Путь к сокету по умолчанию: в XDG_RUNTIME_DIR (доступна только владельцу)
+# или в личной папке кэша пользователя, но не в общем /tmp
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "md5hasher"),
+    "md5hasher.sock"
+)
+
+# Кадр протокола: длины JSON-заголовка и двоичного тела (big-endian),
+# затем сам заголовок в UTF-8 и тело
+_FRAME = struct.Struct('>II')
+MAX_HEADER_SIZE = 16 * 1024 * 1024
+MAX_BODY_SIZE = 1024 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Ошибка формата кадра протокола демона."""
+
+
+def _recv_exact(sock, size):
+    """Читает ровно size байт из сокета или возвращает None при закрытии соединения."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            if received == 0:
+                return None
+            raise ProtocolError("Соединение закрыто посреди кадра")
+        received += n
+    return buffer
+
+
+def send_frame(sock, header, body=b''):
+    """
+    Отправляет кадр протокола.
+
+    Args:
+        sock: Сокет
+        header: Словарь, сериализуемый в JSON
+        body: Двоичное тело кадра
+    """
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_FRAME.pack(len(header_bytes), len(body)) + header_bytes)
+    if body:
+        sock.sendall(body)
+
+
+def recv_frame(sock):
+    """
+    Принимает кадр протокола.
+
+    Args:
+        sock: Сокет
+
+    Returns:
+        tuple: (заголовок, тело) или None, если соединение закрыто
+
+    Raises:
+        ProtocolError: При некорректном кадре
+    """
+    prefix = _recv_exact(sock, _FRAME.size)
+    if prefix is None:
+        return None
+    header_size, body_size = _FRAME.unpack(prefix)
+    if header_size > MAX_HEADER_SIZE or body_size > MAX_BODY_SIZE:
+        raise ProtocolError("Слишком большой кадр")
+    header_bytes = _recv_exact(sock, header_size) if header_size else b'{}'
+    body = _recv_exact(sock, body_size) if body_size else b''
+    if header_bytes is None or body is None:
+        raise ProtocolError("Соединение закрыто посреди кадра")
+    try:
+        header = json.loads(bytes(header_bytes).decode('utf-8'))
+    except ValueError as e:
+        raise ProtocolError(f"Некорректный заголовок кадра: {e}") from None
+    return header, body
+
+
+def parse_manifest_body(body):
+    """
+    Разбирает тело ответа на запрос манифеста.
+
+    Args:
+        body: Записи из 32 символов хеша, пути в UTF-8 и нулевого байта
+
+    Returns:
+        list: Пары [относительный путь, хеш] в порядке манифеста
+    """
+    files = []
+    view = memoryview(body)
+    start = 0
+    while start < len(body):
+        end = body.index(0, start)
+        files.append([bytes(view[start + 32:end]).decode('utf-8', 'surrogateescape'),
+                      bytes(view[start:start + 32]).decode('ascii')])
+        start = end + 1
+    return files
+
+
+class MD5DaemonClient:
+    """
+    Клиент демона хеширования. Держит одно постоянное соединение.
+
+    Модуль не импортирует реализацию хеширования, поэтому клиент
+    запускается быстро и подходит для скриптов и командной строки.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, timeout=None):
+        """
+        Args:
+            socket_path: Путь к сокету демона
+            timeout: Таймаут операций с сокетом в секундах или None
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def close(self):
+        """Закрывает соединение."""
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, header, body=b'', with_body=False):
+        """
+        Отправляет запрос и возвращает результат.
+
+        Args:
+            header: Заголовок запроса
+            body: Двоичное тело запроса
+            with_body: Вернуть также двоичное тело ответа
+
+        Returns:
+            Результат или кортеж (результат, тело ответа) при with_body
+
+        Raises:
+            ProtocolError: Если соединение закрыто
+            RuntimeError: Если демон вернул ошибку
+        """
+        send_frame(self.sock, header, body)
+        frame = recv_frame(self.sock)
+        if frame is None:
+            raise ProtocolError("Демон закрыл соединение")
+        response, response_body = frame
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Неизвестная ошибка демона"))
+        return (response["result"], response_body) if with_body else response["result"]
+
+    def ping(self):
+        return self.request({"op": "ping"})["pong"]
+
+    def stats(self):
+        """Возвращает счетчики кэша демона и число процессов."""
+        return self.request({"op": "stats"})
+
+    def md5(self, data):
+        """Хеширует данные (bytes-подобный объект или строку в UTF-8)."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return self.request({"op": "hash"}, data)["md5"]
+
+    def md5_file(self, path):
+        """Хеширует файл (результат кэшируется демоном)."""
+        return self.request({"op": "hash_file", "path": os.path.abspath(path)})["md5"]
+
+    def hmac_md5(self, key, message):
+        """Вычисляет HMAC-MD5 (строки кодируются в UTF-8)."""
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        return self.request({"op": "hmac", "key_length": len(key)}, bytes(key) + bytes(message))["hmac"]
+
+    def manifest(self, folder_path):
+        """
+        Возвращает манифест и хеш папки.
+
+        Returns:
+            dict: 'files' - список [путь, хеш] без манифеста в корне,
+                'folder_hash' - хеш папки как в scan_folder
+        """
+        result, body = self.request({"op": "manifest", "path": os.path.abspath(folder_path)}, with_body=True)
+        return {"files": parse_manifest_body(body), "folder_hash": result["folder_hash"]}
+
+    def verify(self, manifest_path, root=None, fail_fast=False):
+        """
+        Проверяет папку по манифесту (хеши неизменившихся файлов берутся
+        из кэша демона).
+
+        Returns:
+            dict: 'problems' - несовпадающие, отсутствующие и ошибочные файлы,
+                'stats' - итоговые счетчики
+        """
+        return self.request({
+            "op": "verify",
+            "manifest": os.path.abspath(manifest_path),
+            "root": os.path.abspath(root) if root else None,
+            "fail_fast": fail_fast,
+        })
+
+
+def main(argv=None):
+    """
+    Командная строка клиента.
+
+    Returns:
+        int: Код завершения (0 - успех, 1 - найдены проблемы при проверке,
+            2 - ошибка соединения или демона)
+    """
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Клиент демона MD5 хеширования")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Путь к сокету демона")
+    parser.add_argument("--timeout", type=float, default=None, help="Таймаут в секундах")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ping", help="Проверить, что демон работает")
+    commands.add_parser("stats", help="Показать счетчики кэша демона")
+    command = commands.add_parser("file", help="Хеши файлов")
+    command.add_argument("paths", nargs="+")
+    command = commands.add_parser("string", help="Хеш строки в UTF-8")
+    command.add_argument("text")
+    command = commands.add_parser("hmac", help="HMAC-MD5 строки")
+    command.add_argument("key")
+    command.add_argument("message")
+    command = commands.add_parser("manifest", help="Манифест и хеш папки")
+    command.add_argument("folder")
+    command = commands.add_parser("verify", help="Проверка папки по манифесту")
+    command.add_argument("manifest")
+    command.add_argument("--root", default=None, help="Корневая папка (по умолчанию папка манифеста)")
+    command.add_argument("--fail-fast", action="store_true", help="Остановиться на первой проблеме")
+    args = parser.parse_args(argv)
+
+    try:
+        with MD5DaemonClient(args.socket, args.timeout) as client:
+            if args.command == "ping":
+                print("pong" if client.ping() else "нет ответа")
+            elif args.command == "stats":
+                for name, value in client.stats().items():
+                    print(f"{name}: {value}")
+            elif args.command == "file":
+                for path in args.paths:
+                    print(f"{path}: {client.md5_file(path)}")
+            elif args.command == "string":
+                print(client.md5(args.text))
+            elif args.command == "hmac":
+                print(client.hmac_md5(args.key, args.message))
+            elif args.command == "manifest":
+                result = client.manifest(args.folder)
+                print("Файл\tMD5 Хеш")
+                for rel_path, digest in result["files"]:
+                    print(f"{rel_path}: {digest}")
+                print(f"Хеш папки: {result['folder_hash']}", file=sys.stderr)
+            elif args.command == "verify":
+                result = client.verify(args.manifest, args.root, args.fail_fast)
+                for problem in result["problems"]:
+                    print(f"{problem['status']}\t{problem['path']}" +
+                          (f"\t{problem['error']}" if problem['error'] else ""))
+                stats = result["stats"]
+                print(f"Файлов: {stats['files']}, совпало: {stats['matched']}, "
+                      f"не совпало: {stats['mismatched']}, отсутствует: {stats['missing']}, "
+                      f"ошибок: {stats['errors']}", file=sys.stderr)
+                return 1 if result["problems"] else 0
+    except (OSError, ProtocolError, RuntimeError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,6 +1,16 @@
 from PyQt6.QtWidgets import QFileDialog, QApplication, QMessageBox
 import os
-from md5_core import md5_string, md5_file, integrity_check, md5_with_viz, hmac_md5_string, hmac_md5_file
+import tarfile
+import time
+from md5_core import md5_string, integrity_check, hmac_md5_string, hmac_md5_file
+from md5_verify import verify_manifest, VerifyStats
+from md5_io import md5_file_sequential
+from md5_known import KnownHashIndex, build_known_index
+from md5_archive import hash_archive, write_archive_manifest, archive_folder_hash
+from md5_metrics import JobLog
+from md5_scan import MANIFEST_NAME, JOB_MANIFEST, JOB_FOLDER_HASH, scan_folder, default_journal_path
+from md5_copy import copy_tree_and_hash
+from md5_throttle import IOPRIO_CLASS_IDLE
 
 def validate_hash(hash_value: str) -> bool:
     """
@@ -119,10 +129,21 @@ def compare_hash_files(reference_file: str, current_file: str) -> dict:
             "missing": []
         }
 
-def update_hash_realtime(text, hash_output):
+def update_hash_realtime(text, hash_output, realtime_hasher=None):
     """
     Обновляет хеш в реальном времени при вводе текста.
+    
+    Если передан realtime_hasher (RealtimeHasher), хеш вычисляется в фоне
+    после паузы во вводе и выводится через show_realtime_hash.
     """
+    if realtime_hasher is not None:
+        if text:
+            realtime_hasher.schedule(text)
+        else:
+            realtime_hasher.cancel()
+            hash_output.clear()
+        return
+
     try:
         if text:
             hashed_text = md5_string(text)
@@ -137,6 +158,30 @@ def update_hash_realtime(text, hash_output):
         QMessageBox.critical(None, "Ошибка", f"Ошибка: {str(e)}")
         hash_output.clear()
 
+def show_realtime_hash(hash_text, hash_output):
+    """
+    Выводит хеш, вычисленный в фоне RealtimeHasher.
+    
+    Args:
+        hash_text: MD5 или HMAC-MD5 хеш
+        hash_output: Виджет для вывода хеша
+    """
+    if validate_hash(hash_text):
+        hash_output.setText(hash_text)
+    else:
+        hash_output.clear()
+
+def show_realtime_error(message, hash_output):
+    """
+    Сообщает об ошибке фонового вычисления хеша.
+    
+    Args:
+        message: Текст ошибки
+        hash_output: Виджет для вывода хеша
+    """
+    hash_output.clear()
+    QMessageBox.critical(None, "Ошибка", f"Ошибка: {message}")
+
 def check_hash_string(hash_output, reference_hash_input, result_output):
     """
     Проверяет совпадение двух строковых хешей.
@@ -157,13 +202,14 @@ def check_hash_string(hash_output, reference_hash_input, result_output):
     else:
         result_output.setText('Хеши не совпадают!')
 
-def on_file_button_click(parent_widget, hash_output_file):
+def on_file_button_click(parent_widget, hash_output_file, throttle=None):
     """
     Обрабатывает нажатие кнопки выбора файла для хеширования.
     
     Args:
         parent_widget: Родительский виджет
         hash_output_file: Виджет для отображения хеша файла
+        throttle: Throttle для ограничения скорости чтения или None
     """
     try:
         file_path, _ = QFileDialog.getOpenFileName(parent_widget, "Выберите файл для хеширования", "", "Все файлы (*)")
@@ -176,7 +222,7 @@ def on_file_button_click(parent_widget, hash_output_file):
                 show_error(parent_widget, "Файл пуст!")
                 return
 
-            hashed_text = md5_file(file_path)
+            hashed_text = md5_file_sequential(file_path, throttle=throttle)
             if validate_hash(hashed_text):
                 hash_output_file.setText(hashed_text)
             else:
@@ -212,86 +258,256 @@ def check_hash_file(hash_output_file, reference_hash_input_file, result_output_f
     else:
         result_output_file.setText('Хеши не совпадают!')
 
-def on_folder_button_click(parent_widget, files_list):
+def on_folder_button_click(parent_widget, files_model, files_status, known_index=None, folder_hash_output=None,
+                           throttle=None):
     """
     Обрабатывает нажатие кнопки выбора папки для хеширования файлов.
     
+    Манифест и хеш папки вычисляются за один проход (scan_folder);
+    прерванное задание продолжается по журналу с уже обработанными файлами.
+    
     Args:
         parent_widget: Родительский виджет
-        files_list: Виджет для отображения списка файлов и их хешей
+        files_model: FileTableModel для списка файлов и их хешей
+        files_status: Виджет для отображения состояния
+        known_index: KnownHashIndex для отметки файлов с известными хешами или None
+        folder_hash_output: Виджет вкладки хеша папки для вывода хеша или None
+        throttle: Throttle для ограничения фонового хеширования или None
     """
     folder_path = QFileDialog.getExistingDirectory(parent_widget, "Выберите папку для хеширования файлов")
     if not folder_path:
         return
 
-    files_list.clear()
-    output_file_path = os.path.join(folder_path, "file_hashes.txt")
+    files_model.clear()
+    output_file_path = os.path.join(folder_path, MANIFEST_NAME)
+    known_files = 0
+
+    def add_row(entry, hashed_text, error, summary):
+        nonlocal known_files
+        if error is not None:
+            files_model.append(entry.rel_path, entry.size, None, files_model.STATUS_ERROR)
+        else:
+            status = files_model.STATUS_NONE
+            if known_index is not None and hashed_text in known_index:
+                known_files += 1
+                status = files_model.STATUS_KNOWN
+            files_model.append(entry.rel_path, entry.size, hashed_text, status)
+        
+        # Строки добавляются в таблицу пакетами, не чаще раза в flush_interval
+        if files_model.flush():
+            processed = summary.files + len(summary.errors)
+            files_status.setText(f"Обработано {processed}/{summary.total} файлов...")
+            QApplication.processEvents()
+
+    try:
+        summary = scan_folder(folder_path, output_file_path, on_entry=add_row,
+                              journal_path=default_journal_path(folder_path, JOB_MANIFEST), throttle=throttle)
+    except OSError as e:
+        files_model.flush(force=True)
+        show_error(parent_widget, f"Ошибка при обработке папки: {str(e)}")
+        return
+    files_model.flush(force=True)
+
+    message = f"Хеши {summary.files} файлов сохранены в {output_file_path}"
+    if summary.folder_hash is not None:
+        message += f". Хеш папки: {summary.folder_hash}"
+        if folder_hash_output is not None:
+            folder_hash_output.setText(summary.folder_hash)
+    if known_index is not None:
+        message += f". Файлов с известными хешами: {known_files}"
+    if summary.reused:
+        message += f". Взято из прерванного задания: {summary.reused}"
+    if summary.errors:
+        message += f". Не удалось прочитать: {len(summary.errors)}"
+    files_status.setText(message)
+
+def on_archive_button_click(parent_widget, files_model, files_status):
+    """
+    Хеширует файлы архива без распаковки на диск.
     
-    # Сначала собираем все файлы в папке
-    all_files = []
-    for root, _, files in os.walk(folder_path):
-        for file in files:
-            if file != "file_hashes.txt":  # Пропускаем файл с хешами
-                all_files.append(os.path.join(root, file))
+    Манифест сохраняется рядом с архивом (<архив>.file_hashes.txt),
+    а хеш папки совпадает с хешем распакованного дерева.
     
-    total_files = len(all_files)
-    processed = 0
+    Args:
+        parent_widget: Родительский виджет
+        files_model: FileTableModel для списка файлов и их хешей
+        files_status: Виджет для отображения состояния
+    """
+    archive_path, _ = QFileDialog.getOpenFileName(
+        parent_widget, "Выберите архив для хеширования", "",
+        "Архивы (*.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz *.zip *.gz);;Все файлы (*)"
+    )
+    if not archive_path:
+        return
 
-    with open(output_file_path, "w", buffering=65536) as output_file:
-        output_file.write("Файл\tMD5 Хеш\n")
-        
-        for file_path in sorted(all_files):
-            rel_path = os.path.relpath(file_path, folder_path)
-            hashed_text = md5_file(file_path)
-            
-            output_line = f"{rel_path}: {hashed_text}"
-            files_list.addItem(output_line)
-            output_file.write(output_line + "\n")
-            
-            processed += 1
-            if processed % 10 == 0:  # Обновляем UI после обработки каждых 10 файлов
-                files_list.scrollToBottom()
-                QApplication.processEvents()
+    files_model.clear()
+    next_update = time.monotonic() + PROGRESS_INTERVAL
+
+    def show_progress(entry, processed):
+        nonlocal next_update
+        if time.monotonic() >= next_update:
+            files_status.setText(f"Обработано {processed} файлов архива...")
+            QApplication.processEvents()
+            next_update = time.monotonic() + PROGRESS_INTERVAL
 
-    files_list.addItem(f"\nХеши файлов сохранены в {output_file_path}")
+    try:
+        sorted_entries = hash_archive(archive_path, show_progress)
+    except (OSError, ValueError, EOFError, tarfile.TarError) as e:
+        show_error(parent_widget, f"Ошибка при обработке архива: {str(e)}")
+        return
+    for entry in sorted_entries:
+        files_model.append(entry.rel_path, entry.size, entry.md5)
+    files_model.flush(force=True)
+
+    output_file_path = archive_path + ".file_hashes.txt"
+    try:
+        write_archive_manifest(sorted_entries, output_file_path)
+    except OSError as e:
+        show_error(parent_widget, f"Ошибка при сохранении файла хешей: {str(e)}")
+        files_status.setText(f"Хеши {len(sorted_entries)} файлов не сохранены")
+        return
+    files_status.setText(
+        f"Хеши {len(sorted_entries)} файлов сохранены в {output_file_path}. "
+        f"Хеш папки: {archive_folder_hash(sorted_entries)}"
+    )
+
+def on_copy_button_click(parent_widget, files_model, files_status):
+    """
+    Копирует папку, хешируя файлы за тот же проход чтения.
+    
+    Манифест file_hashes.txt записывается в папку назначения. По желанию
+    пользователя каждая копия перечитывается в обход кэша и сверяется.
+    
+    Args:
+        parent_widget: Родительский виджет
+        files_model: FileTableModel для списка скопированных файлов
+        files_status: Виджет для отображения состояния
+    """
+    source_path = QFileDialog.getExistingDirectory(parent_widget, "Выберите папку для копирования")
+    if not source_path:
+        return
+    destination_path = QFileDialog.getExistingDirectory(parent_widget, "Выберите папку назначения")
+    if not destination_path:
+        return
+    if os.path.abspath(destination_path).startswith(os.path.join(os.path.abspath(source_path), "")):
+        show_error(parent_widget, "Папка назначения не может находиться внутри копируемой папки!")
+        return
+    verify = QMessageBox.question(
+        parent_widget, "Проверка копий", "Перечитать скопированные файлы и сверить хеши?"
+    ) == QMessageBox.StandardButton.Yes
+
+    files_model.clear()
+    failed = 0
+
+    def progress(result, processed, total):
+        nonlocal failed
+        status = files_model.STATUS_NONE
+        if result.verified is not None:
+            status = files_model.STATUS_OK if result.verified else files_model.STATUS_MISMATCH
+            failed += not result.verified
+        files_model.append(result.rel_path, result.size, result.md5, status)
+        if files_model.flush():
+            files_status.setText(f"Скопировано {processed}/{total} файлов...")
+            QApplication.processEvents()
+
+    try:
+        results = copy_tree_and_hash(source_path, destination_path, verify, progress=progress)
+    except OSError as e:
+        files_model.flush(force=True)
+        show_error(parent_widget, f"Ошибка при копировании: {str(e)}")
+        return
+    files_model.flush(force=True)
+
+    message = f"Скопировано {len(results)} файлов, манифест сохранен в папке назначения"
+    if verify:
+        message += f". Не совпало после копирования: {failed}"
+    files_status.setText(message)
+
+def load_known_index(parent_widget, files_status):
+    """
+    Открывает индекс известных хешей или строит его из текстового списка.
+    
+    Выбранный текстовый файл (манифест или список хешей) преобразуется
+    в индекс рядом с ним, с расширением .md5idx.
+    
+    Args:
+        parent_widget: Родительский виджет
+        files_status: Виджет для отображения сообщений
+        
+    Returns:
+        KnownHashIndex: Открытый индекс или None
+    """
+    file_path, _ = QFileDialog.getOpenFileName(
+        parent_widget, "Выберите базу известных хешей", "",
+        "Индекс хешей (*.md5idx);;Все файлы (*)"
+    )
+    if not file_path:
+        return None
 
-def select_reference_file(parent_widget, compare_results):
+    stats = None
+    try:
+        if not file_path.endswith(".md5idx"):
+            index_path = file_path + ".md5idx"
+            files_status.setText(f"Построение индекса {index_path}...")
+            QApplication.processEvents()
+            stats = build_known_index([file_path], index_path)
+            file_path = index_path
+        index = KnownHashIndex(file_path)
+    except (OSError, ValueError) as e:
+        show_error(parent_widget, f"Ошибка загрузки базы хешей: {str(e)}")
+        return None
+
+    message = f"База известных хешей загружена: {file_path} ({len(index)} хешей)"
+    if stats is not None and stats.skipped:
+        message += f". Пропущено строк без MD5: {stats.skipped}"
+    files_status.setText(message)
+    if stats is not None and not stats.count:
+        show_error(parent_widget, f"В файле не найдено ни одного MD5 хеша (пропущено строк: {stats.skipped})")
+    return index
+
+def select_reference_file(parent_widget, compare_status):
     """
     Открывает диалог выбора эталонного файла с хешами.
     
     Args:
         parent_widget: Родительский виджет
-        compare_results: Виджет для отображения результатов сравнения
+        compare_status: Виджет для отображения состояния сравнения
         
     Returns:
         str: Путь к выбранному эталонному файлу или None
     """
     file_path, _ = QFileDialog.getOpenFileName(parent_widget, "Выберите эталонный файл с хешами", "", "Все файлы (*)")
     if file_path:
-        compare_results.addItem(f"Эталонный файл выбран: {file_path}")
+        compare_status.setText(f"Эталонный файл выбран: {file_path}")
         return file_path
     return None
 
-def select_current_file(parent_widget, compare_results):
+def select_current_file(parent_widget, compare_status):
     """
     Открывает диалог выбора текущего файла с хешами.
     
     Args:
         parent_widget: Родительский виджет
-        compare_results: Виджет для отображения результатов сравнения
+        compare_status: Виджет для отображения состояния сравнения
         
     Returns:
         str: Путь к выбранному текущему файлу или None
     """
     file_path, _ = QFileDialog.getOpenFileName(parent_widget, "Выберите текущий файл с хешами", "", "Все файлы (*)")
     if file_path:
-        compare_results.addItem(f"Текущий файл выбран: {file_path}")
+        compare_status.setText(f"Текущий файл выбран: {file_path}")
         return file_path
     return None
 
-def compare_files(reference_file_path, current_file_path, compare_results):
+def compare_files(reference_file_path, current_file_path, compare_model, compare_status):
     """
     Сравнивает два файла с хешами и отображает результаты сравнения.
+    
+    Args:
+        reference_file_path: Путь к эталонному файлу с хешами
+        current_file_path: Путь к текущему файлу с хешами
+        compare_model: FileTableModel для результатов сравнения
+        compare_status: Виджет для отображения итогов
     """
     if not reference_file_path or not current_file_path:
         QMessageBox.warning(None, "Предупреждение", "Не выбраны оба файла для сравнения.")
@@ -299,29 +515,95 @@ def compare_files(reference_file_path, current_file_path, compare_results):
 
     result = compare_hash_files(reference_file_path, current_file_path)
 
-    compare_results.clear()
+    compare_model.clear()
     if "error" in result:
         QMessageBox.critical(None, "Ошибка", str(result["error"]))
         return
 
-    compare_results.addItem("Совпадающие файлы:")
-    compare_results.addItems(result["matched"] or ["Нет совпадений"])
-    compare_results.addItem("\nНесовпадающие файлы:")
-    compare_results.addItems(result["mismatched"] or ["Нет несовпадений"])
-    compare_results.addItem("\nОтсутствующие файлы:")
-    compare_results.addItems(result["missing"] or ["Нет отсутствующих файлов"])
+    for key, status in (("matched", compare_model.STATUS_OK),
+                        ("mismatched", compare_model.STATUS_MISMATCH),
+                        ("missing", compare_model.STATUS_MISSING)):
+        for file in result[key]:
+            compare_model.append(file, status=status)
+    compare_model.flush(force=True)
+
+    compare_status.setText(
+        f"Совпадающих файлов: {len(result['matched'])}, "
+        f"несовпадающих: {len(result['mismatched'])}, "
+        f"отсутствующих: {len(result['missing'])}"
+    )
+
+def verify_folder_against_manifest(parent_widget, reference_file_path, compare_model, compare_status,
+                                   fail_fast=False):
+    """
+    Проверяет файлы на диске по эталонному манифесту без предварительного
+    пересканирования папки. Результаты выводятся по мере обнаружения.
+    
+    Args:
+        parent_widget: Родительский виджет
+        reference_file_path: Путь к эталонному файлу с хешами
+        compare_model: FileTableModel для результатов проверки
+        compare_status: Виджет для отображения итогов
+        fail_fast: Остановиться на первом несовпадении
+    """
+    if not reference_file_path:
+        QMessageBox.warning(None, "Предупреждение", "Не выбран эталонный файл.")
+        return
+
+    folder_path = QFileDialog.getExistingDirectory(
+        parent_widget, "Выберите папку для проверки", os.path.dirname(reference_file_path)
+    )
+    if not folder_path:
+        return
+
+    compare_model.clear()
+    compare_status.setText(f"Проверка {folder_path} по {reference_file_path}...")
+    stats = VerifyStats()
+    statuses = {
+        "ok": compare_model.STATUS_OK,
+        "mismatch": compare_model.STATUS_MISMATCH,
+        "missing": compare_model.STATUS_MISSING,
+        "error": compare_model.STATUS_ERROR,
+    }
+
+    try:
+        for result in verify_manifest(reference_file_path, folder_path, fail_fast=fail_fast, stats=stats):
+            size = result.size if result.actual is not None else None
+            compare_model.append(result.path, size, result.actual, statuses[result.status])
+            # Строки, в том числе с ошибками, вставляются пакетами по времени
+            if compare_model.flush():
+                QApplication.processEvents()
+    except (OSError, UnicodeDecodeError) as e:
+        show_error(parent_widget, f"Ошибка при проверке: {str(e)}")
+        return
+    finally:
+        compare_model.flush(force=True)
+
+    compare_status.setText(
+        f"Проверено файлов: {stats.files}, совпадений: {stats.matched}, "
+        f"несовпадений: {stats.mismatched}, отсутствует: {stats.missing}, ошибок: {stats.errors}. "
+        f"Время: {stats.elapsed:.2f} с, {stats.files_per_sec:.1f} файлов/с, "
+        f"{stats.bytes_per_sec / (1024 * 1024):.2f} МиБ/с"
+    )
 
-def calculate_folder_hash(parent_widget, folder_hash_output):
+# Минимальный интервал между обновлениями прогресса хеширования папки (с)
+PROGRESS_INTERVAL = 0.1
+
+def calculate_folder_hash(parent_widget, folder_hash_output, write_job_log=False, throttle=None):
     """
     Вычисляет хеш для всех файлов в выбранной папке.
     
     Args:
         parent_widget: Родительский виджет
         folder_hash_output: Виджет для отображения хеша папки
+        write_job_log: Запросить путь к журналу задания (JSON lines) и рядом
+            с ним записать метрики Prometheus (.prom)
+        throttle: Throttle для ограничения фонового хеширования или None
         
     Raises:
         Exception: При ошибке обработки папки
     """
+    job_log = None
     try:
         folder_path = QFileDialog.getExistingDirectory(parent_widget, "Выберите папку для хеширования")
         if not folder_path:
@@ -331,30 +613,35 @@ def calculate_folder_hash(parent_widget, folder_hash_output):
             show_error(parent_widget, "Выбранная папка не существует!")
             return
 
-        # Собираем все файлы в папке и сортируем их
-        all_files = []
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                all_files.append(os.path.join(root, file))
-        
-        all_files.sort()
-        combined_hashes = []
-        
-        total_files = len(all_files)
-        processed = 0
+        if write_job_log:
+            log_path, _ = QFileDialog.getSaveFileName(
+                parent_widget, "Сохранить журнал задания", "folder_hash.jsonl", "JSON lines (*.jsonl)"
+            )
+            if not log_path:
+                return
+            job_log = JobLog(log_path, os.path.splitext(log_path)[0] + ".prom")
 
-        # Обрабатываеи файлы группами по 10 штук
-        for file_path in all_files:
-            file_hash = md5_file(file_path)
-            combined_hashes.append(file_hash)
-            
-            processed += 1
-            if processed % 10 == 0:
-                folder_hash_output.setText(f"Обработано {processed}/{total_files} файлов...")
+        next_update = time.monotonic() + PROGRESS_INTERVAL
+
+        def show_progress(entry, file_hash, error, summary):
+            nonlocal next_update
+            if time.monotonic() >= next_update:
+                processed = summary.files + len(summary.errors)
+                folder_hash_output.setText(f"Обработано {processed}/{summary.total} файлов...")
                 QApplication.processEvents()
-                
-        # Расчет финального хеша
-        final_hash = md5_string(''.join(combined_hashes))
+                next_update = time.monotonic() + PROGRESS_INTERVAL
+
+        # Небольшие файлы хешируются пакетами; на HDD - в порядке расположения на диске
+        # Прерванное задание продолжается по журналу с уже обработанными файлами
+        # Ограничения throttle можно менять, пока задание выполняется
+        summary = scan_folder(folder_path, job_log=job_log, on_entry=show_progress,
+                              journal_path=default_journal_path(folder_path, JOB_FOLDER_HASH),
+                              throttle=throttle)
+        if summary.errors:
+            rel_path, error = summary.errors[0]
+            raise OSError(f"{rel_path}: {error} (ошибок: {len(summary.errors)})")
+
+        final_hash = summary.folder_hash
         if validate_hash(final_hash):
             folder_hash_output.setText(final_hash)
         else:
@@ -362,6 +649,30 @@ def calculate_folder_hash(parent_widget, folder_hash_output):
     except Exception as e:
         show_error(parent_widget, f"Ошибка при обработке папки: {str(e)}")
         folder_hash_output.clear()
+    finally:
+        if job_log is not None:
+            job_log.close()
+
+# Прибавка к nice процессов-обработчиков в режиме низкого приоритета
+LOW_PRIORITY_NICE = 10
+
+def update_throttle(throttle, rate_mb, max_workers, low_priority):
+    """
+    Применяет настройки ограничения фонового хеширования.
+    
+    Скорость и число процессов действуют сразу, в том числе для
+    выполняющегося задания; приоритет - для следующих заданий.
+    
+    Args:
+        throttle: Throttle
+        rate_mb: Лимит скорости чтения в МБ/с (0 - без лимита)
+        max_workers: Максимум одновременно работающих процессов (0 - все)
+        low_priority: Понизить приоритет процессора и ввода-вывода обработчиков
+    """
+    throttle.set_rate(rate_mb * 1024 * 1024)
+    throttle.set_max_workers(max_workers)
+    throttle.nice = LOW_PRIORITY_NICE if low_priority else None
+    throttle.ioprio_class = IOPRIO_CLASS_IDLE if low_priority else None
 
 def check_folder_hash(current_hash, reference_hash, folder_result_output):
     """
@@ -405,7 +716,57 @@ def format_step_info(step_info):
             f"f: {step_info['f']:08x}  g: {step_info['g']}\n"
             f"Промежуточный результат: {step_info['temp']:08x}\n")
 
-def update_hmac_realtime(text, key, hmac_output):
+# Количество шагов визуализации между обновлениями таблицы
+VIZ_BATCH_STEPS = 4096
+
+def format_viz_status(stepper):
+    """
+    Форматирование состояния пошагового вычисления для строки статуса.
+    
+    Args:
+        stepper: Объект MD5StepByStep
+        
+    Returns:
+        str: Текст с номером чанка и шага или финальным хешем
+    """
+    if stepper.finished:
+        return f"Процесс завершен. Финальный хеш: {stepper.get_final_hash()}"
+    return (f"Чанк {stepper.current_chunk + 1}/{len(stepper.chunks)}, "
+            f"выполнено шагов: {stepper.current_step}/64")
+
+def run_visualization_steps(stepper, model, count, status_label, to_chunk_end=False):
+    """
+    Выполняет шаги визуализации и обновляет таблицу пакетами.
+    
+    Args:
+        stepper: Объект MD5StepByStep, записывающий шаги в журнал модели
+        model: StepTableModel, отображающая журнал
+        count: Количество шагов (игнорируется при to_chunk_end)
+        status_label: Виджет для отображения состояния
+        to_chunk_end: Выполнить шаги до конца текущего чанка
+        
+    Returns:
+        bool: True если вычисление завершено
+    """
+    if to_chunk_end:
+        stepper.run_to_chunk_end()
+    else:
+        remaining = count
+        while remaining > 0 and not stepper.finished:
+            remaining -= stepper.run_steps(min(remaining, VIZ_BATCH_STEPS))
+            if remaining > 0:
+                model.sync()
+                status_label.setText(format_viz_status(stepper))
+                QApplication.processEvents()
+        # Завершаем чанк, если его последний шаг уже выполнен
+        if stepper.current_step >= 64:
+            stepper.next_step()
+
+    model.sync()
+    status_label.setText(format_viz_status(stepper))
+    return stepper.finished
+
+def update_hmac_realtime(text, key, hmac_output, realtime_hasher=None):
     """
     Обновляет HMAC в реальном времени при вводе текста.
     
@@ -413,7 +774,16 @@ def update_hmac_realtime(text, key, hmac_output):
         text: Входной текст
         key: Ключ HMAC
         hmac_output: Виджет для вывода HMAC
+        realtime_hasher: RealtimeHasher для фонового вычисления или None
     """
+    if realtime_hasher is not None:
+        if text and key:
+            realtime_hasher.schedule(text, key)
+        else:
+            realtime_hasher.cancel()
+            hmac_output.clear()
+        return
+
     try:
         if text and key:
             hmac_text = hmac_md5_string(key, text)
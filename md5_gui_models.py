@@ -0,0 +1,316 @@
+import time
+from array import array
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from md5_trace import TRACE_FIELDS
+
+
+class StepTableModel(QAbstractTableModel):
+    """
+    Табличная модель над журналом шагов MD5 (TraceRecorder).
+
+    Модель не хранит копий данных: ячейки форматируются из колонок журнала
+    только для видимых строк, поэтому объем памяти представления не зависит
+    от числа выполненных шагов.
+    """
+
+    HEADERS = ("Чанк", "Раунд", "Шаг", "A", "B", "C", "D", "f", "g", "Промежуточный результат")
+    _HEX_FIELDS = frozenset(('A', 'B', 'C', 'D', 'f', 'temp'))
+
+    def __init__(self, recorder, parent=None):
+        """
+        Инициализирует модель.
+
+        Args:
+            recorder: TraceRecorder, в который записываются шаги
+            parent: Родительский объект Qt
+        """
+        super().__init__(parent)
+        self.recorder = recorder
+        self._rows = len(recorder)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        row = index.row()
+        column = index.column()
+        columns = self.recorder.columns
+        if column == 0:
+            return columns['chunk'][row]
+        if column == 1:
+            return columns['step'][row] // 16 + 1
+        if column == 2:
+            return columns['step'][row] % 16 + 1
+
+        field = TRACE_FIELDS[column - 1]
+        value = columns[field][row]
+        return f"{value:08x}" if field in self._HEX_FIELDS else value
+
+    def sync(self):
+        """
+        Добавляет в представление строки, записанные в журнал с момента
+        предыдущего вызова. Вызывается один раз на пакет шагов.
+
+        Returns:
+            int: Количество добавленных строк
+        """
+        total = len(self.recorder)
+        if total < self._rows:
+            self.reset()
+            return total
+        if total == self._rows:
+            return 0
+
+        added = total - self._rows
+        self.beginInsertRows(QModelIndex(), self._rows, total - 1)
+        self._rows = total
+        self.endInsertRows()
+        return added
+
+    def reset(self):
+        """Полностью перечитывает журнал (например, после его очистки)."""
+        self.beginResetModel()
+        self._rows = len(self.recorder)
+        self.endResetModel()
+
+
+class FileTableModel(QAbstractTableModel):
+    """
+    Табличная модель результатов хеширования и сравнения файлов.
+
+    Данные хранятся в компактных массивах (размеры - array('q'),
+    хеши - 16 байт на строку в bytearray, статусы - array('B')), а новые
+    строки копятся в очереди и добавляются в представление пакетами
+    не чаще одного раза за flush_interval секунд.
+    """
+
+    COL_PATH, COL_SIZE, COL_DIGEST, COL_STATUS = range(4)
+    HEADERS = ("Путь", "Размер", "MD5 Хеш", "Статус")
+
+    STATUS_NONE, STATUS_OK, STATUS_MISMATCH, STATUS_MISSING, STATUS_ERROR, STATUS_KNOWN = range(6)
+    STATUS_NAMES = ("", "Совпадает", "Не совпадает", "Отсутствует", "Ошибка", "Известный хеш")
+
+    def __init__(self, parent=None, flush_interval=0.05):
+        """
+        Инициализирует пустую модель.
+
+        Args:
+            parent: Родительский объект Qt
+            flush_interval: Минимальный интервал между пакетными вставками в секундах
+        """
+        super().__init__(parent)
+        self.flush_interval = flush_interval
+        self._paths = []
+        self._sizes = array('q')
+        self._digests = bytearray()
+        self._has_digest = array('B')
+        self._statuses = array('B')
+        self._rows = 0
+        self._last_flush = time.monotonic()
+
+    def clear(self):
+        """Удаляет все строки модели."""
+        self.beginResetModel()
+        self._paths = []
+        self._sizes = array('q')
+        self._digests = bytearray()
+        self._has_digest = array('B')
+        self._statuses = array('B')
+        self._rows = 0
+        self.endResetModel()
+
+    def append(self, path, size=None, digest=None, status=STATUS_NONE):
+        """
+        Добавляет строку в очередь на вставку.
+
+        Args:
+            path: Путь к файлу
+            size: Размер файла в байтах или None
+            digest: MD5 хеш (шестнадцатеричная строка или 16 байт) или None
+            status: Один из STATUS_*
+        """
+        self._paths.append(path)
+        self._sizes.append(-1 if size is None else size)
+        if digest is None:
+            self._digests += bytes(16)
+            self._has_digest.append(0)
+        else:
+            self._digests += bytes.fromhex(digest) if isinstance(digest, str) else digest
+            self._has_digest.append(1)
+        self._statuses.append(status)
+
+    def flush(self, force=False):
+        """
+        Добавляет накопленные строки в представление.
+
+        Args:
+            force: Вставить строки независимо от интервала
+
+        Returns:
+            bool: True если строки были добавлены
+        """
+        total = len(self._paths)
+        if total == self._rows:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return False
+
+        self.beginInsertRows(QModelIndex(), self._rows, total - 1)
+        self._rows = total
+        self.endInsertRows()
+        self._last_flush = now
+        return True
+
+    def path(self, row):
+        """Возвращает путь файла в строке row."""
+        return self._paths[row]
+
+    def size(self, row):
+        """Возвращает размер файла в строке row или None."""
+        size = self._sizes[row]
+        return None if size < 0 else size
+
+    def digest(self, row):
+        """Возвращает MD5 хеш строки row (шестнадцатеричная строка) или None."""
+        if not self._has_digest[row]:
+            return None
+        return self._digests[row * 16:row * 16 + 16].hex()
+
+    def status(self, row):
+        """Возвращает статус (STATUS_*) строки row."""
+        return self._statuses[row]
+
+    def status_counts(self):
+        """
+        Подсчитывает строки по статусам.
+
+        Returns:
+            dict: Количество строк для каждого STATUS_*
+        """
+        counts = dict.fromkeys(range(len(self.STATUS_NAMES)), 0)
+        for status in self._statuses:
+            counts[status] += 1
+        return counts
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return section + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole):
+            return None
+
+        row = index.row()
+        column = index.column()
+        if column == self.COL_PATH:
+            return self._paths[row]
+        if column == self.COL_SIZE:
+            size = self._sizes[row]
+            if role == Qt.ItemDataRole.UserRole:
+                return size
+            return "" if size < 0 else str(size)
+        if column == self.COL_DIGEST:
+            if not self._has_digest[row]:
+                return ""
+            return self._digests[row * 16:row * 16 + 16].hex()
+        if column == self.COL_STATUS:
+            status = self._statuses[row]
+            return status if role == Qt.ItemDataRole.UserRole else self.STATUS_NAMES[status]
+        return None
+
+
+class FileFilterProxyModel(QSortFilterProxyModel):
+    """
+    Сортировка и фильтрация FileTableModel.
+
+    Сортировка выполняется по исходным значениям (размер - как число).
+    Строка проходит фильтр, если выполнены все заданные условия: подстрока
+    в пути или статусе (без учета регистра), подстрока или префикс хеша и
+    диапазон размера.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.ItemDataRole.UserRole)
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self._filter_text = ""
+        self._digest_filter = ""
+        self._min_size = None
+        self._max_size = None
+
+    def set_filter_text(self, text):
+        """
+        Устанавливает строку фильтра.
+
+        Args:
+            text: Подстрока пути или названия статуса
+        """
+        self._filter_text = text.lower()
+        self.invalidateFilter()
+
+    def set_digest_filter(self, text):
+        """
+        Устанавливает фильтр по хешу.
+
+        Args:
+            text: Префикс или подстрока шестнадцатеричного хеша
+        """
+        self._digest_filter = text.strip().lower()
+        self.invalidateFilter()
+
+    def set_size_range(self, min_size=None, max_size=None):
+        """
+        Устанавливает диапазон размера файлов.
+
+        Args:
+            min_size: Минимальный размер в байтах или None
+            max_size: Максимальный размер в байтах или None
+        """
+        self._min_size = min_size
+        self._max_size = max_size
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+        if self._filter_text:
+            if (self._filter_text not in model.path(source_row).lower()
+                    and self._filter_text not in model.STATUS_NAMES[model.status(source_row)].lower()):
+                return False
+        if self._digest_filter:
+            digest = model.digest(source_row)
+            if digest is None or self._digest_filter not in digest:
+                return False
+        if self._min_size is not None or self._max_size is not None:
+            size = model.size(source_row)
+            if size is None:
+                return False
+            if self._min_size is not None and size < self._min_size:
+                return False
+            if self._max_size is not None and size > self._max_size:
+                return False
+        return True
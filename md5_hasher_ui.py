@@ -93,9 +93,45 @@ class Ui_MD5HasherApp(object):
         self.folder_button = QtWidgets.QPushButton(parent=self.tab3)
         self.folder_button.setObjectName("folder_button")
         self.tab3_layout.addWidget(self.folder_button)
-        self.files_list = QtWidgets.QListWidget(parent=self.tab3)
-        self.files_list.setObjectName("files_list")
-        self.tab3_layout.addWidget(self.files_list)
+        self.known_index_button = QtWidgets.QPushButton(parent=self.tab3)
+        self.known_index_button.setObjectName("known_index_button")
+        self.tab3_layout.addWidget(self.known_index_button)
+        self.archive_button = QtWidgets.QPushButton(parent=self.tab3)
+        self.archive_button.setObjectName("archive_button")
+        self.tab3_layout.addWidget(self.archive_button)
+        self.copy_button = QtWidgets.QPushButton(parent=self.tab3)
+        self.copy_button.setObjectName("copy_button")
+        self.tab3_layout.addWidget(self.copy_button)
+        self.files_filter_layout = QtWidgets.QHBoxLayout()
+        self.files_filter_layout.setObjectName("files_filter_layout")
+        self.files_filter = QtWidgets.QLineEdit(parent=self.tab3)
+        self.files_filter.setObjectName("files_filter")
+        self.files_filter_layout.addWidget(self.files_filter)
+        self.files_digest_filter = QtWidgets.QLineEdit(parent=self.tab3)
+        self.files_digest_filter.setObjectName("files_digest_filter")
+        self.files_filter_layout.addWidget(self.files_digest_filter)
+        self.files_min_size_spin = QtWidgets.QSpinBox(parent=self.tab3)
+        self.files_min_size_spin.setMinimum(0)
+        self.files_min_size_spin.setMaximum(2147483647)
+        self.files_min_size_spin.setObjectName("files_min_size_spin")
+        self.files_filter_layout.addWidget(self.files_min_size_spin)
+        self.files_max_size_spin = QtWidgets.QSpinBox(parent=self.tab3)
+        self.files_max_size_spin.setMinimum(0)
+        self.files_max_size_spin.setMaximum(2147483647)
+        self.files_max_size_spin.setObjectName("files_max_size_spin")
+        self.files_filter_layout.addWidget(self.files_max_size_spin)
+        self.tab3_layout.addLayout(self.files_filter_layout)
+        self.files_table = QtWidgets.QTableView(parent=self.tab3)
+        self.files_table.setObjectName("files_table")
+        self.files_table.setSortingEnabled(True)
+        self.files_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.files_table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.files_table.horizontalHeader().setStretchLastSection(True)
+        self.tab3_layout.addWidget(self.files_table)
+        self.files_status = QtWidgets.QLabel(parent=self.tab3)
+        self.files_status.setText("")
+        self.files_status.setObjectName("files_status")
+        self.tab3_layout.addWidget(self.files_status)
         self.select_ref_button = QtWidgets.QPushButton(parent=self.tab3)
         self.select_ref_button.setObjectName("select_ref_button")
         self.tab3_layout.addWidget(self.select_ref_button)
@@ -105,9 +141,45 @@ class Ui_MD5HasherApp(object):
         self.compare_button = QtWidgets.QPushButton(parent=self.tab3)
         self.compare_button.setObjectName("compare_button")
         self.tab3_layout.addWidget(self.compare_button)
-        self.compare_results = QtWidgets.QListWidget(parent=self.tab3)
-        self.compare_results.setObjectName("compare_results")
-        self.tab3_layout.addWidget(self.compare_results)
+        self.verify_layout = QtWidgets.QHBoxLayout()
+        self.verify_layout.setObjectName("verify_layout")
+        self.verify_button = QtWidgets.QPushButton(parent=self.tab3)
+        self.verify_button.setObjectName("verify_button")
+        self.verify_layout.addWidget(self.verify_button)
+        self.verify_fail_fast_check = QtWidgets.QCheckBox(parent=self.tab3)
+        self.verify_fail_fast_check.setObjectName("verify_fail_fast_check")
+        self.verify_layout.addWidget(self.verify_fail_fast_check)
+        self.tab3_layout.addLayout(self.verify_layout)
+        self.compare_filter_layout = QtWidgets.QHBoxLayout()
+        self.compare_filter_layout.setObjectName("compare_filter_layout")
+        self.compare_filter = QtWidgets.QLineEdit(parent=self.tab3)
+        self.compare_filter.setObjectName("compare_filter")
+        self.compare_filter_layout.addWidget(self.compare_filter)
+        self.compare_digest_filter = QtWidgets.QLineEdit(parent=self.tab3)
+        self.compare_digest_filter.setObjectName("compare_digest_filter")
+        self.compare_filter_layout.addWidget(self.compare_digest_filter)
+        self.compare_min_size_spin = QtWidgets.QSpinBox(parent=self.tab3)
+        self.compare_min_size_spin.setMinimum(0)
+        self.compare_min_size_spin.setMaximum(2147483647)
+        self.compare_min_size_spin.setObjectName("compare_min_size_spin")
+        self.compare_filter_layout.addWidget(self.compare_min_size_spin)
+        self.compare_max_size_spin = QtWidgets.QSpinBox(parent=self.tab3)
+        self.compare_max_size_spin.setMinimum(0)
+        self.compare_max_size_spin.setMaximum(2147483647)
+        self.compare_max_size_spin.setObjectName("compare_max_size_spin")
+        self.compare_filter_layout.addWidget(self.compare_max_size_spin)
+        self.tab3_layout.addLayout(self.compare_filter_layout)
+        self.compare_table = QtWidgets.QTableView(parent=self.tab3)
+        self.compare_table.setObjectName("compare_table")
+        self.compare_table.setSortingEnabled(True)
+        self.compare_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.compare_table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.compare_table.horizontalHeader().setStretchLastSection(True)
+        self.tab3_layout.addWidget(self.compare_table)
+        self.compare_status = QtWidgets.QLabel(parent=self.tab3)
+        self.compare_status.setText("")
+        self.compare_status.setObjectName("compare_status")
+        self.tab3_layout.addWidget(self.compare_status)
         self.tabs.addTab(self.tab3, "")
         self.tab4 = QtWidgets.QWidget()
         self.tab4.setObjectName("tab4")
@@ -118,6 +190,33 @@ class Ui_MD5HasherApp(object):
         self.folder_hash_button = QtWidgets.QPushButton(parent=self.tab4)
         self.folder_hash_button.setObjectName("folder_hash_button")
         self.tab4_layout.addWidget(self.folder_hash_button)
+        self.folder_job_log_check = QtWidgets.QCheckBox(parent=self.tab4)
+        self.folder_job_log_check.setObjectName("folder_job_log_check")
+        self.tab4_layout.addWidget(self.folder_job_log_check)
+        self.throttle_layout = QtWidgets.QHBoxLayout()
+        self.throttle_layout.setObjectName("throttle_layout")
+        self.throttle_rate_label = QtWidgets.QLabel(parent=self.tab4)
+        self.throttle_rate_label.setObjectName("throttle_rate_label")
+        self.throttle_layout.addWidget(self.throttle_rate_label)
+        self.throttle_rate_spin = QtWidgets.QSpinBox(parent=self.tab4)
+        self.throttle_rate_spin.setMinimum(0)
+        self.throttle_rate_spin.setMaximum(100000)
+        self.throttle_rate_spin.setValue(0)
+        self.throttle_rate_spin.setObjectName("throttle_rate_spin")
+        self.throttle_layout.addWidget(self.throttle_rate_spin)
+        self.throttle_workers_label = QtWidgets.QLabel(parent=self.tab4)
+        self.throttle_workers_label.setObjectName("throttle_workers_label")
+        self.throttle_layout.addWidget(self.throttle_workers_label)
+        self.throttle_workers_spin = QtWidgets.QSpinBox(parent=self.tab4)
+        self.throttle_workers_spin.setMinimum(0)
+        self.throttle_workers_spin.setMaximum(256)
+        self.throttle_workers_spin.setValue(0)
+        self.throttle_workers_spin.setObjectName("throttle_workers_spin")
+        self.throttle_layout.addWidget(self.throttle_workers_spin)
+        self.throttle_priority_check = QtWidgets.QCheckBox(parent=self.tab4)
+        self.throttle_priority_check.setObjectName("throttle_priority_check")
+        self.throttle_layout.addWidget(self.throttle_priority_check)
+        self.tab4_layout.addLayout(self.throttle_layout)
         self.folder_hash_output = QtWidgets.QLineEdit(parent=self.tab4)
         self.folder_hash_output.setReadOnly(True)
         self.folder_hash_output.setObjectName("folder_hash_output")
@@ -162,12 +261,37 @@ class Ui_MD5HasherApp(object):
         self.viz_next_button.setEnabled(False)
         self.viz_buttons_layout.addWidget(self.viz_next_button)
 
+        self.viz_steps_spin = QtWidgets.QSpinBox(parent=self.tab5)
+        self.viz_steps_spin.setMinimum(1)
+        self.viz_steps_spin.setMaximum(1000000)
+        self.viz_steps_spin.setValue(16)
+        self.viz_steps_spin.setObjectName("viz_steps_spin")
+        self.viz_buttons_layout.addWidget(self.viz_steps_spin)
+
+        self.viz_run_n_button = QtWidgets.QPushButton(parent=self.tab5)
+        self.viz_run_n_button.setObjectName("viz_run_n_button")
+        self.viz_run_n_button.setEnabled(False)
+        self.viz_buttons_layout.addWidget(self.viz_run_n_button)
+
+        self.viz_run_chunk_button = QtWidgets.QPushButton(parent=self.tab5)
+        self.viz_run_chunk_button.setObjectName("viz_run_chunk_button")
+        self.viz_run_chunk_button.setEnabled(False)
+        self.viz_buttons_layout.addWidget(self.viz_run_chunk_button)
+
         self.tab5_layout.addLayout(self.viz_buttons_layout)
 
-        self.viz_output = QtWidgets.QTextEdit(parent=self.tab5)
-        self.viz_output.setReadOnly(True)
-        self.viz_output.setObjectName("viz_output")
-        self.tab5_layout.addWidget(self.viz_output)
+        self.viz_status = QtWidgets.QLabel(parent=self.tab5)
+        self.viz_status.setText("")
+        self.viz_status.setObjectName("viz_status")
+        self.tab5_layout.addWidget(self.viz_status)
+
+        # Таблица шагов (строки рисуются только для видимой области)
+        self.viz_table = QtWidgets.QTableView(parent=self.tab5)
+        self.viz_table.setObjectName("viz_table")
+        self.viz_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.viz_table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.viz_table.horizontalHeader().setStretchLastSection(True)
+        self.tab5_layout.addWidget(self.viz_table)
 
         self.tabs.addTab(self.tab5, "")
 
@@ -238,16 +362,43 @@ class Ui_MD5HasherApp(object):
         self.check_button_file.setText(_translate("MD5HasherApp", "Проверить хеш"))
         self.tabs.setTabText(self.tabs.indexOf(self.tab2), _translate("MD5HasherApp", "Хеширование файла"))
         self.folder_button.setText(_translate("MD5HasherApp", "Выбрать папку"))
+        self.known_index_button.setText(_translate("MD5HasherApp", "Загрузить базу известных хешей"))
+        self.archive_button.setText(_translate("MD5HasherApp", "Хешировать архив"))
+        self.copy_button.setText(_translate("MD5HasherApp", "Копировать папку с хешированием"))
+        self.files_filter.setPlaceholderText(_translate("MD5HasherApp", "Фильтр по пути или статусу"))
+        self.compare_filter.setPlaceholderText(_translate("MD5HasherApp", "Фильтр по пути или статусу"))
+        self.files_digest_filter.setPlaceholderText(_translate("MD5HasherApp", "Хеш или его начало"))
+        self.files_min_size_spin.setPrefix(_translate("MD5HasherApp", "от "))
+        self.files_min_size_spin.setSuffix(_translate("MD5HasherApp", " КБ"))
+        self.files_min_size_spin.setSpecialValueText(_translate("MD5HasherApp", "Размер от, КБ"))
+        self.files_max_size_spin.setPrefix(_translate("MD5HasherApp", "до "))
+        self.files_max_size_spin.setSuffix(_translate("MD5HasherApp", " КБ"))
+        self.files_max_size_spin.setSpecialValueText(_translate("MD5HasherApp", "Размер до, КБ"))
+        self.compare_digest_filter.setPlaceholderText(_translate("MD5HasherApp", "Хеш или его начало"))
+        self.compare_min_size_spin.setPrefix(_translate("MD5HasherApp", "от "))
+        self.compare_min_size_spin.setSuffix(_translate("MD5HasherApp", " КБ"))
+        self.compare_min_size_spin.setSpecialValueText(_translate("MD5HasherApp", "Размер от, КБ"))
+        self.compare_max_size_spin.setPrefix(_translate("MD5HasherApp", "до "))
+        self.compare_max_size_spin.setSuffix(_translate("MD5HasherApp", " КБ"))
+        self.compare_max_size_spin.setSpecialValueText(_translate("MD5HasherApp", "Размер до, КБ"))
         self.select_ref_button.setText(_translate("MD5HasherApp", "Выбрать эталонный файл"))
         self.select_curr_button.setText(_translate("MD5HasherApp", "Выбрать текущий файл"))
         self.compare_button.setText(_translate("MD5HasherApp", "Сравнить файлы"))
+        self.verify_button.setText(_translate("MD5HasherApp", "Проверить папку по эталону"))
+        self.verify_fail_fast_check.setText(_translate("MD5HasherApp", "Остановиться на первом несовпадении"))
         self.tabs.setTabText(self.tabs.indexOf(self.tab3), _translate("MD5HasherApp", "Хеширование и сравнение"))
         self.folder_hash_button.setText(_translate("MD5HasherApp", "Выбрать папку"))
         self.folder_check_button.setText(_translate("MD5HasherApp", "Проверить хеш"))
+        self.folder_job_log_check.setText(_translate("MD5HasherApp", "Записать журнал задания и метрики"))
+        self.throttle_rate_label.setText(_translate("MD5HasherApp", "Лимит чтения, МБ/с (0 - без лимита):"))
+        self.throttle_workers_label.setText(_translate("MD5HasherApp", "Процессов (0 - все):"))
+        self.throttle_priority_check.setText(_translate("MD5HasherApp", "Низкий приоритет (nice, ioprio)"))
         self.tabs.setTabText(self.tabs.indexOf(self.tab4), _translate("MD5HasherApp", "Хеш папки"))
         self.viz_input_label.setText(_translate("MD5HasherApp", "Введите строку для визуализации:"))
         self.viz_start_button.setText(_translate("MD5HasherApp", "Начать"))
         self.viz_next_button.setText(_translate("MD5HasherApp", "Следующий шаг"))
+        self.viz_run_n_button.setText(_translate("MD5HasherApp", "Выполнить N шагов"))
+        self.viz_run_chunk_button.setText(_translate("MD5HasherApp", "До конца чанка"))
         self.tabs.setTabText(self.tabs.indexOf(self.tab5), _translate("MD5HasherApp", "Визуализация MD5"))
         self.hmac_key_label.setText(_translate("MD5HasherApp", "Введите ключ HMAC:"))
         self.hmac_input_label.setText(_translate("MD5HasherApp", "Введите текст:"))
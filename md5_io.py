@@ -0,0 +1,347 @@
+import json
+import os
+import queue
+import threading
+import time
+from md5_core import MD5State
+
+# Параметры конвейерного чтения по умолчанию
+PIPELINE_DEPTH = 4
+PIPELINE_BUFFER_SIZE = 1024 * 1024
+
+# Размеры чтения, среди которых выбирается лучший для файловой системы
+READ_SIZE_CANDIDATES = (64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 8 * 1024 * 1024)
+# Объем данных, читаемый каждым размером при замере скорости устройства
+TUNE_SAMPLE_BYTES = 32 * 1024 * 1024
+# Меньший объем на кандидата не дает устойчивого замера
+TUNE_MIN_SAMPLE_BYTES = 4 * 1024 * 1024
+# Страницы кэша за курсором чтения освобождаются окнами такого размера
+DROP_BEHIND_WINDOW = 8 * 1024 * 1024
+
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+_HAS_PREADV = hasattr(os, "preadv")
+
+
+def md5_stream_pipelined(stream, depth=PIPELINE_DEPTH, buffer_size=PIPELINE_BUFFER_SIZE, timings=None):
+    """
+    Вычисляет MD5 хеш потока, совмещая чтение и вычисление.
+
+    Отдельный поток заполняет кольцо заранее выделенных буферов через
+    readinto (на время системного вызова GIL освобождается), пока основной
+    поток хеширует уже прочитанные буферы. Время работы приближается к
+    max(ввод-вывод, вычисление) вместо их суммы.
+
+    Args:
+        stream: Бинарный поток с методом readinto
+        depth: Количество буферов в кольце
+        buffer_size: Размер каждого буфера в байтах
+        timings: Список, в который добавляется пара (время ожидания
+            прочитанных данных, время хеширования) в секундах, или None
+
+    Returns:
+        str: MD5 хеш в виде шестнадцатеричной строки
+
+    Raises:
+        ValueError: Если depth или buffer_size меньше 1
+    """
+    if depth < 1 or buffer_size < 1:
+        raise ValueError("Глубина очереди и размер буфера должны быть положительными")
+
+    buffers = [bytearray(buffer_size) for _ in range(depth)]
+    free = queue.Queue()
+    filled = queue.Queue()
+    for index in range(depth):
+        free.put(index)
+
+    def reader():
+        try:
+            while True:
+                index = free.get()
+                if index is None:
+                    return
+                with memoryview(buffers[index]) as view:
+                    n = stream.readinto(view)
+                if not n:
+                    filled.put((None, None))
+                    return
+                filled.put((index, n))
+        except BaseException as e:
+            filled.put((None, e))
+
+    thread = threading.Thread(target=reader, name="md5-reader", daemon=True)
+    thread.start()
+
+    state = MD5State()
+    clock = time.perf_counter
+    wait_time = 0.0
+    hash_time = 0.0
+    try:
+        while True:
+            started = clock()
+            index, n = filled.get()
+            wait_time += clock() - started
+            if index is None:
+                if n is not None:
+                    raise n
+                break
+            started = clock()
+            with memoryview(buffers[index]) as view:
+                state.update(view[:n])
+            hash_time += clock() - started
+            free.put(index)
+    finally:
+        # Останавливаем поток чтения, даже если вычисление прервано
+        free.put(None)
+        thread.join()
+
+    if timings is not None:
+        timings.append((wait_time, hash_time))
+    return state.hexdigest()
+
+
+def md5_file_pipelined(filepath, depth=PIPELINE_DEPTH, buffer_size=PIPELINE_BUFFER_SIZE):
+    """
+    Вычисляет MD5 хеш файла с конвейерным чтением.
+
+    Args:
+        filepath: Путь к файлу
+        depth: Количество буферов в кольце
+        buffer_size: Размер каждого буфера в байтах
+
+    Returns:
+        str: MD5 хеш файла в виде шестнадцатеричной строки
+    """
+    with open(filepath, "rb", buffering=0) as f:
+        return md5_stream_pipelined(f, depth, buffer_size)
+
+
+def default_read_sizes_path():
+    """Возвращает путь к файлу с выбранными размерами чтения в кэше пользователя."""
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "md5hasher", "read_sizes.json")
+
+
+class ReadSizeTuner:
+    """
+    Подбор размера чтения для каждого устройства по скорости чтения без
+    хеширования.
+
+    Сквозная скорость хеширования чистым Python определяется вычислением,
+    а время вызовов чтения в конвейере включает ожидание GIL, поэтому
+    скорость устройства замеряется отдельно: на первом достаточно большом
+    файле устройства (st_dev) каждый из размеров-кандидатов читает свой
+    участок файла без хеширования (страницы участка перед замером
+    вытесняются из кэша). Прочитанные данные остаются в кэше и затем
+    хешируются без повторного обращения к диску.
+
+    Выбранный размер сохраняется в файл (по умолчанию
+    default_read_sizes_path()), поэтому его используют процессы пула и
+    следующие запуски без повторного замера.
+    """
+
+    def __init__(self, candidates=READ_SIZE_CANDIDATES, sample_bytes=TUNE_SAMPLE_BYTES, path=None):
+        """
+        Args:
+            candidates: Размеры чтения в байтах
+            sample_bytes: Объем данных, читаемый каждым размером при замере
+            path: Файл сохраненных размеров, None - default_read_sizes_path(),
+                False - не сохранять
+        """
+        self.candidates = tuple(sorted(candidates))
+        self.sample_bytes = sample_bytes
+        self.path = default_read_sizes_path() if path is None else path
+        self._sizes = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        self._sizes = {}
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return
+        if isinstance(stored, dict):
+            self._sizes = {key: size for key, size in stored.items() if size in self.candidates}
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._sizes, file)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def read_size(self, fd, st, throttle=None):
+        """
+        Возвращает размер чтения для файла, при необходимости замеряя
+        скорость устройства на этом файле.
+
+        Args:
+            fd: Дескриптор открытого файла
+            st: Результат os.fstat(fd)
+            throttle: md5_throttle.Throttle для учета прочитанного при замере или None
+
+        Returns:
+            int: Размер чтения в байтах (PIPELINE_BUFFER_SIZE, пока скорость
+                устройства не замерена)
+        """
+        device = str(st.st_dev)
+        with self._lock:
+            if self._sizes is None:
+                self._load()
+            size = self._sizes.get(device)
+            if size is not None:
+                return size
+            size = self.probe(fd, st.st_size, throttle)
+            if size is None:
+                return PIPELINE_BUFFER_SIZE
+            self._sizes[device] = size
+            self._save()
+            return size
+
+    def probe(self, fd, file_size, throttle=None):
+        """
+        Замеряет скорость чтения файла каждым из размеров-кандидатов.
+
+        Args:
+            fd: Дескриптор открытого файла
+            file_size: Размер файла в байтах
+            throttle: md5_throttle.Throttle или None
+
+        Returns:
+            int: Размер с наибольшей скоростью или None, если файл слишком мал
+                (или в системе нет os.preadv)
+        """
+        sample = min(self.sample_bytes, file_size // len(self.candidates))
+        if not _HAS_PREADV or sample < max(TUNE_MIN_SAMPLE_BYTES, self.candidates[0]):
+            return None
+        best_size, best_speed = None, 0.0
+        for index, size in enumerate(size for size in self.candidates if size <= sample):
+            offset = index * sample
+            if _HAS_FADVISE:
+                try:
+                    os.posix_fadvise(fd, offset, sample, os.POSIX_FADV_DONTNEED)
+                except OSError:
+                    pass
+            buffer = bytearray(size)
+            done = 0
+            started = time.perf_counter()
+            while done < sample:
+                n = os.preadv(fd, [buffer], offset + done)
+                if not n:
+                    break
+                done += n
+            elapsed = time.perf_counter() - started
+            if throttle is not None:
+                throttle.consume(done)
+            speed = done / (elapsed or 1e-9)
+            if speed > best_speed:
+                best_size, best_speed = size, speed
+        return best_size
+
+
+# Общий подборщик размера чтения для процесса
+DEFAULT_TUNER = ReadSizeTuner()
+
+
+class CacheFriendlyReader:
+    """
+    Обертка над файлом для последовательного чтения без засорения кэша
+    страниц.
+
+    На Linux включает POSIX_FADV_SEQUENTIAL (упреждающее чтение большими
+    порциями) и освобождает уже прочитанные страницы через
+    POSIX_FADV_DONTNEED, чтобы хеширование больших объемов не вытесняло
+    из кэша данные других служб. Там, где posix_fadvise недоступен,
+    работает как обычное чтение. Если задано ограничение скорости,
+    выдерживает его и учитывает время ожидания.
+    """
+
+    def __init__(self, raw, drop_window=DROP_BEHIND_WINDOW, throttle=None):
+        """
+        Args:
+            raw: Файл, открытый в режиме 'rb' с buffering=0
+            drop_window: Размер окна освобождения страниц в байтах
+            throttle: md5_throttle.Throttle или None
+        """
+        self.raw = raw
+        self.throttle = throttle
+        self.drop_window = drop_window
+        self.fd = raw.fileno()
+        self.bytes_read = 0
+        self.wait_time = 0.0
+        self._dropped = 0
+        self._advise(0, 0, "POSIX_FADV_SEQUENTIAL")
+
+    def _advise(self, offset, length, advice):
+        if _HAS_FADVISE:
+            try:
+                os.posix_fadvise(self.fd, offset, length, getattr(os, advice))
+            except OSError:
+                pass
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        if n:
+            self.bytes_read += n
+            if self.bytes_read - self._dropped >= self.drop_window:
+                self.drop_behind()
+            if self.throttle is not None:
+                started = time.perf_counter()
+                self.throttle.consume(n)
+                self.wait_time += time.perf_counter() - started
+        return n
+
+    def drop_behind(self):
+        """Освобождает страницы кэша уже прочитанной части файла."""
+        if self.bytes_read > self._dropped:
+            self._advise(self._dropped, self.bytes_read - self._dropped, "POSIX_FADV_DONTNEED")
+            self._dropped = self.bytes_read
+
+
+def md5_file_sequential(filepath, depth=PIPELINE_DEPTH, tuner=DEFAULT_TUNER, drop_cache=True, throttle=None,
+                        timings=None):
+    """
+    Вычисляет MD5 хеш файла конвейерным чтением с подбором размера чтения
+    и, при drop_cache, без сохранения прочитанных данных в кэше страниц.
+
+    Буферы не больше самого файла, а их число не больше нужного для
+    файла, поэтому небольшие файлы не требуют выделения крупных буферов.
+
+    Args:
+        filepath: Путь к файлу
+        depth: Количество буферов в кольце
+        tuner: ReadSizeTuner или None для PIPELINE_BUFFER_SIZE
+        drop_cache: Освобождать страницы кэша за курсором чтения
+        throttle: md5_throttle.Throttle для ограничения скорости чтения или None
+        timings: Список, в который добавляется пара (время чтения, время
+            хеширования) в секундах, или None. Чтение идет параллельно с
+            хешированием, поэтому временем чтения считается только ожидание
+            данных (без ожидания ограничения скорости)
+
+    Returns:
+        str: MD5 хеш файла в виде шестнадцатеричной строки
+    """
+    with open(filepath, "rb", buffering=0) as f:
+        st = os.fstat(f.fileno())
+        read_size = tuner.read_size(f.fileno(), st, throttle) if tuner is not None else PIPELINE_BUFFER_SIZE
+        buffer_size = max(1, min(read_size, st.st_size))
+        # Один лишний буфер нужен, чтобы чтение шло параллельно с хешированием
+        depth = max(1, min(depth, -(-st.st_size // buffer_size) + 1))
+        reader = CacheFriendlyReader(f, DROP_BEHIND_WINDOW if drop_cache else float("inf"), throttle)
+        stream_timings = [] if timings is not None else None
+        try:
+            digest = md5_stream_pipelined(reader, depth, buffer_size, stream_timings)
+        finally:
+            if drop_cache:
+                reader.drop_behind()
+        if timings is not None:
+            wait_time, hash_time = stream_timings[0]
+            timings.append((max(0.0, wait_time - reader.wait_time), hash_time))
+        return digest
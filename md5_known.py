@@ -0,0 +1,308 @@
+import csv
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+from collections import namedtuple
+from md5_verify import MANIFEST_ENCODINGS
+
+# Заголовок файла индекса: сигнатура, версия, число хешей,
+# размер фильтра Блума в битах и число хеш-функций фильтра
+_INDEX_MAGIC = b'MD5K'
+_INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct('<4sB3xQQB7x')
+
+# Количество хешей в одном отсортированном прогоне при построении индекса
+# (прогон накапливается в bytearray по 16 байт на хеш, около 4 МБ)
+_RUN_SIZE = 256 * 1024
+
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+# Итоги построения индекса: число уникальных хешей и пропущенных строк
+KnownIndexStats = namedtuple('KnownIndexStats', 'count skipped')
+
+
+def _csv_fields(line):
+    """Разбирает CSV-строку на поля (с учетом кавычек)."""
+    return [field.strip() for field in next(csv.reader((line,)), [])]
+
+
+def _hex_digest(text):
+    if len(text) != 32 or not _HEX_DIGITS.issuperset(text):
+        return None
+    return bytes.fromhex(text)
+
+
+def find_md5_column(line):
+    """
+    Ищет столбец MD5 в заголовке CSV (например, "SHA-1","MD5","CRC32",...
+    в файлах NSRL RDS).
+
+    Args:
+        line: Первая строка файла
+
+    Returns:
+        int: Номер столбца MD5 или None, если строка не является таким заголовком
+    """
+    if "," not in line:
+        return None
+    fields = [field.upper() for field in _csv_fields(line.strip())]
+    return fields.index("MD5") if "MD5" in fields else None
+
+
+def parse_known_hash_line(line, md5_column=None):
+    """
+    Извлекает хеш из строки манифеста или списка хешей.
+
+    Поддерживаются строки манифеста ("путь: хеш"), строки из одного хеша
+    и CSV-строки (поля могут быть в кавычках). Для CSV с заголовком хеш
+    берется из столбца md5_column, без заголовка - из первого поля,
+    похожего на MD5 (32 шестнадцатеричные цифры).
+
+    Args:
+        line: Строка текста
+        md5_column: Номер столбца MD5 из заголовка CSV (см. find_md5_column) или None
+
+    Returns:
+        bytes: 16-байтовый хеш или None, если строка не содержит хеша
+    """
+    line = line.strip()
+    if md5_column is not None:
+        fields = _csv_fields(line)
+        return _hex_digest(fields[md5_column]) if md5_column < len(fields) else None
+    if ": " in line:
+        return _hex_digest(line.rsplit(": ", 1)[1])
+    if "," in line:
+        for field in _csv_fields(line):
+            digest = _hex_digest(field)
+            if digest is not None:
+                return digest
+        return None
+    return _hex_digest(line)
+
+
+def _iter_text_digests(paths):
+    """
+    Читает хеши из текстовых файлов построчно.
+
+    Yields:
+        bytes: Хеш или None для непустой строки без хеша (первая строка
+            файла без хеша считается заголовком и не выдается)
+    """
+    for path in paths:
+        md5_column = None
+        first = True
+        with open(path, "rb", buffering=1024 * 1024) as file:
+            for raw_line in file:
+                for encoding in MANIFEST_ENCODINGS:
+                    try:
+                        line = raw_line.decode(encoding)
+                        break
+                    except UnicodeDecodeError:
+                        continue
+                else:
+                    yield None
+                    continue
+                if first:
+                    first = False
+                    md5_column = find_md5_column(line)
+                    if md5_column is not None:
+                        continue
+                    digest = parse_known_hash_line(line)
+                    if digest is not None:
+                        yield digest
+                    continue
+                if not line.strip():
+                    continue
+                yield parse_known_hash_line(line, md5_column)
+
+
+def _write_run(records, tmp_dir):
+    """Сортирует прогон из 16-байтовых записей и записывает его во временный файл."""
+    view = memoryview(records)
+    digests = sorted(view[pos:pos + 16].tobytes() for pos in range(0, len(records), 16))
+    run = tempfile.TemporaryFile(dir=tmp_dir)
+    run.write(b''.join(digests))
+    run.seek(0)
+    return run
+
+
+def _iter_run(run):
+    """Читает 16-байтовые хеши из временного файла прогона."""
+    while True:
+        block = run.read(16 * 65536)
+        if not block:
+            return
+        for pos in range(0, len(block), 16):
+            yield block[pos:pos + 16]
+
+
+def _bloom_positions(digest, bits, k):
+    """Вычисляет позиции битов фильтра Блума для хеша (двойное хеширование)."""
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(k)]
+
+
+def build_known_index(sources, index_path, bits_per_entry=10, tmp_dir=None):
+    """
+    Строит индекс известных хешей из текстовых манифестов или списков хешей.
+
+    Хеши сортируются прогонами ограниченного размера, которые затем
+    сливаются, поэтому индекс из десятков миллионов хешей строится без
+    загрузки их всех в память. Повторяющиеся хеши удаляются.
+
+    Args:
+        sources: Путь или список путей к текстовым файлам с хешами
+        index_path: Путь к создаваемому файлу индекса
+        bits_per_entry: Размер фильтра Блума в битах на один хеш
+        tmp_dir: Папка для временных файлов (по умолчанию системная)
+
+    Returns:
+        KnownIndexStats: Количество уникальных хешей в индексе и пропущенных
+            строк без хеша
+    """
+    if isinstance(sources, (str, bytes)) or hasattr(sources, '__fspath__'):
+        sources = [sources]
+
+    runs = []
+    records = bytearray()
+    skipped = 0
+    try:
+        for digest in _iter_text_digests(sources):
+            if digest is None:
+                skipped += 1
+                continue
+            records += digest
+            if len(records) >= 16 * _RUN_SIZE:
+                runs.append(_write_run(records, tmp_dir))
+                records = bytearray()
+        if records or not runs:
+            runs.append(_write_run(records, tmp_dir))
+        records = None
+
+        # Первый проход: слияние прогонов и подсчет уникальных хешей
+        tmp_path = os.fspath(index_path) + ".tmp"
+        count = 0
+        with open(tmp_path, "wb", buffering=1024 * 1024) as out:
+            out.write(b'\0' * _INDEX_HEADER.size)
+            previous = None
+            for digest in heapq.merge(*(_iter_run(run) for run in runs)):
+                if digest != previous:
+                    out.write(digest)
+                    previous = digest
+                    count += 1
+    finally:
+        for run in runs:
+            run.close()
+
+    # Второй проход: фильтр Блума по уже записанным хешам
+    bits = max(64, count * bits_per_entry)
+    bits = (bits + 63) // 64 * 64
+    k = max(1, round(bits / max(count, 1) * math.log(2)))
+    bloom = bytearray(bits // 8)
+    with open(tmp_path, "r+b") as out:
+        out.seek(_INDEX_HEADER.size)
+        for pos in range(0, count, 65536):
+            block = out.read(16 * min(65536, count - pos))
+            for offset in range(0, len(block), 16):
+                for bit in _bloom_positions(block[offset:offset + 16], bits, k):
+                    bloom[bit >> 3] |= 1 << (bit & 7)
+        out.seek(0, os.SEEK_END)
+        out.write(bloom)
+        out.seek(0)
+        out.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, count, bits, k))
+    os.replace(tmp_path, index_path)
+    return KnownIndexStats(count, skipped)
+
+
+class KnownHashIndex:
+    """
+    Индекс известных хешей в отображаемом в память файле.
+
+    Отсутствующие хеши в большинстве случаев отсекаются фильтром Блума
+    без обращения к массиву; остальные проверяются двоичным поиском по
+    отсортированному массиву 16-байтовых хешей.
+    """
+
+    def __init__(self, index_path):
+        """
+        Открывает индекс, созданный build_known_index.
+
+        Args:
+            index_path: Путь к файлу индекса
+
+        Raises:
+            ValueError: Если формат файла не распознан
+        """
+        self.path = index_path
+        self._file = open(index_path, "rb")
+        try:
+            header = self._file.read(_INDEX_HEADER.size)
+            if len(header) != _INDEX_HEADER.size:
+                raise ValueError("Неизвестный формат индекса хешей")
+            magic, version, count, bits, k = _INDEX_HEADER.unpack(header)
+            if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+                raise ValueError("Неизвестный формат индекса хешей")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        self.count = count
+        self._bits = bits
+        self._k = k
+        self._digests_start = _INDEX_HEADER.size
+        self._bloom_start = self._digests_start + 16 * count
+        if len(self._mm) < self._bloom_start + bits // 8:
+            self.close()
+            raise ValueError("Файл индекса хешей поврежден")
+
+    def close(self):
+        """Закрывает отображение и файл индекса."""
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, digest):
+        """
+        Проверяет наличие хеша в индексе.
+
+        Args:
+            digest: 16-байтовый хеш или шестнадцатеричная строка
+
+        Returns:
+            bool: True если хеш есть в индексе
+        """
+        if isinstance(digest, str):
+            digest = bytes.fromhex(digest)
+        mm = self._mm
+
+        bloom_start = self._bloom_start
+        for bit in _bloom_positions(digest, self._bits, self._k):
+            if not mm[bloom_start + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+
+        lo, hi = 0, self.count
+        start = self._digests_start
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = start + mid * 16
+            current = mm[pos:pos + 16]
+            if current < digest:
+                lo = mid + 1
+            elif current > digest:
+                hi = mid
+            else:
+                return True
+        return False
@@ -0,0 +1,170 @@
+import os
+import struct
+from collections import deque
+from md5_batch import hash_entries
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# _IOWR('f', 11, struct fiemap)
+FS_IOC_FIEMAP = 0xC020660B
+# Заголовок struct fiemap и одна запись struct fiemap_extent
+_FIEMAP_HEADER = struct.Struct('=QQIIII')
+_FIEMAP_EXTENT = struct.Struct('=QQQQQIIII')
+_FIEMAP_EXTENT_UNKNOWN = 0x00000002
+
+# Количество файлов, упорядочиваемых по расположению за один раз; столько
+# же результатов может ожидать своей очереди при выдаче
+LAYOUT_WINDOW = 16384
+
+
+def physical_offset(path):
+    """
+    Возвращает физическое смещение первого экстента файла на устройстве.
+
+    Использует ioctl FIEMAP (Linux). Для пустых файлов, файлов с данными
+    внутри inode и файловых систем без поддержки FIEMAP возвращает None.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        int: Смещение в байтах или None
+    """
+    if fcntl is None:
+        return None
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    _FIEMAP_HEADER.pack_into(request, 0, 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.ioctl(fd, FS_IOC_FIEMAP, request, True)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+    mapped_extents = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+    if not mapped_extents:
+        return None
+    extent = _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)
+    if extent[5] & _FIEMAP_EXTENT_UNKNOWN:
+        return None
+    return extent[1]
+
+
+def is_rotational(path):
+    """
+    Определяет, находится ли путь на вращающемся диске (Linux, sysfs).
+
+    Args:
+        path: Путь к файлу или папке
+
+    Returns:
+        bool: True для HDD, False для SSD или если тип определить не удалось
+    """
+    try:
+        device = os.stat(path).st_dev
+        block = os.path.realpath(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+    except (OSError, AttributeError):
+        return False
+    # У разделов файл queue/rotational находится в папке всего диска
+    for directory in (block, os.path.dirname(block)):
+        try:
+            with open(os.path.join(directory, "queue", "rotational")) as file:
+                return file.read().strip() == "1"
+        except OSError:
+            continue
+    return False
+
+
+def layout_order(entries, use_fiemap=True):
+    """
+    Упорядочивает файлы по расположению на диске.
+
+    Файлы сортируются по устройству и физическому смещению первого
+    экстента; файлы без известного смещения - по номеру inode (на
+    большинстве файловых систем это приближает порядок размещения).
+
+    Args:
+        entries: Последовательность WalkEntry
+        use_fiemap: Запрашивать смещения через FIEMAP
+
+    Returns:
+        list: Номера записей entries в порядке чтения
+    """
+    keys = []
+    for index, entry in enumerate(entries):
+        offset = physical_offset(entry.path) if use_fiemap else None
+        if offset is None:
+            keys.append((entry.dev, 1, entry.inode, index))
+        else:
+            keys.append((entry.dev, 0, offset, index))
+    keys.sort()
+    return [key[3] for key in keys]
+
+
+def hash_entries_by_layout(entries, workers=1, use_fiemap=True, throttle=None, window=LAYOUT_WINDOW,
+                           job_log=None):
+    """
+    Хеширует файлы в порядке их расположения на диске, а результаты
+    выдает в исходном (каноническом) порядке entries.
+
+    entries делятся на окна по window файлов в каноническом порядке, и
+    по расположению упорядочиваются файлы внутри окна. Результаты, готовые
+    раньше своей очереди, хранятся до выдачи (не больше одного окна),
+    поэтому манифест и хеш папки совпадают с обычным режимом.
+
+    Args:
+        entries: Последовательность WalkEntry в каноническом порядке
+        workers: Количество процессов (для одного HDD лучше 1)
+        use_fiemap: Запрашивать смещения через FIEMAP
+        throttle: md5_throttle.Throttle или None
+        window: Размер окна упорядочивания в файлах
+        job_log: md5_metrics.JobLog для таймингов по файлам или None
+
+    Yields:
+        tuple: (WalkEntry, хеш или None, текст ошибки или None) в порядке entries
+    """
+    window = max(1, window)
+    order = deque()
+
+    def scheduled():
+        for start in range(0, len(entries), window):
+            for index in layout_order(entries[start:start + window], use_fiemap):
+                order.append(start + index)
+                yield entries[start + index]
+
+    ready = {}
+    next_index = 0
+    for _, digest, error in hash_entries(scheduled(), workers, throttle=throttle, job_log=job_log):
+        ready[order.popleft()] = (digest, error)
+        while next_index in ready:
+            digest, error = ready.pop(next_index)
+            yield entries[next_index], digest, error
+            next_index += 1
+
+
+def hash_entries_auto(entries, root, workers=None, throttle=None, job_log=None):
+    """
+    Хеширует файлы, выбирая порядок чтения по типу носителя: на
+    вращающихся дисках - по расположению (в один процесс), иначе - в
+    каноническом порядке.
+
+    Args:
+        entries: Последовательность WalkEntry
+        root: Корневая папка обхода (для определения носителя)
+        workers: Количество процессов для твердотельных носителей
+        throttle: md5_throttle.Throttle или None
+        job_log: md5_metrics.JobLog для таймингов по файлам или None
+
+    Yields:
+        tuple: (WalkEntry, хеш или None, текст ошибки или None) в порядке entries
+    """
+    if is_rotational(root):
+        return hash_entries_by_layout(entries, throttle=throttle, job_log=job_log)
+    return hash_entries(entries, workers, throttle=throttle, job_log=job_log)
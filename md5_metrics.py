@@ -0,0 +1,238 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from md5_core import MD5State, READ_SIZE
+
+# Границы корзин гистограмм (как le в Prometheus)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+THROUGHPUT_BUCKETS = tuple(2 ** n * 1024 * 1024 for n in range(-4, 11))
+SIZE_BUCKETS = tuple(4 ** n * 1024 for n in range(0, 11))
+
+# Число самых медленных папок в итоговой записи журнала
+SLOWEST_DIRS = 10
+
+
+def _format_bound(bound):
+    """Точная запись границы корзины для метки le (без экспоненты и округления)."""
+    bound = float(bound)
+    return str(int(bound)) if bound.is_integer() else repr(bound)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами в духе Prometheus."""
+
+    def __init__(self, buckets):
+        """
+        Args:
+            buckets: Возрастающие верхние границы корзин (без +Inf)
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Учитывает одно наблюдение."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def expose(self, name, help_text, labels=""):
+        """
+        Форматирует гистограмму в текстовом формате Prometheus.
+
+        Args:
+            name: Имя метрики
+            help_text: Описание метрики
+            labels: Дополнительные метки вида 'job="folder_hash"'
+
+        Returns:
+            list: Строки экспозиции
+        """
+        prefix = labels + "," if labels else ""
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{_format_bound(bound)}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum:.9g}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+def md5_file_timed(filepath, throttle=None):
+    """
+    Хеширует файл, отдельно измеряя время чтения и вычисления
+    (ожидание ограничения скорости не входит ни в одно из них).
+
+    Args:
+        filepath: Путь к файлу
+        throttle: md5_throttle.Throttle или None
+
+    Returns:
+        tuple: (хеш, размер в байтах, время чтения в секундах, время хеширования в секундах)
+    """
+    state = MD5State()
+    read_time = 0.0
+    hash_time = 0.0
+    clock = time.perf_counter
+    with open(filepath, "rb", buffering=0) as file:
+        while True:
+            started = clock()
+            chunk = file.read(READ_SIZE)
+            read_time += clock() - started
+            if not chunk:
+                break
+            if throttle is not None:
+                throttle.consume(len(chunk))
+            started = clock()
+            state.update(chunk)
+            hash_time += clock() - started
+    return state.hexdigest(), state.total_length, read_time, hash_time
+
+
+class JobLog:
+    """
+    Журнал задания хеширования: по строке JSON на файл и сводные гистограммы.
+
+    Каждая запись содержит путь, размер, время чтения и хеширования и ошибку.
+    При закрытии в журнал добавляется итоговая запись с самыми медленными
+    папками, а гистограммы задержки, пропускной способности и размеров
+    записываются в файл в текстовом формате Prometheus (для textfile
+    collector node exporter). Файл метрик заменяется атомарно.
+    """
+
+    def __init__(self, log_path=None, metrics_path=None, job="folder_hash"):
+        """
+        Args:
+            log_path: Путь к журналу JSON lines или None
+            metrics_path: Путь к файлу метрик Prometheus (.prom) или None
+            job: Имя задания (метка job в метриках)
+        """
+        self.job = job
+        self.metrics_path = metrics_path
+        self._log = open(log_path, "a", encoding="utf-8", buffering=65536) if log_path else None
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.read_latency = Histogram(LATENCY_BUCKETS)
+        self.hash_latency = Histogram(LATENCY_BUCKETS)
+        self.throughput = Histogram(THROUGHPUT_BUCKETS)
+        self.sizes = Histogram(SIZE_BUCKETS)
+        self.files = 0
+        self.errors = 0
+        self.bytes = 0
+        self._dir_times = {}
+        self.started = time.time()
+        self._write({"event": "job_start", "job": job, "time": self.started})
+
+    def _write(self, record):
+        if self._log is not None:
+            self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def record(self, path, size, read_time, hash_time, error=None):
+        """
+        Учитывает обработку одного файла.
+
+        Args:
+            path: Путь к файлу
+            size: Размер в байтах
+            read_time: Время чтения в секундах
+            hash_time: Время хеширования в секундах
+            error: Текст ошибки или None
+        """
+        total = read_time + hash_time
+        self.files += 1
+        self._write({"event": "file", "path": path, "bytes": size, "read_s": round(read_time, 6),
+                     "hash_s": round(hash_time, 6), "error": error})
+        directory = os.path.dirname(path)
+        self._dir_times[directory] = self._dir_times.get(directory, 0.0) + total
+        if error is not None:
+            self.errors += 1
+            return
+
+        self.bytes += size
+        self.latency.observe(total)
+        self.read_latency.observe(read_time)
+        self.hash_latency.observe(hash_time)
+        self.sizes.observe(size)
+        if total > 0:
+            self.throughput.observe(size / total)
+
+    def hash_file(self, path, throttle=None):
+        """
+        Хеширует файл и записывает его тайминги.
+
+        Args:
+            path: Путь к файлу
+            throttle: md5_throttle.Throttle или None
+
+        Returns:
+            str: MD5 хеш
+
+        Raises:
+            OSError: При ошибке чтения (ошибка тоже записывается в журнал)
+        """
+        try:
+            digest, size, read_time, hash_time = md5_file_timed(path, throttle)
+        except OSError as e:
+            self.record(path, 0, 0.0, 0.0, str(e))
+            raise
+        self.record(path, size, read_time, hash_time)
+        return digest
+
+    def expose(self):
+        """
+        Форматирует сводные метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: Текст экспозиции
+        """
+        labels = f'job="{self.job}"'
+        lines = []
+        lines += self.latency.expose("md5hasher_file_duration_seconds",
+                                     "Время чтения и хеширования одного файла", labels)
+        lines += self.read_latency.expose("md5hasher_file_read_seconds",
+                                          "Время чтения одного файла", labels)
+        lines += self.hash_latency.expose("md5hasher_file_hash_seconds",
+                                          "Время хеширования одного файла", labels)
+        lines += self.throughput.expose("md5hasher_file_throughput_bytes_per_second",
+                                        "Пропускная способность по файлам", labels)
+        lines += self.sizes.expose("md5hasher_file_size_bytes", "Размер файлов", labels)
+        for name, help_text, value in (
+            ("md5hasher_files_total", "Обработано файлов", self.files),
+            ("md5hasher_file_errors_total", "Ошибок при обработке файлов", self.errors),
+            ("md5hasher_bytes_total", "Обработано байт", self.bytes),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name}{{{labels}}} {value}"]
+        name = "md5hasher_job_last_run_timestamp_seconds"
+        lines += [f"# HELP {name} Время завершения последнего задания", f"# TYPE {name} gauge",
+                  f"{name}{{{labels}}} {time.time():.3f}"]
+        name = "md5hasher_job_duration_seconds"
+        lines += [f"# HELP {name} Длительность последнего задания", f"# TYPE {name} gauge",
+                  f"{name}{{{labels}}} {time.time() - self.started:.6f}"]
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Записывает итоговую запись журнала и файл метрик."""
+        slowest = sorted(self._dir_times.items(), key=lambda item: item[1], reverse=True)[:SLOWEST_DIRS]
+        self._write({"event": "job_end", "job": self.job, "time": time.time(),
+                     "duration_s": round(time.time() - self.started, 6), "files": self.files,
+                     "errors": self.errors, "bytes": self.bytes,
+                     "slowest_dirs": [[path, round(seconds, 6)] for path, seconds in slowest]})
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+        if self.metrics_path:
+            tmp_path = self.metrics_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(self.expose())
+            os.replace(tmp_path, self.metrics_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
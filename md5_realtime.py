@@ -0,0 +1,131 @@
+import threading
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from md5_core import IncrementalHasher, hmac_md5_state
+
+# Задержка перед пересчетом после последнего изменения текста (мс)
+REALTIME_DELAY_MS = 150
+
+
+class RealtimeHasher(QObject):
+    """
+    Фоновое вычисление MD5 или HMAC-MD5 для текста, который редактируется
+    в поле ввода.
+
+    Изменения объединяются: пересчет запускается через delay_ms после
+    последнего изменения, в отдельном потоке. Если во время вычисления
+    текст снова изменился, оно прерывается, а устаревшие результаты
+    отбрасываются. Промежуточные состояния сохраняются между вызовами
+    (IncrementalHasher), а для HMAC состояние после ключа вычисляется
+    один раз, пока ключ не изменился.
+
+    Signals:
+        hash_ready(str): Хеш актуального текста
+        hash_failed(str): Сообщение об ошибке вычисления
+    """
+
+    hash_ready = pyqtSignal(str)
+    hash_failed = pyqtSignal(str)
+    # Внутренний сигнал рабочего потока: (поколение запроса, хеш, ошибка)
+    _finished = pyqtSignal(int, str, str)
+
+    def __init__(self, parent=None, delay_ms=REALTIME_DELAY_MS):
+        """
+        Args:
+            parent: Родительский объект Qt
+            delay_ms: Задержка перед пересчетом в миллисекундах
+        """
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._dispatch)
+        # Сигнал из рабочего потока доставляется в поток интерфейса через очередь
+        self._finished.connect(self._deliver)
+
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._job = None
+        self._pending = None
+        self._hasher = IncrementalHasher()
+        self._key = None
+        self._outer = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, text, key=None):
+        """
+        Запрашивает пересчет хеша для нового текста.
+
+        Args:
+            text: Текст для хеширования
+            key: Ключ HMAC или None для обычного MD5
+        """
+        with self._condition:
+            self._generation += 1
+        self._pending = (text, key)
+        self._timer.start()
+
+    def cancel(self):
+        """Отменяет ожидающие и текущие вычисления."""
+        self._timer.stop()
+        self._pending = None
+        with self._condition:
+            self._generation += 1
+            self._job = None
+
+    def _dispatch(self):
+        # Кодирование выполняется здесь, чтобы рабочий поток не обращался к Qt
+        if self._pending is None:
+            return
+        text, key = self._pending
+        self._pending = None
+        with self._condition:
+            self._job = (self._generation, text.encode('utf-8'),
+                         None if key is None else key.encode('utf-8'))
+            self._condition.notify()
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._job is None:
+                    self._condition.wait()
+                generation, data, key = self._job
+                self._job = None
+
+            try:
+                result = self._compute(generation, data, key)
+            except Exception as e:
+                self._finished.emit(generation, "", str(e))
+                continue
+            if result is not None:
+                self._finished.emit(generation, result, "")
+
+    def _compute(self, generation, data, key):
+        if key != self._key:
+            self._key = key
+            if key is None:
+                self._outer = None
+                self._hasher.reset()
+            else:
+                inner, self._outer = hmac_md5_state(key)
+                self._hasher.reset(inner)
+
+        state = self._hasher.hash(data, lambda: self._is_stale(generation))
+        if state is None:
+            return None
+        if self._outer is None:
+            return state.hexdigest()
+        outer = self._outer.copy()
+        outer.update(state.digest())
+        return outer.hexdigest()
+
+    def _deliver(self, generation, digest, error):
+        if self._is_stale(generation):
+            return
+        if error:
+            self.hash_failed.emit(error)
+        else:
+            self.hash_ready.emit(digest)
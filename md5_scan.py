@@ -0,0 +1,320 @@
+import copy
+import json
+import os
+import time
+from md5_core import MD5State, md5_string
+from md5_layout import hash_entries_auto
+from md5_walk import WalkFilter, walk_files
+
+# Имя манифеста, который записывается в корень папки
+MANIFEST_NAME = "file_hashes.txt"
+# Манифест в корне папки не входит ни в список файлов, ни в хеш папки;
+# файлы с тем же именем во вложенных папках считаются обычными данными
+MANIFEST_EXCLUDE = "/" + MANIFEST_NAME
+
+# Журнал сбрасывается на диск через столько записей или секунд
+JOURNAL_FLUSH_ENTRIES = 1000
+JOURNAL_FLUSH_INTERVAL = 5.0
+
+# Виды заданий сканирования (разные задания ведут отдельные журналы)
+JOB_MANIFEST = "manifest"
+JOB_FOLDER_HASH = "folder_hash"
+
+
+def is_manifest(rel_path):
+    """Проверяет, является ли относительный путь манифестом в корне папки."""
+    return rel_path == MANIFEST_NAME
+
+
+def scan_filter(walk_filter=None):
+    """
+    Возвращает правила обхода для сканирования папки: копию walk_filter
+    (или правила по умолчанию) с исключением манифеста в корне.
+
+    Args:
+        walk_filter: WalkFilter или None
+
+    Returns:
+        WalkFilter: Правила обхода
+    """
+    walk_filter = copy.copy(walk_filter) if walk_filter is not None else WalkFilter()
+    if MANIFEST_EXCLUDE not in walk_filter.exclude:
+        walk_filter.exclude = walk_filter.exclude + (MANIFEST_EXCLUDE,)
+    return walk_filter
+
+
+def default_journal_path(root, job):
+    """
+    Возвращает путь к журналу задания для папки в кэше пользователя
+    (вне сканируемой папки, чтобы журнал не попадал в обход).
+
+    Вид задания входит в имя журнала: задание одного вида не продолжает
+    и не удаляет журнал прерванного задания другого вида.
+
+    Args:
+        root: Корневая папка
+        job: Вид задания (JOB_MANIFEST, JOB_FOLDER_HASH или другое имя)
+
+    Returns:
+        str: Путь к файлу журнала
+    """
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    name = f"{md5_string(os.path.abspath(root))}.{job}.journal"
+    return os.path.join(cache_dir, "md5hasher", name)
+
+
+class ScanJournal:
+    """
+    Журнал выполненной части сканирования для продолжения после сбоя.
+
+    Каждая строка - JSON-запись с относительным путем, размером, временем
+    изменения и хешем файла; записи только дописываются и периодически
+    сбрасываются на диск. Неполная последняя строка (после сбоя)
+    игнорируется при чтении. Хеш из журнала используется повторно, только
+    если размер и время изменения файла не изменились.
+    """
+
+    def __init__(self, path, root, flush_entries=JOURNAL_FLUSH_ENTRIES, flush_interval=JOURNAL_FLUSH_INTERVAL):
+        """
+        Args:
+            path: Путь к файлу журнала
+            root: Корневая папка задания
+            flush_entries: Сбрасывать журнал через столько записей
+            flush_interval: Сбрасывать журнал не реже, чем через столько секунд
+        """
+        self.path = path
+        self.root = os.path.abspath(root)
+        self.flush_entries = flush_entries
+        self.flush_interval = flush_interval
+        self.done = self._load()
+        self._file = None
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def _load(self):
+        done = {}
+        try:
+            file = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return done
+        with file:
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                return done
+            if header.get("root") != self.root:
+                return done
+            for line in file:
+                try:
+                    record = json.loads(line)
+                    done[record["p"]] = (record["s"], record["m"], record["h"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return done
+
+    def lookup(self, entry):
+        """
+        Возвращает сохраненный хеш файла, если файл не изменился.
+
+        Args:
+            entry: WalkEntry
+
+        Returns:
+            str: MD5 хеш или None
+        """
+        record = self.done.get(entry.rel_path)
+        if record is not None and record[0] == entry.size and record[1] == entry.mtime_ns:
+            return record[2]
+        return None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if self.done:
+            self._file = open(self.path, "a", encoding="utf-8")
+            # Неполную строку, оборванную сбоем, отделяем от новых записей
+            with open(self.path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    self._file.write("\n")
+        else:
+            # Новый журнал или журнал другой папки начинается заново
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(json.dumps({"root": self.root}, ensure_ascii=False) + "\n")
+
+    def record(self, entry, digest):
+        """
+        Дописывает в журнал хеш обработанного файла.
+
+        Args:
+            entry: WalkEntry
+            digest: MD5 хеш
+        """
+        if self._file is None:
+            self._open()
+        self._file.write(json.dumps({"p": entry.rel_path, "s": entry.size, "m": entry.mtime_ns, "h": digest},
+                                    ensure_ascii=False) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_entries or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Сбрасывает накопленные записи на диск."""
+        if self._file is not None and self._unflushed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self, completed=False):
+        """
+        Закрывает журнал.
+
+        Args:
+            completed: Задание завершено - журнал больше не нужен и удаляется
+        """
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+        if completed and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ScanSummary:
+    """
+    Итоги сканирования папки: хеш папки и статистика.
+
+    Хеш папки - MD5 от склеенных шестнадцатеричных хешей файлов в
+    каноническом порядке (по полному пути); он вычисляется потоково, без
+    хранения списка хешей. Если хотя бы один файл не удалось прочитать,
+    хеш папки не определен.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.files = 0
+        self.reused = 0
+        self.bytes = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._state = MD5State()
+
+    def add(self, entry, digest, error):
+        """
+        Учитывает результат хеширования файла.
+
+        Args:
+            entry: WalkEntry
+            digest: MD5 хеш или None
+            error: Текст ошибки или None
+        """
+        if error is not None:
+            self.errors.append((entry.rel_path, error))
+        else:
+            self.files += 1
+            self.bytes += entry.size
+            self._state.update(digest.encode('ascii'))
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def folder_hash(self):
+        """MD5 хеш папки или None, если были ошибки."""
+        return None if self.errors else self._state.hexdigest()
+
+    @property
+    def bytes_per_sec(self):
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+def iter_folder_scan(root, summary=None, walk_filter=None, workers=None, job_log=None, journal=None,
+                     throttle=None):
+    """
+    Обходит и хеширует папку за один проход.
+
+    Args:
+        root: Корневая папка
+        summary: ScanSummary для накопления итогов или None
+        walk_filter: Дополнительные правила обхода или None
+        workers: Количество процессов (см. hash_entries)
+        job_log: JobLog для журнала таймингов или None (тайминги
+            измеряются там же, где хешируются файлы, в том числе в пуле)
+        journal: ScanJournal для продолжения прерванного задания или None
+        throttle: md5_throttle.Throttle для фоновых заданий или None
+
+    Yields:
+        tuple: (WalkEntry, хеш или None, текст ошибки или None) в каноническом порядке
+    """
+    entries = walk_files(root, scan_filter(walk_filter))
+    if summary is not None:
+        summary.total = len(entries)
+
+    # Файлы, уже обработанные в прерванном задании, не хешируются заново
+    reused = {}
+    if journal is not None:
+        for index, entry in enumerate(entries):
+            digest = journal.lookup(entry)
+            if digest is not None:
+                reused[index] = digest
+    pending = [entry for index, entry in enumerate(entries) if index not in reused] if reused else entries
+
+    hashed = hash_entries_auto(pending, root, workers, throttle, job_log)
+
+    for index, entry in enumerate(entries):
+        digest = reused.get(index)
+        error = None
+        if digest is None:
+            entry, digest, error = next(hashed)
+            if journal is not None and error is None:
+                journal.record(entry, digest)
+        elif summary is not None:
+            summary.reused += 1
+        if summary is not None:
+            summary.add(entry, digest, error)
+        yield entry, digest, error
+
+
+def scan_folder(root, manifest_path=None, walk_filter=None, workers=None, job_log=None, on_entry=None,
+                journal_path=None, throttle=None):
+    """
+    Сканирует папку: записывает манифест, вычисляет хеш папки и
+    статистику за один проход чтения.
+
+    Args:
+        root: Корневая папка
+        manifest_path: Путь к создаваемому манифесту (например, file_hashes.txt
+            в корне папки) или None
+        walk_filter: Дополнительные правила обхода или None
+        workers: Количество процессов (см. hash_entries)
+        job_log: JobLog для журнала таймингов или None
+        on_entry: Функция on_entry(entry, digest, error, summary), вызываемая
+            для каждого файла, или None
+        journal_path: Путь к журналу для продолжения после сбоя (см.
+            default_journal_path) или None; после успешного завершения
+            без ошибок журнал удаляется
+        throttle: md5_throttle.Throttle для ограничения скорости чтения,
+            числа процессов и их приоритета или None
+
+    Returns:
+        ScanSummary: Итоги сканирования
+    """
+    summary = ScanSummary()
+    journal = ScanJournal(journal_path, root) if journal_path else None
+    completed = False
+    manifest = open(manifest_path, "w", buffering=65536) if manifest_path else None
+    try:
+        if manifest is not None:
+            manifest.write("Файл\tMD5 Хеш\n")
+        for entry, digest, error in iter_folder_scan(root, summary, walk_filter, workers, job_log, journal,
+                                                        throttle):
+            if manifest is not None and error is None:
+                manifest.write(f"{entry.rel_path}: {digest}\n")
+            if on_entry is not None:
+                on_entry(entry, digest, error, summary)
+        completed = not summary.errors
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if journal is not None:
+            journal.close(completed)
+    return summary
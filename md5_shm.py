@@ -0,0 +1,164 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from md5_core import md5_digest, byte_view, MD5Prefix
+
+
+def _attach(name):
+    """
+    Подключается к существующему сегменту разделяемой памяти.
+
+    Сегмент удаляет создавший его процесс. Начиная с Python 3.13 подключение
+    не отслеживается resource_tracker; в более ранних версиях процессы пула
+    используют resource_tracker родителя, и повторная регистрация безвредна.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _hash_ranges(data_name, desc_name, out_name, start, end, prefix=None):
+    """
+    Хеширует элементы start..end-1 прямо из разделяемой памяти
+    (выполняется в процессе-обработчике).
+
+    Дескрипторы - пары (смещение, длина) uint64 в сегменте desc_name,
+    результаты записываются по 16 байт в сегмент out_name. Если задан
+    prefix (MD5Prefix), элементы хешируются как его суффиксы.
+    """
+    digest = md5_digest if prefix is None else prefix.digest
+    data_shm = _attach(data_name)
+    desc_shm = _attach(desc_name)
+    out_shm = _attach(out_name)
+    try:
+        with data_shm.buf as data_buf, desc_shm.buf as desc_buf, out_shm.buf as out_buf:
+            with desc_buf.cast('Q') as descriptors:
+                for i in range(start, end):
+                    offset = descriptors[2 * i]
+                    length = descriptors[2 * i + 1]
+                    with data_buf[offset:offset + length] as item:
+                        out_buf[16 * i:16 * i + 16] = digest(item)
+    finally:
+        data_shm.close()
+        desc_shm.close()
+        out_shm.close()
+
+
+def _split(lengths, parts):
+    """Делит элементы на непрерывные диапазоны примерно равного объема."""
+    total = sum(lengths) + 64 * len(lengths)
+    target = total / parts if parts else total
+    ranges = []
+    start = 0
+    acc = 0
+    for i, length in enumerate(lengths):
+        acc += length + 64
+        if acc >= target:
+            ranges.append((start, i + 1))
+            start = i + 1
+            acc = 0
+    if start < len(lengths):
+        ranges.append((start, len(lengths)))
+    return ranges
+
+
+def md5_shared_ranges(data_shm, ranges, workers=None, hex=False, prefix=None):
+    """
+    Хеширует участки уже заполненного сегмента разделяемой памяти.
+
+    Обработчикам передаются только имена сегментов и номера элементов;
+    данные не сериализуются и не копируются между процессами.
+
+    Args:
+        data_shm: SharedMemory с входными данными
+        ranges: Последовательность пар (смещение, длина) внутри сегмента
+        workers: Количество процессов (по умолчанию os.cpu_count())
+        hex: Вернуть список шестнадцатеричных строк
+        prefix: Общий префикс участков (MD5Prefix, str или байты) или None
+
+    Returns:
+        bytes: Хеши подряд, по 16 байт на участок (или list[str] при hex=True)
+
+    Raises:
+        ValueError: Если участок выходит за границы сегмента
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if prefix is not None and not isinstance(prefix, MD5Prefix):
+        prefix = MD5Prefix(prefix)
+
+    descriptors = array('Q')
+    lengths = []
+    for offset, length in ranges:
+        if offset < 0 or length < 0 or offset + length > data_shm.size:
+            raise ValueError("Участок выходит за границы разделяемой памяти")
+        descriptors.append(offset)
+        descriptors.append(length)
+        lengths.append(length)
+
+    count = len(lengths)
+    if count == 0:
+        return [] if hex else b''
+
+    desc_shm = shared_memory.SharedMemory(create=True, size=max(1, len(descriptors) * 8))
+    out_shm = shared_memory.SharedMemory(create=True, size=16 * count)
+    try:
+        desc_shm.buf[:len(descriptors) * 8] = descriptors.tobytes()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_hash_ranges, data_shm.name, desc_shm.name, out_shm.name, start, end, prefix)
+                for start, end in _split(lengths, workers * 4)
+            ]
+            for future in futures:
+                future.result()
+        out = bytes(out_shm.buf[:16 * count])
+    finally:
+        desc_shm.close()
+        desc_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+
+    if hex:
+        hex_out = out.hex()
+        return [hex_out[i:i + 32] for i in range(0, len(hex_out), 32)]
+    return out
+
+
+def md5_many_shared(items, workers=None, hex=False, prefix=None):
+    """
+    Хеширует набор байтовых объектов в нескольких процессах через
+    разделяемую память.
+
+    Элементы один раз копируются в общий сегмент, после чего процессы
+    хешируют их напрямую из него и записывают 16-байтовые хеши в общий
+    выходной массив, без сериализации данных. Функцию можно
+    зарегистрировать как движок md5_many через set_many_engine.
+
+    Args:
+        items: Последовательность str или объектов с протоколом буфера
+        workers: Количество процессов (по умолчанию os.cpu_count())
+        hex: Вернуть список шестнадцатеричных строк
+        prefix: Общий префикс элементов (MD5Prefix, str или байты) или None;
+            сжимается один раз и передается процессам как промежуточное состояние
+
+    Returns:
+        bytes: Хеши подряд, по 16 байт на элемент (или list[str] при hex=True)
+    """
+    views = [byte_view(item.encode('utf-8') if isinstance(item, str) else item) for item in items]
+    total = sum(len(view) for view in views)
+
+    data_shm = shared_memory.SharedMemory(create=True, size=max(1, total))
+    try:
+        ranges = []
+        offset = 0
+        for view in views:
+            length = len(view)
+            data_shm.buf[offset:offset + length] = view
+            ranges.append((offset, length))
+            offset += length
+        return md5_shared_ranges(data_shm, ranges, workers, hex, prefix)
+    finally:
+        data_shm.close()
+        data_shm.unlink()
@@ -0,0 +1,177 @@
+import ctypes
+import multiprocessing
+import os
+import platform
+import time
+
+# Классы приоритета ввода-вывода Linux (ioprio_set)
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1
+# Номер системного вызова ioprio_set для распространенных архитектур
+_SYS_IOPRIO_SET = {
+    'x86_64': 251, 'amd64': 251, 'i386': 289, 'i686': 289,
+    'aarch64': 30, 'arm64': 30, 'armv7l': 314, 'ppc64le': 273,
+}
+
+# Максимальный запас токенов в секундах работы на заданной скорости
+BURST_SECONDS = 1.0
+# Период опроса при ожидании свободного места для процесса
+_WORKER_POLL_INTERVAL = 0.05
+
+
+def set_io_priority(ioprio_class, level=4):
+    """
+    Устанавливает приоритет ввода-вывода текущего процесса (Linux).
+
+    Args:
+        ioprio_class: IOPRIO_CLASS_BE или IOPRIO_CLASS_IDLE
+        level: Уровень внутри класса BE (0 - высший, 7 - низший)
+
+    Returns:
+        bool: True если приоритет установлен
+    """
+    number = _SYS_IOPRIO_SET.get(platform.machine().lower())
+    if number is None or not os.name == "posix":
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return False
+    value = (ioprio_class << _IOPRIO_CLASS_SHIFT) | (level & 7)
+    return libc.syscall(number, _IOPRIO_WHO_PROCESS, 0, value) == 0
+
+
+class Throttle:
+    """
+    Ограничения фонового хеширования: скорость чтения, число одновременно
+    работающих процессов и приоритет процессов-обработчиков.
+
+    Состояние хранится в разделяемой памяти multiprocessing, поэтому один
+    объект ограничивает и текущий процесс, и процессы пула (передается
+    через initializer), а скорость и число процессов можно менять во время
+    выполнения задания. Скорость ограничивается ведром токенов с запасом
+    BURST_SECONDS: чтение оплачивается после факта, и при долге вызывающий
+    поток засыпает.
+    """
+
+    def __init__(self, bytes_per_sec=None, max_workers=None, nice=None, ioprio_class=None, ioprio_level=4):
+        """
+        Args:
+            bytes_per_sec: Предельная скорость чтения в байтах/с или None (без ограничения)
+            max_workers: Максимум одновременно работающих процессов или None
+            nice: Прибавка к nice процессов-обработчиков или None
+            ioprio_class: Класс приоритета ввода-вывода обработчиков (IOPRIO_CLASS_*) или None
+            ioprio_level: Уровень внутри класса IOPRIO_CLASS_BE
+        """
+        self._lock = multiprocessing.Lock()
+        self._rate = multiprocessing.Value('d', float(bytes_per_sec or 0), lock=False)
+        self._tokens = multiprocessing.Value('d', 0.0, lock=False)
+        self._stamp = multiprocessing.Value('d', time.monotonic(), lock=False)
+        self._max_workers = multiprocessing.Value('i', int(max_workers or 0), lock=False)
+        self._active = multiprocessing.Value('i', 0, lock=False)
+        self.nice = nice
+        self.ioprio_class = ioprio_class
+        self.ioprio_level = ioprio_level
+
+    @property
+    def bytes_per_sec(self):
+        return self._rate.value or None
+
+    @property
+    def max_workers(self):
+        return self._max_workers.value or None
+
+    @property
+    def has_priority(self):
+        """True если задан приоритет процессов-обработчиков."""
+        return self.nice is not None or self.ioprio_class is not None
+
+    def set_rate(self, bytes_per_sec):
+        """
+        Меняет предельную скорость чтения (действует сразу, в том числе
+        для процессов пула).
+
+        Args:
+            bytes_per_sec: Байт в секунду или None/0 для снятия ограничения
+        """
+        with self._lock:
+            self._rate.value = float(bytes_per_sec or 0)
+            self._tokens.value = min(self._tokens.value, self._rate.value * BURST_SECONDS)
+            self._stamp.value = time.monotonic()
+
+    def set_max_workers(self, max_workers):
+        """
+        Меняет максимальное число одновременно работающих процессов.
+
+        Args:
+            max_workers: Число процессов или None/0 для снятия ограничения
+        """
+        self._max_workers.value = int(max_workers or 0)
+
+    def consume(self, nbytes):
+        """
+        Учитывает прочитанные байты и при превышении скорости ждет.
+
+        Args:
+            nbytes: Количество прочитанных байт
+        """
+        with self._lock:
+            rate = self._rate.value
+            if rate <= 0:
+                return
+            now = time.monotonic()
+            tokens = self._tokens.value + (now - self._stamp.value) * rate
+            tokens = min(tokens, rate * BURST_SECONDS) - nbytes
+            self._tokens.value = tokens
+            self._stamp.value = now
+        if tokens < 0:
+            time.sleep(-tokens / rate)
+
+    def acquire_worker(self):
+        """Ждет, пока число работающих процессов не станет меньше предела."""
+        while True:
+            with self._lock:
+                limit = self._max_workers.value
+                if limit <= 0 or self._active.value < limit:
+                    self._active.value += 1
+                    return
+            time.sleep(_WORKER_POLL_INTERVAL)
+
+    def release_worker(self):
+        """Освобождает место, занятое acquire_worker."""
+        with self._lock:
+            self._active.value -= 1
+
+    def apply_priority(self):
+        """Понижает приоритет текущего процесса (nice и ioprio), если он задан."""
+        if self.nice:
+            try:
+                os.nice(self.nice)
+            except (AttributeError, OSError):
+                pass
+        if self.ioprio_class is not None:
+            set_io_priority(self.ioprio_class, self.ioprio_level)
+
+
+# Ограничения процесса-обработчика пула (устанавливаются init_worker)
+_worker_throttle = None
+
+
+def init_worker(throttle):
+    """
+    Инициализатор процессов пула: запоминает ограничения и применяет приоритет.
+
+    Args:
+        throttle: Throttle или None
+    """
+    global _worker_throttle
+    _worker_throttle = throttle
+    if throttle is not None:
+        throttle.apply_priority()
+
+
+def worker_throttle():
+    """Возвращает Throttle текущего процесса-обработчика или None."""
+    return _worker_throttle
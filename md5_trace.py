@@ -0,0 +1,231 @@
+import struct
+import sys
+from array import array
+from md5_core import print_step
+
+# Колонки трассировки в порядке хранения и экспорта
+TRACE_FIELDS = ('chunk', 'step', 'A', 'B', 'C', 'D', 'f', 'g', 'temp')
+
+# Заголовок бинарного формата: сигнатура, версия, число колонок, число записей
+_BINARY_MAGIC = b'MD5T'
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<4sBBQ')
+
+
+class TraceRecorder:
+    """
+    Компактный журнал шагов MD5 для визуализации и анализа.
+
+    Хранит регистры, f, g и промежуточный результат каждого записанного шага
+    в колонках array('I') вместо отформатированных строк. Текст формируется
+    только по запросу, поэтому трассировка больших входных данных
+    занимает 36 байт на шаг.
+    """
+
+    def __init__(self, every=1, chunks=None):
+        """
+        Инициализирует пустой журнал.
+
+        Args:
+            every: Записывать каждый N-й шаг (по сквозному номеру шага)
+            chunks: Номера чанков (с 1) для записи или None для всех чанков
+
+        Raises:
+            ValueError: Если every меньше 1
+        """
+        if every < 1:
+            raise ValueError("Шаг выборки должен быть не меньше 1")
+        self.every = every
+        self.chunks = frozenset(chunks) if chunks is not None else None
+        self.columns = {name: array('I') for name in TRACE_FIELDS}
+
+    def wants_chunk(self, chunk_num):
+        """
+        Проверяет, нужно ли записывать шаги указанного чанка.
+
+        Args:
+            chunk_num: Номер чанка (с 1)
+
+        Returns:
+            bool: True если чанк попадает в выборку
+        """
+        return self.chunks is None or chunk_num in self.chunks
+
+    def wants_step(self, chunk_num, step):
+        """
+        Проверяет, попадает ли шаг в выборку.
+
+        Args:
+            chunk_num: Номер чанка (с 1)
+            step: Номер шага внутри чанка (0-63)
+
+        Returns:
+            bool: True если шаг нужно записать
+        """
+        return ((chunk_num - 1) * 64 + step) % self.every == 0 and self.wants_chunk(chunk_num)
+
+    def record(self, chunk_num, step, a, b, c, d, f, g, temp):
+        """
+        Добавляет шаг в журнал.
+
+        Args:
+            chunk_num: Номер чанка (с 1)
+            step: Номер шага внутри чанка (0-63)
+            a, b, c, d: Значения регистров после шага
+            f: Результат нелинейной функции
+            g: Индекс используемого слова
+            temp: Промежуточный результат
+        """
+        cols = self.columns
+        cols['chunk'].append(chunk_num)
+        cols['step'].append(step)
+        cols['A'].append(a)
+        cols['B'].append(b)
+        cols['C'].append(c)
+        cols['D'].append(d)
+        cols['f'].append(f)
+        cols['g'].append(g)
+        cols['temp'].append(temp)
+
+    def clear(self):
+        """Очищает журнал, сохраняя параметры выборки."""
+        for name in TRACE_FIELDS:
+            del self.columns[name][:]
+
+    def __len__(self):
+        return len(self.columns['chunk'])
+
+    def __getitem__(self, index):
+        """
+        Возвращает запись шага в формате, совместимом с MD5StepByStep.next_step.
+
+        Args:
+            index: Номер записи в журнале
+
+        Returns:
+            dict: Информация о шаге (chunk, round, step, A, B, C, D, f, g, temp)
+        """
+        cols = self.columns
+        step = cols['step'][index]
+        return {
+            'chunk': cols['chunk'][index],
+            'round': step // 16 + 1,
+            'step': step % 16 + 1,
+            'A': cols['A'][index],
+            'B': cols['B'][index],
+            'C': cols['C'][index],
+            'D': cols['D'][index],
+            'f': cols['f'][index],
+            'g': cols['g'][index],
+            'temp': cols['temp'][index],
+        }
+
+    def format_step(self, index):
+        """
+        Форматирует запись журнала в текстовом виде.
+
+        Args:
+            index: Номер записи в журнале
+
+        Returns:
+            str: Форматированная строка с информацией о шаге
+        """
+        info = self[index]
+        return print_step(info['round'], info['step'], info['A'], info['B'], info['C'], info['D'],
+                          info['f'], info['g'], info['temp'])
+
+    def iter_lines(self):
+        """
+        Лениво форматирует журнал, добавляя заголовки чанков.
+
+        Yields:
+            str: Строки в формате прежнего текстового вывода md5_with_viz
+        """
+        current_chunk = None
+        for index in range(len(self)):
+            chunk_num = self.columns['chunk'][index]
+            if chunk_num != current_chunk:
+                current_chunk = chunk_num
+                yield f"\nProcessing chunk {chunk_num}:"
+            yield self.format_step(index)
+
+    def to_csv(self, file):
+        """
+        Экспортирует журнал в CSV.
+
+        Args:
+            file: Путь к файлу или текстовый файловый объект
+        """
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            with open(file, 'w', newline='', buffering=65536) as f:
+                return self.to_csv(f)
+
+        import csv
+        writer = csv.writer(file)
+        writer.writerow(('chunk', 'round', 'step', 'A', 'B', 'C', 'D', 'f', 'g', 'temp'))
+        cols = self.columns
+        for index in range(len(self)):
+            step = cols['step'][index]
+            writer.writerow((
+                cols['chunk'][index], step // 16 + 1, step % 16 + 1,
+                f"{cols['A'][index]:08x}", f"{cols['B'][index]:08x}",
+                f"{cols['C'][index]:08x}", f"{cols['D'][index]:08x}",
+                f"{cols['f'][index]:08x}", cols['g'][index],
+                f"{cols['temp'][index]:08x}",
+            ))
+
+    def to_binary(self, file):
+        """
+        Экспортирует журнал в бинарном виде (колонки uint32 little-endian).
+
+        Args:
+            file: Путь к файлу или бинарный файловый объект
+        """
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            with open(file, 'wb', buffering=65536) as f:
+                return self.to_binary(f)
+
+        file.write(_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, len(TRACE_FIELDS), len(self)))
+        for name in TRACE_FIELDS:
+            column = self.columns[name]
+            if sys.byteorder != 'little':
+                column = array('I', column)
+                column.byteswap()
+            file.write(column.tobytes())
+
+    @classmethod
+    def from_binary(cls, file):
+        """
+        Загружает журнал, сохраненный методом to_binary.
+
+        Args:
+            file: Путь к файлу или бинарный файловый объект
+
+        Returns:
+            TraceRecorder: Восстановленный журнал
+
+        Raises:
+            ValueError: Если формат файла не распознан
+        """
+        if isinstance(file, (str, bytes)) or hasattr(file, '__fspath__'):
+            with open(file, 'rb', buffering=65536) as f:
+                return cls.from_binary(f)
+
+        header = file.read(_BINARY_HEADER.size)
+        if len(header) != _BINARY_HEADER.size:
+            raise ValueError("Неожиданный конец файла трассировки")
+        magic, version, n_fields, count = _BINARY_HEADER.unpack(header)
+        if magic != _BINARY_MAGIC or version != _BINARY_VERSION or n_fields != len(TRACE_FIELDS):
+            raise ValueError("Неизвестный формат файла трассировки")
+
+        recorder = cls()
+        for name in TRACE_FIELDS:
+            raw = file.read(count * 4)
+            if len(raw) != count * 4:
+                raise ValueError("Неожиданный конец файла трассировки")
+            column = array('I')
+            column.frombytes(raw)
+            if sys.byteorder != 'little':
+                column.byteswap()
+            recorder.columns[name] = column
+        return recorder
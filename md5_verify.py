@@ -0,0 +1,177 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from md5_core import md5_file
+
+# Кодировки, которыми могут быть записаны строки манифеста
+MANIFEST_ENCODINGS = ('utf-8', 'cp1251')
+
+# Результат проверки одного файла: status = 'ok' | 'mismatch' | 'missing' | 'error'
+VerifyResult = namedtuple('VerifyResult', 'path status expected actual size error')
+
+
+class VerifyStats:
+    """Счетчики и пропускная способность проверки манифеста."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.matched = 0
+        self.mismatched = 0
+        self.missing = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result):
+        """
+        Учитывает результат проверки одного файла.
+
+        Args:
+            result: VerifyResult
+        """
+        self.files += 1
+        self.bytes += result.size
+        if result.status == 'ok':
+            self.matched += 1
+        elif result.status == 'mismatch':
+            self.mismatched += 1
+        elif result.status == 'missing':
+            self.missing += 1
+        else:
+            self.errors += 1
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def files_per_sec(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_sec(self):
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+def iter_manifest_entries(manifest_path):
+    """
+    Построчно читает манифест формата file_hashes.txt.
+
+    Файл не загружается в память целиком; каждая строка декодируется
+    первой подходящей кодировкой из MANIFEST_ENCODINGS.
+
+    Args:
+        manifest_path: Путь к файлу манифеста
+
+    Yields:
+        tuple: (относительный путь, хеш)
+
+    Raises:
+        UnicodeDecodeError: Если строку не удалось декодировать
+    """
+    with open(manifest_path, "rb", buffering=65536) as file:
+        file.readline()  # Пропускаем заголовок
+        for raw_line in file:
+            for encoding in MANIFEST_ENCODINGS:
+                try:
+                    line = raw_line.decode(encoding)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            else:
+                line = raw_line.decode(MANIFEST_ENCODINGS[0])
+            if ": " in line:
+                name, hash_value = line.strip().split(": ", 1)
+                yield name, hash_value
+
+
+def _hash_listed_file(root, name, expected):
+    """
+    Хеширует файл из манифеста (выполняется в процессе-обработчике).
+
+    Returns:
+        VerifyResult: Результат проверки файла
+    """
+    path = os.path.join(root, name)
+    try:
+        size = os.path.getsize(path)
+        actual = md5_file(path)
+    except FileNotFoundError:
+        return VerifyResult(name, 'missing', expected, None, 0, None)
+    except OSError as e:
+        return VerifyResult(name, 'error', expected, None, 0, str(e))
+
+    status = 'ok' if actual.lower() == expected.lower() else 'mismatch'
+    return VerifyResult(name, status, expected, actual, size, None)
+
+
+def verify_manifest(manifest_path, root=None, workers=None, fail_fast=False, stats=None, executor=None):
+    """
+    Проверяет файлы на диске по эталонному манифесту.
+
+    Манифест читается потоково, файлы хешируются параллельно в нескольких
+    процессах, а результаты выдаются по мере готовности, так что
+    несовпадения видны сразу, не дожидаясь конца проверки.
+
+    Args:
+        manifest_path: Путь к эталонному манифесту (file_hashes.txt)
+        root: Корневая папка проверяемых файлов (по умолчанию папка манифеста)
+        workers: Количество процессов (по умолчанию os.cpu_count(); 1 - без процессов)
+        fail_fast: Остановиться на первом несовпадении, отсутствующем файле или ошибке
+        stats: VerifyStats для накопления счетчиков или None
+        executor: Уже запущенный пул процессов для повторного использования или None
+
+    Yields:
+        VerifyResult: Результат проверки каждого файла в порядке завершения
+    """
+    if root is None:
+        root = os.path.dirname(os.path.abspath(manifest_path))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    def emit(result):
+        if stats is not None:
+            stats.add(result)
+        return result
+
+    if workers <= 1 and executor is None:
+        for name, expected in iter_manifest_entries(manifest_path):
+            result = emit(_hash_listed_file(root, name, expected))
+            yield result
+            if fail_fast and result.status != 'ok':
+                return
+        return
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as own_executor:
+            yield from _verify_with_executor(own_executor, manifest_path, root, workers, fail_fast, emit)
+    else:
+        yield from _verify_with_executor(executor, manifest_path, root, workers, fail_fast, emit)
+
+
+def _verify_with_executor(executor, manifest_path, root, workers, fail_fast, emit):
+    """Хеширует файлы манифеста в пуле процессов, ограничивая очередь задач."""
+    # Ограничиваем число задач в очереди, чтобы не читать весь манифест заранее
+    max_pending = max(workers, 1) * 4
+    entries = iter_manifest_entries(manifest_path)
+    pending = set()
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                entry = next(entries, None)
+                if entry is None:
+                    exhausted = True
+                    break
+                pending.add(executor.submit(_hash_listed_file, root, *entry))
+
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = emit(future.result())
+                yield result
+                if fail_fast and result.status != 'ok':
+                    return
+    finally:
+        for future in pending:
+            future.cancel()
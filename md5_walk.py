@@ -0,0 +1,221 @@
+import os
+import stat
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from fnmatch import fnmatchcase
+
+# Файл, найденный при обходе: полный и относительный путь, размер,
+# время изменения в наносекундах, номер inode и устройства
+WalkEntry = namedtuple('WalkEntry', 'path rel_path size mtime_ns inode dev')
+
+# Политики обработки символических ссылок
+SYMLINKS_SKIP = 'skip'      # ссылки игнорируются
+SYMLINKS_FILES = 'files'    # ссылки на файлы включаются, в ссылки на папки не заходим (как os.walk)
+SYMLINKS_FOLLOW = 'follow'  # ссылки на папки обходятся с защитой от циклов
+
+
+class WalkFilter:
+    """
+    Правила отбора файлов и папок при обходе.
+
+    Шаблоны без '/' сравниваются с именем файла, шаблоны с '/' - с путем
+    относительно корня (ведущий '/' привязывает шаблон к корню, например
+    '/file_hashes.txt'). Шаблоны исключения также отсекают целые папки.
+    """
+
+    def __init__(self, include=None, exclude=None, min_size=None, max_size=None,
+                 newer_than=None, older_than=None, symlinks=SYMLINKS_FILES,
+                 same_filesystem=False, skip_special=True):
+        """
+        Args:
+            include: Шаблоны включаемых файлов (None - все файлы)
+            exclude: Шаблоны исключаемых файлов и папок
+            min_size: Минимальный размер файла в байтах
+            max_size: Максимальный размер файла в байтах
+            newer_than: Только файлы, измененные после этого времени (Unix time)
+            older_than: Только файлы, измененные до этого времени (Unix time)
+            symlinks: Политика символических ссылок (SYMLINKS_*)
+            same_filesystem: Не переходить границы файловых систем
+            skip_special: Пропускать специальные файлы (FIFO, сокеты, устройства)
+
+        Raises:
+            ValueError: Если политика ссылок неизвестна
+        """
+        if symlinks not in (SYMLINKS_SKIP, SYMLINKS_FILES, SYMLINKS_FOLLOW):
+            raise ValueError(f"Неизвестная политика символических ссылок: {symlinks}")
+        self.include = tuple(include) if include else None
+        self.exclude = tuple(exclude) if exclude else ()
+        self.min_size = min_size
+        self.max_size = max_size
+        self.newer_than_ns = int(newer_than * 1e9) if newer_than is not None else None
+        self.older_than_ns = int(older_than * 1e9) if older_than is not None else None
+        self.symlinks = symlinks
+        self.same_filesystem = same_filesystem
+        self.skip_special = skip_special
+
+    @staticmethod
+    def _matches(patterns, name, rel_path):
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        for pattern in patterns:
+            if fnmatchcase(rel_path if '/' in pattern else name, pattern.lstrip('/')):
+                return True
+        return False
+
+    def accepts_dir(self, name, rel_path):
+        """Проверяет, нужно ли заходить в папку."""
+        return not self._matches(self.exclude, name, rel_path)
+
+    def accepts_name(self, name, rel_path):
+        """Проверяет файл по шаблонам имени."""
+        if self.exclude and self._matches(self.exclude, name, rel_path):
+            return False
+        return self.include is None or self._matches(self.include, name, rel_path)
+
+    def accepts_stat(self, st):
+        """Проверяет файл по размеру и времени изменения."""
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        if self.newer_than_ns is not None and st.st_mtime_ns <= self.newer_than_ns:
+            return False
+        if self.older_than_ns is not None and st.st_mtime_ns >= self.older_than_ns:
+            return False
+        return True
+
+
+def _scan_dir(path, rel_dir, walk_filter, root_dev, onerror):
+    """
+    Читает одну папку через os.scandir.
+
+    Returns:
+        tuple: (список WalkEntry, список (путь, относительный путь) подпапок)
+    """
+    files = []
+    subdirs = []
+    try:
+        scanner = os.scandir(path)
+    except OSError as e:
+        if onerror is not None:
+            onerror(e)
+        return files, subdirs
+
+    with scanner:
+        for entry in scanner:
+            name = entry.name
+            rel_path = rel_dir + os.sep + name if rel_dir else name
+            try:
+                is_link = entry.is_symlink()
+                if is_link and walk_filter.symlinks == SYMLINKS_SKIP:
+                    continue
+
+                if entry.is_dir(follow_symlinks=walk_filter.symlinks == SYMLINKS_FOLLOW):
+                    if walk_filter.accepts_dir(name, rel_path):
+                        subdirs.append((entry.path, rel_path))
+                    continue
+                if is_link and entry.is_dir():
+                    continue  # ссылка на папку при политике SYMLINKS_FILES
+
+                if not walk_filter.accepts_name(name, rel_path):
+                    continue
+                # Данные stat кэшируются в DirEntry (на Windows - без системного вызова)
+                st = entry.stat()
+                if walk_filter.skip_special and not stat.S_ISREG(st.st_mode):
+                    continue
+                if root_dev is not None and st.st_dev != root_dev:
+                    continue
+                if not walk_filter.accepts_stat(st):
+                    continue
+            except OSError as e:
+                if onerror is not None:
+                    onerror(e)
+                continue
+            files.append(WalkEntry(entry.path, rel_path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev))
+    return files, subdirs
+
+
+def iter_files(root, walk_filter=None, workers=1, onerror=None):
+    """
+    Обходит дерево папок и выдает подходящие файлы в произвольном порядке.
+
+    При workers > 1 папки читаются параллельно в пуле потоков
+    (os.scandir освобождает GIL на время системных вызовов).
+
+    Args:
+        root: Корневая папка
+        walk_filter: WalkFilter или None (все обычные файлы, как os.walk)
+        workers: Количество потоков для чтения папок
+        onerror: Функция, вызываемая с OSError при ошибках чтения, или None
+
+    Yields:
+        WalkEntry: Найденные файлы
+    """
+    if walk_filter is None:
+        walk_filter = WalkFilter()
+    root = os.fspath(root)
+    root_stat = os.stat(root)
+    root_dev = root_stat.st_dev if walk_filter.same_filesystem else None
+    follow = walk_filter.symlinks == SYMLINKS_FOLLOW
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+
+    def admit(path):
+        # Защита от циклов и пересечения границ ФС при обходе ссылок
+        if not follow and root_dev is None:
+            return True
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+            return False
+        if root_dev is not None and st.st_dev != root_dev:
+            return False
+        if follow:
+            key = (st.st_dev, st.st_ino)
+            if key in visited:
+                return False
+            visited.add(key)
+        return True
+
+    if workers <= 1:
+        stack = [(root, '')]
+        while stack:
+            path, rel_dir = stack.pop()
+            files, subdirs = _scan_dir(path, rel_dir, walk_filter, root_dev, onerror)
+            yield from files
+            stack.extend(d for d in reversed(subdirs) if admit(d[0]))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_dir, root, '', walk_filter, root_dev, onerror)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                for path, rel_dir in subdirs:
+                    if admit(path):
+                        pending.add(executor.submit(_scan_dir, path, rel_dir, walk_filter, root_dev, onerror))
+                yield from files
+
+
+def walk_files(root, walk_filter=None, workers=1, onerror=None):
+    """
+    Возвращает подходящие файлы дерева, отсортированные по относительному пути.
+
+    Порядок совпадает с сортировкой полных путей, которую использовали
+    обработчики папок на основе os.walk.
+
+    Args:
+        root: Корневая папка
+        walk_filter: WalkFilter или None
+        workers: Количество потоков для чтения папок
+        onerror: Функция для обработки OSError или None
+
+    Returns:
+        list: Список WalkEntry
+    """
+    entries = list(iter_files(root, walk_filter, workers, onerror))
+    entries.sort(key=lambda entry: entry.path)
+    return entries
+
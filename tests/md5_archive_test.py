@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from md5_archive import archive_folder_hash, hash_archive, write_archive_manifest
+from md5_scan import MANIFEST_NAME, scan_folder
+
+
+class ArchiveManifestTest(unittest.TestCase):
+    """Манифест и хеш папки архива совпадают с распакованным деревом."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self._tmp.name, "src")
+        os.makedirs(os.path.join(self.source, "d"))
+        for rel_path, data in (("a.txt", b"alpha"), ("d/b.txt", b"beta"), ("later.txt", b"late"),
+                               ("empty", b""), (MANIFEST_NAME, b"root manifest is excluded")):
+            with open(os.path.join(self.source, *rel_path.split("/")), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self._tmp.name, name)
+
+    def _assert_matches_extracted(self, archive_path, extracted):
+        entries = hash_archive(archive_path)
+        self.assertEqual(archive_folder_hash(entries), scan_folder(extracted).folder_hash)
+
+        archive_manifest = self._path("archive_manifest.txt")
+        folder_manifest = self._path("folder_manifest.txt")
+        write_archive_manifest(entries, archive_manifest)
+        scan_folder(extracted, folder_manifest)
+        with open(archive_manifest) as a, open(folder_manifest) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_tar_gz(self):
+        archive_path = self._path("tree.tar.gz")
+        with tarfile.open(archive_path, "w:gz") as tar:
+            tar.add(self.source, arcname=".")
+        extracted = self._path("out")
+        with tarfile.open(archive_path) as tar:
+            tar.extractall(extracted)
+        self._assert_matches_extracted(archive_path, extracted)
+
+    @unittest.skipUnless(hasattr(os, "symlink") and hasattr(os, "link"), "нужны жесткие и символические ссылки")
+    def test_tar_links(self):
+        try:
+            os.link(os.path.join(self.source, "a.txt"), os.path.join(self.source, "hard.txt"))
+            os.symlink("a.txt", os.path.join(self.source, "sym.txt"))
+            os.symlink("later.txt", os.path.join(self.source, "early.txt"))
+            os.symlink("../sym.txt", os.path.join(self.source, "d", "chain.txt"))
+            os.symlink("d", os.path.join(self.source, "dirlink"))
+        except OSError as e:
+            self.skipTest(f"ссылки недоступны: {e}")
+
+        archive_path = self._path("links.tar")
+        with tarfile.open(archive_path, "w") as tar:
+            tar.add(self.source, arcname=".")
+        extracted = self._path("out")
+        with tarfile.open(archive_path) as tar:
+            tar.extractall(extracted)
+        self._assert_matches_extracted(archive_path, extracted)
+
+    def test_unresolved_symlink_raises(self):
+        archive_path = self._path("broken.tar")
+        with tarfile.open(archive_path, "w") as tar:
+            info = tarfile.TarInfo("dangling")
+            info.type = tarfile.SYMTYPE
+            info.linkname = "missing"
+            tar.addfile(info)
+        with self.assertRaises(ValueError):
+            hash_archive(archive_path)
+
+    def test_zip(self):
+        archive_path = self._path("tree.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for directory, _, names in os.walk(self.source):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    archive.write(path, os.path.relpath(path, self.source))
+        extracted = self._path("out")
+        with zipfile.ZipFile(archive_path) as archive:
+            archive.extractall(extracted)
+        self._assert_matches_extracted(archive_path, extracted)
+
+    def test_single_gzip(self):
+        archive_path = self._path("data.bin.gz")
+        data = os.urandom(5000)
+        with gzip.open(archive_path, "wb") as f:
+            f.write(data)
+        entries = hash_archive(archive_path)
+        self.assertEqual([tuple(entry) for entry in entries], [("data.bin", 5000, hashlib.md5(data).hexdigest())])
+
+    def test_paths_are_confined_to_archive(self):
+        archive_path = self._path("escape.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("../evil.txt", b"evil")
+            archive.writestr("/abs.txt", b"abs")
+            archive.writestr("ok/file.txt", b"ok")
+        self.assertEqual([entry.rel_path for entry in hash_archive(archive_path)],
+                         ["abs.txt", os.path.join("ok", "file.txt")])
+
+    def test_unknown_format_raises(self):
+        path = self._path("plain.txt")
+        with open(path, "wb") as f:
+            f.write(b"not an archive")
+        with self.assertRaises(ValueError):
+            hash_archive(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
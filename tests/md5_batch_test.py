@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from md5_batch import _hash_small_batch, _iter_batches, hash_entries
+from md5_walk import walk_files
+
+
+class HashEntriesTest(unittest.TestCase):
+    """Хеширование файлов обходчика пакетами в пуле и в одном процессе."""
+
+    SIZES = (0, 1, 100, 900, 3000, 64, 5000, 10, 10, 2000)
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.expected = {}
+        for i, size in enumerate(self.SIZES):
+            path = os.path.join(self.root, f"f{i:02}.bin")
+            data = os.urandom(size)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.expected[path] = hashlib.md5(data).hexdigest()
+        self.entries = walk_files(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_order_and_digests(self):
+        for workers in (1, 2):
+            for batch_files, batch_bytes in ((512, 1 << 20), (3, 1 << 20), (512, 100)):
+                with self.subTest(workers=workers, batch_files=batch_files, batch_bytes=batch_bytes):
+                    results = list(hash_entries(self.entries, workers=workers, threshold=1024,
+                                                batch_files=batch_files, batch_bytes=batch_bytes))
+                    self.assertEqual([entry for entry, _, _ in results], self.entries)
+                    self.assertEqual([digest for _, digest, _ in results],
+                                     [self.expected[entry.path] for entry in self.entries])
+                    self.assertTrue(all(error is None for _, _, error in results))
+
+    def test_missing_files_are_reported(self):
+        removed = {self.entries[2].path, self.entries[4].path}
+        for path in removed:
+            os.remove(path)
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                results = list(hash_entries(self.entries, workers=workers, threshold=1024, batch_files=3))
+                self.assertEqual([entry for entry, _, _ in results], self.entries)
+                for entry, digest, error in results:
+                    if entry.path in removed:
+                        self.assertIsNone(digest)
+                        self.assertIsNotNone(error)
+                    else:
+                        self.assertEqual(digest, self.expected[entry.path])
+
+    def test_file_grown_past_threshold(self):
+        path = self.entries[1].path
+        data = os.urandom(4000)
+        with open(path, "wb") as f:
+            f.write(data)
+        for timed in (False, True):
+            with self.subTest(timed=timed):
+                digests, errors, timings = _hash_small_batch([self.entries[0].path, path], 1024, timed=timed)
+                self.assertEqual(errors, {})
+                self.assertEqual(digests[16:].hex(), hashlib.md5(data).hexdigest())
+                self.assertEqual(digests[:16].hex(), self.expected[self.entries[0].path])
+                self.assertEqual(timings is None, not timed)
+
+    def test_batches(self):
+        batches = list(_iter_batches(self.entries, 1024, 3, 1 << 20))
+        self.assertEqual([entry for batch, _ in batches for entry in batch], self.entries)
+        for batch, small in batches:
+            if small:
+                self.assertLessEqual(len(batch), 3)
+                self.assertTrue(all(entry.size <= 1024 for entry in batch))
+            else:
+                self.assertEqual(len(batch), 1)
+                self.assertGreater(batch[0].size, 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import hashlib
+import hmac
+import unittest
+
+from md5_cache import (ENTRY_OVERHEAD, POLICY_TINYLFU, FrequencySketch, HashCache, MemoizedHasher)
+
+
+class HashCacheTest(unittest.TestCase):
+    """Кэш с ограничением по объему и вытеснением."""
+
+    def test_lru_eviction_by_bytes(self):
+        cache = HashCache(max_bytes=3 * (100 + ENTRY_OVERHEAD), max_item_size=1000)
+        for key in ("a", "b", "c"):
+            cache.put(key, key.upper(), 100)
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("d", "D", 100)
+        # "b" использовался давнее всех и вытеснен, объем не превышает бюджет
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([cache.get(key) for key in ("a", "c", "d")], ["A", "C", "D"])
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+
+        cache.put("e", "E", 250)
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 3)
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["bytes"], cache.max_bytes)
+
+    def test_replace_updates_size(self):
+        cache = HashCache(max_bytes=10000)
+        cache.put("a", "1", 100)
+        cache.put("a", "2", 300)
+        self.assertEqual((len(cache), cache.bytes, cache.get("a")), (1, 300 + ENTRY_OVERHEAD, "2"))
+
+    def test_large_items_are_not_cached(self):
+        cache = HashCache(max_bytes=10000, max_item_size=50)
+        cache.put("big", "X", 51)
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.stats()["rejected"], 1)
+
+    def test_tinylfu_admission(self):
+        cache = HashCache(max_bytes=2 * (10 + ENTRY_OVERHEAD), policy=POLICY_TINYLFU)
+        for _ in range(5):
+            cache.get("hot1")
+            cache.get("hot2")
+        cache.put("hot1", 1, 10)
+        cache.put("hot2", 2, 10)
+        # Редкий ключ не вытесняет часто используемые
+        cache.get("rare")
+        cache.put("rare", 3, 10)
+        self.assertIsNone(cache.get("rare"))
+        self.assertEqual((cache.get("hot1"), cache.get("hot2")), (1, 2))
+        self.assertEqual(cache.stats()["rejected"], 1)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            HashCache(policy="fifo")
+
+
+class FrequencySketchTest(unittest.TestCase):
+    """Счетчик частот TinyLFU."""
+
+    def test_estimate_and_aging(self):
+        sketch = FrequencySketch(width=64, sample_size=1000)
+        for _ in range(20):
+            sketch.add("key")
+        self.assertGreaterEqual(sketch.estimate("key"), 20)
+        for i in range(1000):
+            sketch.add(i)
+        # После уменьшения счетчиков старая популярность забывается
+        self.assertLess(sketch.estimate("key"), 20)
+
+
+class MemoizedHasherTest(unittest.TestCase):
+    """Кэширующие функции хеширования."""
+
+    def test_results_match_hashlib(self):
+        hasher = MemoizedHasher(HashCache(max_item_size=100))
+        for _ in range(2):
+            self.assertEqual(hasher.md5(b"data"), hashlib.md5(b"data").hexdigest())
+            self.assertEqual(hasher.md5(memoryview(b"view")), hashlib.md5(b"view").hexdigest())
+            self.assertEqual(hasher.md5_string("строка"), hashlib.md5("строка".encode()).hexdigest())
+            self.assertEqual(hasher.hmac_md5_string("ключ", "текст"),
+                             hmac.new("ключ".encode(), "текст".encode(), "md5").hexdigest())
+        self.assertEqual(hasher.cache.stats()["hits"], 4)
+
+        # Входы больше max_item_size хешируются без кэша
+        big = b"x" * 200
+        self.assertEqual(hasher.md5(big), hashlib.md5(big).hexdigest())
+        self.assertEqual(len(hasher.cache), 4)
+
+    def test_hmac_keys_are_not_stored(self):
+        hasher = MemoizedHasher()
+        self.assertNotEqual(hasher.hmac_md5_string("key1", "m"), hasher.hmac_md5_string("key2", "m"))
+        for cache_key in hasher.cache._entries:
+            self.assertNotIn("key1", cache_key)
+            self.assertNotIn("key2", cache_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
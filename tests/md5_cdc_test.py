@@ -0,0 +1,82 @@
+import hashlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import md5_cdc
+from md5_cdc import chunk_file, dedup_report, iter_chunks
+
+# Небольшие размеры чанков, чтобы тесты с MD5 на чистом Python шли быстро
+SIZES = dict(min_size=64, avg_size=256, max_size=1024)
+
+
+def random_bytes(size, seed):
+    return random.Random(seed).randbytes(size)
+
+
+class ContentDefinedChunkingTest(unittest.TestCase):
+    """Разбиение FastCDC и хеши чанков."""
+
+    def test_chunks_cover_data(self):
+        data = random_bytes(50000, 1)
+        chunks = list(iter_chunks(io.BytesIO(data), **SIZES))
+        offset = 0
+        for chunk in chunks:
+            self.assertEqual(chunk.offset, offset)
+            self.assertLessEqual(chunk.length, SIZES['max_size'])
+            self.assertEqual(chunk.md5, hashlib.md5(data[offset:offset + chunk.length]).hexdigest())
+            offset += chunk.length
+        self.assertEqual(offset, len(data))
+        # Все чанки, кроме последнего, не меньше минимального размера
+        self.assertTrue(all(chunk.length >= SIZES['min_size'] for chunk in chunks[:-1]))
+
+    def test_cut_points_survive_insertion(self):
+        data = random_bytes(40000, 2)
+        original = list(iter_chunks(io.BytesIO(data), **SIZES))
+        inserted = b"inserted bytes"
+        shifted = list(iter_chunks(io.BytesIO(inserted + data), **SIZES))
+
+        # После нескольких чанков у начала границы совпадают со сдвигом на длину вставки
+        cuts = {chunk.offset + chunk.length for chunk in original}
+        shifted_cuts = {chunk.offset + chunk.length - len(inserted) for chunk in shifted}
+        self.assertGreater(len(cuts & shifted_cuts), len(cuts) * 0.9)
+        same = {chunk.md5 for chunk in original} & {chunk.md5 for chunk in shifted}
+        self.assertGreater(len(same), len(original) * 0.9)
+
+    def test_independent_of_read_size(self):
+        data = random_bytes(20000, 3)
+        expected = list(iter_chunks(io.BytesIO(data), **SIZES))
+        with mock.patch.object(md5_cdc, "_READ_SIZE", 100):
+            self.assertEqual(list(iter_chunks(io.BytesIO(data), **SIZES)), expected)
+
+    def test_small_and_empty_input(self):
+        self.assertEqual(list(iter_chunks(io.BytesIO(b""), **SIZES)), [])
+        chunks = list(iter_chunks(io.BytesIO(b"short"), **SIZES))
+        self.assertEqual([(chunk.offset, chunk.length) for chunk in chunks], [(0, 5)])
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            list(iter_chunks(io.BytesIO(b"data"), min_size=512, avg_size=256, max_size=1024))
+        with self.assertRaises(ValueError):
+            list(iter_chunks(io.BytesIO(b"data"), min_size=0, avg_size=256, max_size=1024))
+
+    def test_dedup_report(self):
+        data = random_bytes(20000, 4)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.bin", "b.bin"):
+                with open(os.path.join(tmp, name), "wb") as f:
+                    f.write(data)
+            self.assertEqual(chunk_file(os.path.join(tmp, "a.bin"), **SIZES),
+                             list(iter_chunks(io.BytesIO(data), **SIZES)))
+            report = dedup_report(tmp, **SIZES)
+        self.assertEqual(report["files"], 2)
+        self.assertEqual(report["total_bytes"], 2 * len(data))
+        self.assertEqual(report["unique_bytes"], len(data))
+        self.assertEqual(report["dedup_ratio"], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import md5_copy
+from md5_copy import copy_and_hash, copy_tree_and_hash
+from md5_scan import MANIFEST_NAME, scan_folder
+
+
+class CopyAndHashTest(unittest.TestCase):
+    """Копирование с хешированием за один проход чтения."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.source = os.path.join(self.tmp, "source.bin")
+        self.data = os.urandom(70000)
+        with open(self.source, "wb") as f:
+            f.write(self.data)
+        os.utime(self.source, ns=(1_000_000_000, 1_500_000_000))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_copy(self):
+        destination = os.path.join(self.tmp, "copy.bin")
+        for buffer_size in (1000, 65536):
+            with self.subTest(buffer_size=buffer_size):
+                result = copy_and_hash(self.source, destination, verify=True, depth=2, buffer_size=buffer_size)
+                self.assertEqual(result, (destination, len(self.data), hashlib.md5(self.data).hexdigest(), True))
+                with open(destination, "rb") as f:
+                    self.assertEqual(f.read(), self.data)
+                self.assertEqual(os.stat(destination).st_mtime_ns, 1_500_000_000)
+        self.assertIsNone(copy_and_hash(self.source, destination).verified)
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["copy.bin", "source.bin"])
+
+    def test_verification_failure(self):
+        destination = os.path.join(self.tmp, "copy.bin")
+        with mock.patch.object(md5_copy, "md5_file_sequential", return_value="0" * 32):
+            result = copy_and_hash(self.source, destination, verify=True)
+        self.assertIs(result.verified, False)
+        self.assertEqual(result.md5, hashlib.md5(self.data).hexdigest())
+
+    def test_read_error_removes_partial_file(self):
+        destination = os.path.join(self.tmp, "copy.bin")
+        with mock.patch.object(md5_copy, "md5_stream_pipelined", side_effect=OSError("ошибка чтения")):
+            with self.assertRaises(OSError):
+                copy_and_hash(self.source, destination)
+        self.assertEqual(os.listdir(self.tmp), ["source.bin"])
+
+    def test_copy_tree(self):
+        source_root = os.path.join(self.tmp, "tree")
+        os.makedirs(os.path.join(source_root, "d"))
+        for rel_path in ("a.txt", os.path.join("d", "b.txt"), MANIFEST_NAME):
+            with open(os.path.join(source_root, rel_path), "wb") as f:
+                f.write(os.urandom(300))
+        destination_root = os.path.join(self.tmp, "copy")
+        progress = []
+        results = copy_tree_and_hash(source_root, destination_root, verify=True,
+                                     progress=lambda result, done, total: progress.append((done, total)))
+
+        self.assertEqual([result.rel_path for result in results], ["a.txt", os.path.join("d", "b.txt")])
+        self.assertTrue(all(result.verified for result in results))
+        self.assertEqual(progress, [(1, 2), (2, 2)])
+        with open(os.path.join(destination_root, MANIFEST_NAME), encoding="utf-8") as f:
+            copied = f.read()
+        # Манифест копии совпадает с манифестом, который строит сканирование исходной папки
+        manifest = os.path.join(self.tmp, "source_manifest.txt")
+        scan_folder(source_root, manifest)
+        with open(manifest, encoding="utf-8") as f:
+            self.assertEqual(copied, f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
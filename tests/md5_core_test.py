@@ -0,0 +1,288 @@
+import hashlib
+import hmac
+import mmap
+import os
+import pathlib
+import random
+import tempfile
+import unittest
+from array import array
+
+from md5_core import (MD5State, MD5Prefix, IncrementalHasher, md5, md5_many, md5_file_resumable, _save_checkpoint,
+                      hmac_md5, hmac_md5_file, hmac_md5_state, md5_with_viz, set_many_engine)
+
+
+class MD5StateTest(unittest.TestCase):
+    """Потоковое состояние MD5 и его сериализация в сравнении с hashlib."""
+
+    LENGTHS = (0, 1, 55, 56, 63, 64, 65, 127, 128, 1000, 4097)
+
+    def test_matches_hashlib(self):
+        for length in self.LENGTHS:
+            data = os.urandom(length)
+            with self.subTest(length=length):
+                state = MD5State()
+                state.update(data)
+                self.assertEqual(state.hexdigest(), hashlib.md5(data).hexdigest())
+                self.assertEqual(state.digest(), hashlib.md5(data).digest())
+                self.assertEqual(md5(data), hashlib.md5(data).hexdigest())
+
+    def test_arbitrary_chunking(self):
+        rng = random.Random(29)
+        data = os.urandom(5000)
+        for _ in range(20):
+            state = MD5State()
+            pos = 0
+            while pos < len(data):
+                step = rng.randint(0, 200)
+                state.update(memoryview(data)[pos:pos + step])
+                pos += step
+            self.assertEqual(state.hexdigest(), hashlib.md5(data).hexdigest())
+
+    def test_digest_does_not_finalize(self):
+        state = MD5State()
+        state.update(b"abc")
+        state.digest()
+        state.update(b"def")
+        self.assertEqual(state.hexdigest(), hashlib.md5(b"abcdef").hexdigest())
+
+    def test_copy_is_independent(self):
+        state = MD5State()
+        state.update(b"prefix-" * 20)
+        other = state.copy()
+        other.update(b"tail")
+        self.assertEqual(state.hexdigest(), hashlib.md5(b"prefix-" * 20).hexdigest())
+        self.assertEqual(other.hexdigest(), hashlib.md5(b"prefix-" * 20 + b"tail").hexdigest())
+
+    def test_export_import_round_trip(self):
+        data = os.urandom(3000)
+        for split in (0, 1, 63, 64, 100, 2999, 3000):
+            with self.subTest(split=split):
+                state = MD5State()
+                state.update(data[:split])
+                restored = MD5State.import_state(state.export_state())
+                restored.update(data[split:])
+                self.assertEqual(restored.hexdigest(), hashlib.md5(data).hexdigest())
+
+    def test_import_rejects_invalid_blobs(self):
+        blob = bytearray(MD5State().export_state())
+        with self.assertRaises(ValueError):
+            MD5State.import_state(bytes(blob[:-1]))
+        blob[0] ^= 0xFF
+        with self.assertRaises(ValueError):
+            MD5State.import_state(bytes(blob))
+
+
+class BufferInputTest(unittest.TestCase):
+    """Входные данные с протоколом буфера."""
+
+    def test_md5_buffer_types(self):
+        data = os.urandom(1000)
+        expected = hashlib.md5(data).hexdigest()
+        for value in (bytearray(data), memoryview(data), array('B', data), array('I', data[:1000])):
+            with self.subTest(type=type(value).__name__):
+                self.assertEqual(md5(value), expected)
+
+    def test_non_contiguous_and_sliced_views(self):
+        data = os.urandom(1000)
+        self.assertEqual(md5(memoryview(data)[::2]), hashlib.md5(data[::2]).hexdigest())
+        self.assertEqual(md5(memoryview(data)[10:500]), hashlib.md5(data[10:500]).hexdigest())
+        self.assertEqual(md5_with_viz(memoryview(data)[3:70]), hashlib.md5(data[3:70]).hexdigest())
+
+    def test_mmap(self):
+        data = os.urandom(5000)
+        with tempfile.TemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertEqual(md5(mm), hashlib.md5(data).hexdigest())
+
+    def test_rejects_str(self):
+        with self.assertRaises(TypeError):
+            md5("text")
+        with self.assertRaises(TypeError):
+            md5_with_viz("text")
+
+    def test_hmac(self):
+        message = os.urandom(3000)
+        for key in (b"", b"key", os.urandom(64), os.urandom(100)):
+            with self.subTest(key_length=len(key)):
+                expected = hmac.new(key, message, hashlib.md5).hexdigest()
+                self.assertEqual(hmac_md5(key, message), expected)
+                self.assertEqual(hmac_md5(memoryview(key), bytearray(message)), expected)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.bin")
+            with open(path, "wb") as f:
+                f.write(message)
+            self.assertEqual(hmac_md5_file(b"key", path), hmac.new(b"key", message, hashlib.md5).hexdigest())
+
+
+class ResumableFileTest(unittest.TestCase):
+    """Хеширование файла с контрольными точками."""
+
+    def test_resume_from_checkpoint(self):
+        data = os.urandom(200000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            checkpoint = os.path.join(tmp, "data.md5state")
+
+            # Контрольная точка прерванного запуска: первые 65536 байт уже обработаны
+            state = MD5State()
+            state.update(data[:65536])
+            _save_checkpoint(checkpoint, os.stat(path), state)
+
+            self.assertEqual(md5_file_resumable(path, checkpoint, checkpoint_every=65536),
+                             hashlib.md5(data).hexdigest())
+            self.assertFalse(os.path.exists(checkpoint))
+
+    def test_stale_checkpoint_is_ignored(self):
+        data = os.urandom(100000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            checkpoint = path + ".md5state"
+
+            # Контрольная точка от прежнего содержимого файла того же размера
+            state = MD5State()
+            state.update(os.urandom(65536))
+            _save_checkpoint(checkpoint, os.stat(path), state)
+            os.utime(path, ns=(0, 10 ** 9))
+
+            self.assertEqual(md5_file_resumable(path), hashlib.md5(data).hexdigest())
+            self.assertFalse(os.path.exists(checkpoint))
+
+    def test_pathlib_checkpoint_path(self):
+        data = os.urandom(100000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp, "data.bin")
+            path.write_bytes(data)
+            checkpoint = pathlib.Path(tmp, "data.md5state")
+            state = MD5State()
+            state.update(data[:65536])
+            _save_checkpoint(checkpoint, path.stat(), state)
+            self.assertTrue(checkpoint.exists())
+            self.assertFalse(pathlib.Path(tmp, "data.md5state.tmp").exists())
+
+            self.assertEqual(md5_file_resumable(path, checkpoint, checkpoint_every=65536),
+                             hashlib.md5(data).hexdigest())
+
+
+class IncrementalHasherTest(unittest.TestCase):
+    """Повторное хеширование изменяющихся данных с промежуточными состояниями."""
+
+    def test_edits_match_hashlib(self):
+        hasher = IncrementalHasher(checkpoint_interval=128)
+        data = os.urandom(700)
+        edits = [data, data + b"tail", data[:300], data[:300] + b"x" * 500, b"", data[:63], b"changed" + data]
+        for edit in edits:
+            with self.subTest(length=len(edit)):
+                self.assertEqual(hasher.hash(edit).hexdigest(), hashlib.md5(edit).hexdigest())
+
+    def test_append_resumes_from_checkpoint(self):
+        hasher = IncrementalHasher(checkpoint_interval=64)
+        data = os.urandom(1000)
+        hasher.hash(data)
+        self.assertEqual(hasher._resume_point(data + b"more"), len(hasher._checkpoints) - 1)
+        self.assertEqual(hasher._resume_point(b"?" + data[1:]), 0)
+
+    def test_cancel(self):
+        hasher = IncrementalHasher(checkpoint_interval=64)
+        data = os.urandom(1000)
+        self.assertIsNone(hasher.hash(data, cancelled=lambda: True))
+        self.assertEqual(hasher.hash(data).hexdigest(), hashlib.md5(data).hexdigest())
+
+    def test_initial_state_for_hmac(self):
+        key = b"secret key"
+        inner, outer = hmac_md5_state(key)
+        hasher = IncrementalHasher(inner)
+        message = os.urandom(300)
+        outer.update(hasher.hash(message).digest())
+        self.assertEqual(outer.hexdigest(), hmac.new(key, message, "md5").hexdigest())
+
+
+class MD5ManyTest(unittest.TestCase):
+    """Пакетное хеширование и общий префикс."""
+
+    def setUp(self):
+        self.items = [os.urandom(n) for n in (0, 1, 55, 56, 64, 65, 300)] + ["строка", ""]
+
+    @staticmethod
+    def _expected(item, prefix=b""):
+        if isinstance(item, str):
+            item = item.encode("utf-8")
+        return hashlib.md5(prefix + item)
+
+    def test_packed_and_hex(self):
+        packed = md5_many(self.items)
+        self.assertEqual(packed, b"".join(self._expected(item).digest() for item in self.items))
+        self.assertEqual(md5_many(self.items, hex=True), [self._expected(item).hexdigest() for item in self.items])
+
+    def test_generator_input(self):
+        self.assertEqual(md5_many(item for item in self.items), md5_many(self.items))
+        self.assertEqual(md5_many([]), b"")
+
+    def test_engine(self):
+        calls = []
+
+        def engine(batch):
+            calls.append(len(batch))
+            return b"".join(hashlib.md5(item).digest() for item in batch)
+
+        set_many_engine(engine, min_batch=5)
+        try:
+            self.assertEqual(md5_many(self.items), b"".join(self._expected(item).digest() for item in self.items))
+            self.assertEqual(md5_many(self.items[:2], hex=True), [self._expected(item).hexdigest()
+                                                                  for item in self.items[:2]])
+            self.assertEqual(calls, [len(self.items)])
+
+            set_many_engine(lambda batch: b"short", min_batch=1)
+            with self.assertRaises(ValueError):
+                md5_many(self.items)
+        finally:
+            set_many_engine(None)
+
+
+class MD5PrefixTest(unittest.TestCase):
+    """Сжатый общий префикс для хеширования множества суффиксов."""
+
+    PREFIXES = (b"", b"p", os.urandom(63), os.urandom(64), os.urandom(65), os.urandom(130))
+    SUFFIXES = (b"", b"s", os.urandom(55), os.urandom(64), os.urandom(200))
+
+    def test_digest(self):
+        for prefix in self.PREFIXES:
+            compressed = MD5Prefix(prefix)
+            self.assertEqual(len(compressed), len(prefix))
+            for suffix in self.SUFFIXES:
+                with self.subTest(prefix_length=len(prefix), suffix_length=len(suffix)):
+                    expected = hashlib.md5(prefix + suffix)
+                    self.assertEqual(compressed.digest(suffix), expected.digest())
+                    self.assertEqual(compressed.hexdigest(bytearray(suffix)), expected.hexdigest())
+                    self.assertEqual(compressed.digest(memoryview(suffix)), expected.digest())
+
+    def test_str_prefix_and_suffix(self):
+        self.assertEqual(MD5Prefix("префикс").hexdigest("суффикс"), hashlib.md5("префикссуффикс".encode()).hexdigest())
+
+    def test_md5_many_with_prefix(self):
+        items = [os.urandom(n) for n in (0, 1, 55, 64, 300)] + ["строка"]
+        for prefix in self.PREFIXES:
+            with self.subTest(prefix_length=len(prefix)):
+                expected = [hashlib.md5(prefix + (item.encode() if isinstance(item, str) else item)).hexdigest()
+                            for item in items]
+                self.assertEqual(md5_many(items, hex=True, prefix=prefix), expected)
+                self.assertEqual(md5_many(items, hex=True, prefix=MD5Prefix(prefix)), expected)
+
+    def test_state(self):
+        prefix = MD5Prefix(b"x" * 100)
+        state = prefix.state()
+        state.update(b"suffix")
+        self.assertEqual(state.hexdigest(), hashlib.md5(b"x" * 100 + b"suffix").hexdigest())
+        self.assertEqual(prefix.hexdigest(b"suffix"), state.hexdigest())
+        # Продолжение состояния не меняет сам префикс
+        self.assertEqual(prefix.hexdigest(), hashlib.md5(b"x" * 100).hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
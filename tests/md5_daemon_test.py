@@ -0,0 +1,181 @@
+import hashlib
+import hmac
+import io
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from md5_daemon import FileHashCache, MD5Daemon, _RequestHandler
+from md5_daemon_client import (MD5DaemonClient, ProtocolError, _FRAME, main, parse_manifest_body,
+                               recv_frame, send_frame)
+from md5_scan import scan_folder
+
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX") and hasattr(socketserver, "ThreadingUnixStreamServer")
+
+
+@unittest.skipUnless(HAS_UNIX_SOCKETS, "Unix-сокеты не поддерживаются")
+class ProtocolTest(unittest.TestCase):
+    """Кадры протокола демона."""
+
+    def setUp(self):
+        self.left, self.right = socket.socketpair(socket.AF_UNIX)
+
+    def tearDown(self):
+        self.left.close()
+        self.right.close()
+
+    def test_round_trip(self):
+        send_frame(self.left, {"op": "hash", "имя": "значение"}, b"\x00body")
+        send_frame(self.left, {"op": "ping"})
+        self.assertEqual(recv_frame(self.right), ({"op": "hash", "имя": "значение"}, b"\x00body"))
+        self.assertEqual(recv_frame(self.right), ({"op": "ping"}, b""))
+        self.left.close()
+        self.assertIsNone(recv_frame(self.right))
+
+    def test_truncated_and_invalid_frames(self):
+        self.left.sendall(_FRAME.pack(10, 0) + b"{}")
+        self.left.close()
+        with self.assertRaises(ProtocolError):
+            recv_frame(self.right)
+
+    def test_invalid_header(self):
+        self.left.sendall(_FRAME.pack(3, 0) + b"{x}")
+        with self.assertRaises(ProtocolError):
+            recv_frame(self.right)
+
+    def test_manifest_body(self):
+        digest = "0" * 32
+        body = f"{digest}a.txt\0{digest.replace('0', 'f')}папка/b.txt\0".encode("utf-8")
+        self.assertEqual(parse_manifest_body(body), [["a.txt", digest], ["папка/b.txt", "f" * 32]])
+        self.assertEqual(parse_manifest_body(b""), [])
+
+
+class FileHashCacheTest(unittest.TestCase):
+    """LRU-кэш хешей файлов демона."""
+
+    def test_eviction_and_staleness(self):
+        cache = FileHashCache(max_entries=2)
+        cache.put("a", (1, 1, 1), "hash-a")
+        cache.put("b", (1, 1, 2), "hash-b")
+        self.assertEqual(cache.get("a", (1, 1, 1)), "hash-a")
+        cache.put("c", (1, 1, 3), "hash-c")
+        # "b" давно не использовался и вытеснен
+        self.assertIsNone(cache.get("b", (1, 1, 2)))
+        self.assertEqual(len(cache), 2)
+        # Измененный файл (другой ключ) - промах
+        self.assertIsNone(cache.get("a", (2, 1, 1)))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+@unittest.skipUnless(HAS_UNIX_SOCKETS, "Unix-сокеты не поддерживаются")
+class DaemonTest(unittest.TestCase):
+    """Демон на временном сокете и его клиент."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls._tmp.name, "md5.sock")
+        cls.server = socketserver.ThreadingUnixStreamServer(cls.socket_path, _RequestHandler)
+        cls.server.daemon_threads = True
+        cls.server.daemon = MD5Daemon(workers=2)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.thread.join()
+        cls.server.server_close()
+        cls.server.daemon.close()
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(dir=self._tmp.name)
+        self.names = [f"f{i}.bin" for i in range(6)] + [os.path.join("папка", "g.txt")]
+        os.makedirs(os.path.join(self.root, "папка"))
+        for name in self.names:
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(os.urandom(700))
+        self.client = MD5DaemonClient(self.socket_path, timeout=60)
+
+    def tearDown(self):
+        self.client.close()
+
+    def digest(self, name):
+        with open(os.path.join(self.root, name), "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    def write_manifest(self, overrides=None):
+        overrides = overrides or {}
+        path = os.path.join(self.root, "file_hashes.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Файл\tMD5 Хеш\n")
+            for name in sorted(self.names):
+                f.write(f"{name}: {overrides.get(name) or self.digest(name)}\n")
+        return path
+
+    def test_hash_requests(self):
+        self.assertTrue(self.client.ping())
+        self.assertEqual(self.client.md5("строка"), hashlib.md5("строка".encode()).hexdigest())
+        self.assertEqual(self.client.md5(b""), hashlib.md5(b"").hexdigest())
+        self.assertEqual(self.client.hmac_md5(b"key", "сообщение"),
+                         hmac.new(b"key", "сообщение".encode(), "md5").hexdigest())
+        path = os.path.join(self.root, "f0.bin")
+        self.assertEqual(self.client.md5_file(path), self.digest("f0.bin"))
+
+    def test_file_cache_hits(self):
+        path = os.path.join(self.root, "f1.bin")
+        self.client.md5_file(path)
+        hits = self.client.stats()["cache_hits"]
+        self.assertEqual(self.client.md5_file(path), self.digest("f1.bin"))
+        self.assertEqual(self.client.stats()["cache_hits"], hits + 1)
+
+    def test_manifest_matches_scan(self):
+        result = self.client.manifest(self.root)
+        manifest = os.path.join(self._tmp.name, "scan_manifest.txt")
+        self.assertEqual(result["folder_hash"], scan_folder(self.root, manifest).folder_hash)
+        with open(manifest, encoding="utf-8") as f:
+            lines = f.read().splitlines()[1:]
+        self.assertEqual([f"{rel_path}: {digest}" for rel_path, digest in result["files"]], lines)
+
+    def test_verify(self):
+        manifest = self.write_manifest({"f2.bin": "0" * 32})
+        os.remove(os.path.join(self.root, "f4.bin"))
+        result = self.client.verify(manifest)
+        self.assertEqual([(problem["path"], problem["status"]) for problem in result["problems"]],
+                         [("f2.bin", "mismatch"), ("f4.bin", "missing")])
+        self.assertEqual((result["stats"]["files"], result["stats"]["matched"]), (7, 5))
+
+        # Повторная проверка берет хеши неизменившихся файлов из кэша
+        hits = self.client.stats()["cache_hits"]
+        self.client.verify(manifest)
+        self.assertGreaterEqual(self.client.stats()["cache_hits"], hits + 5)
+
+        result = self.client.verify(manifest, fail_fast=True)
+        self.assertEqual([problem["path"] for problem in result["problems"]], ["f2.bin"])
+        self.assertLess(result["stats"]["files"], 7)
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError):
+            self.client.request({"op": "unknown"})
+        with self.assertRaises(RuntimeError):
+            self.client.md5_file(os.path.join(self.root, "missing.bin"))
+        # Соединение остается рабочим после ошибки
+        self.assertTrue(self.client.ping())
+
+    def test_command_line(self):
+        manifest = self.write_manifest({"f3.bin": "0" * 32})
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["--socket", self.socket_path, "verify", manifest]), 1)
+            self.assertEqual(main(["--socket", self.socket_path, "string", "abc"]), 0)
+            self.assertEqual(main(["--socket", os.path.join(self.root, "none.sock"), "ping"]), 2)
+        self.assertEqual(out.getvalue().splitlines(), ["mismatch\tf3.bin", hashlib.md5(b"abc").hexdigest()])
+
+
+if __name__ == '__main__':
+    unittest.main()
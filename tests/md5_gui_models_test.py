@@ -0,0 +1,103 @@
+import unittest
+
+from md5_core import md5_with_viz
+from md5_trace import TraceRecorder
+
+try:
+    from PyQt6.QtCore import Qt
+    from md5_gui_models import FileFilterProxyModel, FileTableModel, StepTableModel
+except ImportError:  # PyQt6 не установлен
+    StepTableModel = FileTableModel = FileFilterProxyModel = None
+
+
+@unittest.skipIf(StepTableModel is None, "PyQt6 не установлен")
+class StepTableModelTest(unittest.TestCase):
+    """Табличная модель над журналом шагов."""
+
+    def test_sync_and_cells(self):
+        recorder = TraceRecorder()
+        model = StepTableModel(recorder)
+        self.assertEqual(model.rowCount(), 0)
+
+        md5_with_viz(b"abc", recorder)
+        self.assertEqual(model.sync(), 64)
+        self.assertEqual(model.sync(), 0)
+        self.assertEqual(model.rowCount(), 64)
+        self.assertEqual(model.columnCount(), len(StepTableModel.HEADERS))
+
+        last = 63
+        cells = [model.data(model.index(last, column)) for column in range(model.columnCount())]
+        self.assertEqual(cells[:3], [1, 4, 16])
+        self.assertEqual(cells[3], f"{recorder[last]['A']:08x}")
+        self.assertEqual(cells[8], recorder[last]['g'])
+
+    def test_sync_after_clear(self):
+        recorder = TraceRecorder()
+        model = StepTableModel(recorder)
+        md5_with_viz(b"abc", recorder)
+        model.sync()
+        recorder.clear()
+        self.assertEqual(model.sync(), 0)
+        self.assertEqual(model.rowCount(), 0)
+
+
+@unittest.skipIf(FileTableModel is None, "PyQt6 не установлен")
+class FileTableModelTest(unittest.TestCase):
+    """Пакетная табличная модель файлов."""
+
+    def make_model(self):
+        model = FileTableModel(flush_interval=3600)
+        model.append("b/big.bin", 5000, "0123456789abcdef0123456789abcdef", FileTableModel.STATUS_OK)
+        model.append("a/small.txt", 10, bytes(range(16)), FileTableModel.STATUS_MISMATCH)
+        model.append("c/missing.txt", status=FileTableModel.STATUS_MISSING)
+        model.flush(force=True)
+        return model
+
+    def test_batched_flush(self):
+        model = FileTableModel(flush_interval=3600)
+        model.append("x.txt", 1)
+        # Интервал не истек - строка остается в очереди
+        self.assertFalse(model.flush())
+        self.assertEqual(model.rowCount(), 0)
+        self.assertTrue(model.flush(force=True))
+        self.assertFalse(model.flush(force=True))
+        self.assertEqual(model.rowCount(), 1)
+        model.clear()
+        self.assertEqual(model.rowCount(), 0)
+
+    def test_cells_and_accessors(self):
+        model = self.make_model()
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual(model.digest(1), bytes(range(16)).hex())
+        self.assertIsNone(model.digest(2))
+        self.assertIsNone(model.size(2))
+        self.assertEqual(model.data(model.index(0, FileTableModel.COL_SIZE)), "5000")
+        self.assertEqual(model.data(model.index(0, FileTableModel.COL_SIZE), Qt.ItemDataRole.UserRole), 5000)
+        self.assertEqual(model.data(model.index(2, FileTableModel.COL_DIGEST)), "")
+        self.assertEqual(model.data(model.index(1, FileTableModel.COL_STATUS)), "Не совпадает")
+        counts = model.status_counts()
+        self.assertEqual((counts[FileTableModel.STATUS_OK], counts[FileTableModel.STATUS_MISSING]), (1, 1))
+
+    def test_proxy_filters_and_sorting(self):
+        model = self.make_model()
+        proxy = FileFilterProxyModel()
+        proxy.setSourceModel(model)
+
+        def visible():
+            return [proxy.data(proxy.index(row, FileTableModel.COL_PATH)) for row in range(proxy.rowCount())]
+
+        proxy.sort(FileTableModel.COL_SIZE, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(visible(), ["b/big.bin", "a/small.txt", "c/missing.txt"])
+
+        proxy.set_filter_text("ОТСУТСТВУЕТ")
+        self.assertEqual(visible(), ["c/missing.txt"])
+        proxy.set_filter_text("")
+        proxy.set_digest_filter(" 0123 ")
+        self.assertEqual(visible(), ["b/big.bin"])
+        proxy.set_digest_filter("")
+        proxy.set_size_range(min_size=5, max_size=100)
+        self.assertEqual(visible(), ["a/small.txt"])
+
+
+if __name__ == '__main__':
+    unittest.main()
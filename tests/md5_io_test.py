@@ -0,0 +1,131 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from md5_io import (PIPELINE_BUFFER_SIZE, TUNE_MIN_SAMPLE_BYTES, ReadSizeTuner, md5_file_pipelined,
+                    md5_file_sequential, md5_stream_pipelined)
+from md5_throttle import Throttle
+
+
+class FailingStream(io.RawIOBase):
+    """Поток, который отдает несколько блоков и затем завершается ошибкой."""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.blocks:
+            raise OSError("ошибка чтения")
+        self.blocks -= 1
+        buffer[:10] = b"x" * 10
+        return 10
+
+
+class PipelinedReadTest(unittest.TestCase):
+    """Конвейерное чтение потока в отдельном потоке."""
+
+    def test_matches_hashlib(self):
+        data = os.urandom(100001)
+        for depth, buffer_size in ((1, 1), (1, 4096), (2, 65536), (4, 1000), (8, 1 << 20)):
+            with self.subTest(depth=depth, buffer_size=buffer_size):
+                self.assertEqual(md5_stream_pipelined(io.BytesIO(data), depth, buffer_size),
+                                 hashlib.md5(data).hexdigest())
+
+    def test_empty_stream(self):
+        self.assertEqual(md5_stream_pipelined(io.BytesIO(b"")), hashlib.md5(b"").hexdigest())
+
+    def test_file(self):
+        data = os.urandom(70000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(md5_file_pipelined(path, 3, 4096), hashlib.md5(data).hexdigest())
+
+    def test_reader_error_is_raised(self):
+        with self.assertRaises(OSError):
+            md5_stream_pipelined(FailingStream(5), 2, 64)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            md5_stream_pipelined(io.BytesIO(b"abc"), 0, 64)
+        with self.assertRaises(ValueError):
+            md5_stream_pipelined(io.BytesIO(b"abc"), 2, 0)
+
+
+class ReadSizeTunerTest(unittest.TestCase):
+    """Подбор и сохранение размера чтения для устройства."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.sizes_path = os.path.join(self.tmp, "cache", "read_sizes.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, size):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        return path
+
+    def read_size(self, tuner, path):
+        with open(path, "rb", buffering=0) as f:
+            return tuner.read_size(f.fileno(), os.fstat(f.fileno()))
+
+    def test_small_file_uses_default(self):
+        tuner = ReadSizeTuner(path=self.sizes_path)
+        self.assertEqual(self.read_size(tuner, self.write("small.bin", 1000)), PIPELINE_BUFFER_SIZE)
+        self.assertFalse(os.path.exists(self.sizes_path))
+
+    @unittest.skipUnless(hasattr(os, "preadv"), "нет os.preadv")
+    def test_probe_is_persisted_and_reused(self):
+        candidates = (64 * 1024, 1024 * 1024)
+        path = self.write("large.bin", 2 * TUNE_MIN_SAMPLE_BYTES)
+        tuner = ReadSizeTuner(candidates, TUNE_MIN_SAMPLE_BYTES, self.sizes_path)
+        size = self.read_size(tuner, path)
+        self.assertIn(size, candidates)
+        with open(self.sizes_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {str(os.stat(path).st_dev): size})
+
+        # Новый подборщик (например, в процессе пула) берет размер из файла без замера
+        tuner = ReadSizeTuner(candidates, TUNE_MIN_SAMPLE_BYTES, self.sizes_path)
+        with mock.patch.object(ReadSizeTuner, "probe", side_effect=AssertionError("повторный замер")):
+            self.assertEqual(self.read_size(tuner, self.write("other.bin", 10)), size)
+
+    def test_unknown_stored_size_is_ignored(self):
+        path = self.write("small.bin", 10)
+        os.makedirs(os.path.dirname(self.sizes_path))
+        with open(self.sizes_path, "w", encoding="utf-8") as f:
+            json.dump({str(os.stat(path).st_dev): 12345}, f)
+        self.assertEqual(self.read_size(ReadSizeTuner(path=self.sizes_path), path), PIPELINE_BUFFER_SIZE)
+
+    def test_sequential_file_with_timings_and_throttle(self):
+        data = os.urandom(60000)
+        path = os.path.join(self.tmp, "data.bin")
+        with open(path, "wb") as f:
+            f.write(data)
+        timings = []
+        throttle = Throttle(bytes_per_sec=400000)
+        started = time.monotonic()
+        digest = md5_file_sequential(path, tuner=ReadSizeTuner(path=False), throttle=throttle, timings=timings)
+        self.assertEqual(digest, hashlib.md5(data).hexdigest())
+        self.assertEqual(len(timings), 1)
+        read_time, hash_time = timings[0]
+        self.assertGreaterEqual(read_time, 0)
+        self.assertGreater(hash_time, 0)
+        self.assertLessEqual(read_time + hash_time, time.monotonic() - started)
+        self.assertEqual(md5_file_sequential(path, tuner=None, drop_cache=False), hashlib.md5(data).hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
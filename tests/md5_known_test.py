@@ -0,0 +1,101 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import md5_known
+from md5_known import KnownHashIndex, build_known_index, find_md5_column, parse_known_hash_line
+
+
+def digest_of(value):
+    return hashlib.md5(str(value).encode()).hexdigest()
+
+
+class ParseLineTest(unittest.TestCase):
+    """Разбор строк манифестов и списков хешей."""
+
+    def test_formats(self):
+        digest = digest_of(1)
+        self.assertEqual(parse_known_hash_line(f"dir/file.txt: {digest}\n"), bytes.fromhex(digest))
+        self.assertEqual(parse_known_hash_line(digest.upper()), bytes.fromhex(digest))
+        self.assertEqual(parse_known_hash_line(f'"x","{digest}","y"'), bytes.fromhex(digest))
+        self.assertIsNone(parse_known_hash_line("not a hash"))
+        self.assertIsNone(parse_known_hash_line(f"file: {digest[:-1]}"))
+
+    def test_nsrl_header(self):
+        header = '"SHA-1","MD5","CRC32","FileName","FileSize"'
+        column = find_md5_column(header)
+        self.assertEqual(column, 1)
+        self.assertIsNone(find_md5_column("Файл\tMD5 Хеш"))
+        # SHA-1 в первом столбце не принимается за MD5
+        sha1 = "A" * 40
+        line = f'"{sha1}","{digest_of(2)}","0000","a.txt",1'
+        self.assertEqual(parse_known_hash_line(line, column), bytes.fromhex(digest_of(2)))
+
+
+class KnownHashIndexTest(unittest.TestCase):
+    """Построение индекса и поиск в нем."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.index_path = os.path.join(self.tmp, "known.idx")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, lines):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def test_hits_and_misses(self):
+        known = [digest_of(i) for i in range(500)]
+        manifest = self.write("file_hashes.txt", ["Файл\tMD5 Хеш"] + [f"f{i}: {d}" for i, d in enumerate(known[:250])])
+        plain = self.write("list.txt", known[250:] + known[:10] + ["garbage line"])
+
+        stats = build_known_index([manifest, plain], self.index_path)
+        self.assertEqual(stats.count, 500)
+        self.assertEqual(stats.skipped, 1)
+        with KnownHashIndex(self.index_path) as index:
+            self.assertEqual(len(index), 500)
+            for digest in known:
+                self.assertIn(digest, index)
+                self.assertIn(bytes.fromhex(digest), index)
+            misses = [digest_of(i) for i in range(500, 3000)]
+            self.assertFalse(any(digest in index for digest in misses))
+
+    def test_merge_of_many_runs(self):
+        known = [digest_of(i) for i in range(300)]
+        source = self.write("list.txt", known + known[::3])
+        with mock.patch.object(md5_known, "_RUN_SIZE", 16):
+            stats = build_known_index(source, self.index_path)
+        self.assertEqual(stats.count, 300)
+        with KnownHashIndex(self.index_path) as index:
+            self.assertTrue(all(digest in index for digest in known))
+            self.assertNotIn(digest_of(-1), index)
+
+    def test_nsrl_file(self):
+        lines = ['"SHA-1","MD5","CRC32","FileName","FileSize"']
+        lines += [f'"{"B" * 40}","{digest_of(i).upper()}","0000","f{i}",{i}' for i in range(50)]
+        stats = build_known_index(self.write("NSRLFile.txt", lines), self.index_path)
+        self.assertEqual(stats, (50, 0))
+        with KnownHashIndex(self.index_path) as index:
+            self.assertIn(digest_of(7), index)
+
+    def test_empty_source(self):
+        stats = build_known_index(self.write("empty.txt", ["nothing here"]), self.index_path)
+        self.assertEqual(stats.count, 0)
+        with KnownHashIndex(self.index_path) as index:
+            self.assertNotIn(digest_of(0), index)
+
+    def test_rejects_foreign_file(self):
+        path = self.write("not_an_index", ["hello"])
+        with self.assertRaises(ValueError):
+            KnownHashIndex(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
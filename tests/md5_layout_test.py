@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import md5_layout
+from md5_layout import hash_entries_by_layout, layout_order, physical_offset
+from md5_walk import WalkEntry, walk_files
+
+
+def entry(name, inode, dev=1):
+    return WalkEntry(name, name, 0, 0, inode, dev)
+
+
+class LayoutOrderTest(unittest.TestCase):
+    """Порядок чтения файлов по расположению на диске."""
+
+    def test_inode_fallback(self):
+        entries = [entry("a", 30), entry("b", 10), entry("c", 20, dev=0)]
+        self.assertEqual(layout_order(entries, use_fiemap=False), [2, 1, 0])
+
+    def test_offsets_before_inodes(self):
+        entries = [entry("a", 1), entry("b", 2), entry("c", 3), entry("d", 4)]
+        offsets = {"a": 9000, "b": None, "c": 100, "d": 5000}
+        with mock.patch.object(md5_layout, "physical_offset", side_effect=offsets.get):
+            self.assertEqual(layout_order(entries), [2, 3, 0, 1])
+
+    def test_physical_offset_of_missing_file(self):
+        self.assertIsNone(physical_offset(os.path.join(tempfile.gettempdir(), "no such file")))
+
+
+class HashByLayoutTest(unittest.TestCase):
+    """Хеширование в порядке расположения с выдачей в каноническом порядке."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.expected = {}
+        for i in range(10):
+            path = os.path.join(self._tmp.name, f"f{i}.bin")
+            data = os.urandom(50 * i)
+            with open(path, "wb") as f:
+                f.write(data)
+            self.expected[path] = hashlib.md5(data).hexdigest()
+        self.entries = walk_files(self._tmp.name)
+        # Обратный порядок расположения: внутри окна файлы читаются с конца
+        self.offsets = {entry.path: 1000 - i for i, entry in enumerate(self.entries)}
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_canonical_output_order(self):
+        hash_entries = md5_layout.hash_entries
+        for window in (1, 3, 100):
+            for workers in (1, 2):
+                with self.subTest(window=window, workers=workers):
+                    hashed = []
+
+                    def recording(entries, *args, **kwargs):
+                        return hash_entries((hashed.append(item) or item for item in entries), *args, **kwargs)
+
+                    with mock.patch.object(md5_layout, "physical_offset", side_effect=self.offsets.get), \
+                            mock.patch.object(md5_layout, "hash_entries", recording):
+                        results = list(hash_entries_by_layout(self.entries, workers=workers, window=window))
+
+                    self.assertEqual([item for item, _, _ in results], self.entries)
+                    self.assertEqual([digest for _, digest, _ in results],
+                                     [self.expected[item.path] for item in self.entries])
+                    # Файлы переупорядочиваются только внутри окна
+                    expected_order = [item for start in range(0, len(self.entries), window)
+                                      for item in reversed(self.entries[start:start + window])]
+                    self.assertEqual(hashed, expected_order)
+
+    def test_errors_keep_their_place(self):
+        os.remove(self.entries[4].path)
+        results = list(hash_entries_by_layout(self.entries, window=4))
+        self.assertEqual([item for item, _, _ in results], self.entries)
+        self.assertIsNotNone(results[4][2])
+        self.assertEqual(sum(error is None for _, _, error in results), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from md5_batch import hash_entries
+from md5_metrics import Histogram, JobLog, md5_file_timed
+from md5_walk import walk_files
+
+
+class HistogramTest(unittest.TestCase):
+    """Гистограммы в текстовом формате Prometheus."""
+
+    def test_buckets_and_expose(self):
+        histogram = Histogram((0.1, 1.0, 1024 * 1024))
+        for value in (0.05, 0.1, 0.5, 2.0, 10 ** 7):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        lines = histogram.expose("m", "описание", 'job="x"')
+        self.assertEqual(lines[:2], ["# HELP m описание", "# TYPE m histogram"])
+        self.assertEqual(lines[2:6], ['m_bucket{job="x",le="0.1"} 2', 'm_bucket{job="x",le="1"} 3',
+                                      'm_bucket{job="x",le="1048576"} 4', 'm_bucket{job="x",le="+Inf"} 5'])
+        self.assertEqual(lines[-1], 'm_count{job="x"} 5')
+        self.assertEqual(Histogram((1,)).expose("e", "пусто")[-2:], ["e_sum 0", "e_count 0"])
+
+
+class JobLogTest(unittest.TestCase):
+    """Журнал задания и файл метрик."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.log_path = os.path.join(self.tmp, "job.jsonl")
+        self.metrics_path = os.path.join(self.tmp, "md5.prom")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read_log(self):
+        with open(self.log_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def write_files(self, sizes):
+        for i, size in enumerate(sizes):
+            with open(os.path.join(self.tmp, "data", f"f{i}.bin"), "wb") as f:
+                f.write(os.urandom(size))
+
+    def test_records_and_metrics(self):
+        with JobLog(self.log_path, self.metrics_path, job="test") as log:
+            log.record("a/x.bin", 1000, 0.002, 0.003)
+            log.record("a/y.bin", 0, 0.0, 0.0, error="нет доступа")
+            log.record("b/z.bin", 5000, 0.1, 0.2)
+
+        events = self.read_log()
+        self.assertEqual([event["event"] for event in events], ["job_start", "file", "file", "file", "job_end"])
+        self.assertEqual(events[2]["error"], "нет доступа")
+        end = events[-1]
+        self.assertEqual((end["files"], end["errors"], end["bytes"]), (3, 1, 6000))
+        self.assertEqual(end["slowest_dirs"][0][0], "b")
+
+        with open(self.metrics_path, encoding="utf-8") as f:
+            metrics = f.read().splitlines()
+        self.assertIn('md5hasher_files_total{job="test"} 3', metrics)
+        self.assertIn('md5hasher_file_errors_total{job="test"} 1', metrics)
+        self.assertIn('md5hasher_file_duration_seconds_bucket{job="test",le="0.005"} 1', metrics)
+        self.assertIn('md5hasher_file_duration_seconds_count{job="test"} 2', metrics)
+        self.assertFalse(os.path.exists(self.metrics_path + ".tmp"))
+
+    def test_md5_file_timed(self):
+        path = os.path.join(self.tmp, "data.bin")
+        data = os.urandom(3000)
+        with open(path, "wb") as f:
+            f.write(data)
+        digest, size, read_time, hash_time = md5_file_timed(path)
+        self.assertEqual((digest, size), (hashlib.md5(data).hexdigest(), 3000))
+        self.assertGreater(hash_time, 0)
+        self.assertGreaterEqual(read_time, 0)
+
+    def test_hash_entries_records_timings(self):
+        os.mkdir(os.path.join(self.tmp, "data"))
+        self.write_files([10, 200, 70000, 0])
+        entries = walk_files(os.path.join(self.tmp, "data"))
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                with JobLog(self.log_path) as log:
+                    results = list(hash_entries(entries, workers=workers, threshold=1024, job_log=log))
+                self.assertEqual([entry for entry, _, _ in results], entries)
+                self.assertEqual((log.files, log.errors, log.bytes), (4, 0, 70210))
+                self.assertEqual(log.hash_latency.count, 4)
+                records = [event for event in self.read_log() if event["event"] == "file"][-4:]
+                self.assertEqual([record["path"] for record in records], [entry.path for entry in entries])
+                self.assertGreater(records[2]["hash_s"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import hashlib
+import hmac
+import unittest
+
+try:
+    from md5_realtime import RealtimeHasher
+except ImportError:  # PyQt6 не установлен
+    RealtimeHasher = None
+
+
+@unittest.skipIf(RealtimeHasher is None, "PyQt6 не установлен")
+class RealtimeHasherTest(unittest.TestCase):
+    """Вычисление хешей редактируемого текста (без цикла событий Qt)."""
+
+    def setUp(self):
+        self.hasher = RealtimeHasher()
+
+    def tearDown(self):
+        self.hasher.cancel()
+
+    def test_md5_and_hmac(self):
+        for text in ("", "abc", "abc" * 100, "текст"):
+            with self.subTest(text=text[:10]):
+                self.assertEqual(self.hasher._compute(self.hasher._generation, text.encode(), None),
+                                 hashlib.md5(text.encode()).hexdigest())
+                self.assertEqual(self.hasher._compute(self.hasher._generation, text.encode(), b"key"),
+                                 hmac.new(b"key", text.encode(), "md5").hexdigest())
+
+    def test_stale_request_is_dropped(self):
+        generation = self.hasher._generation
+        self.hasher.cancel()
+        self.assertIsNone(self.hasher._compute(generation, b"x" * 100000, None))
+        self.assertEqual(self.hasher._compute(self.hasher._generation, b"abc", None),
+                         hashlib.md5(b"abc").hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import md5_scan
+from md5_scan import (JOB_FOLDER_HASH, JOB_MANIFEST, MANIFEST_EXCLUDE, MANIFEST_NAME, ScanJournal, ScanSummary,
+                      default_journal_path, iter_folder_scan, scan_filter, scan_folder)
+from md5_walk import WalkEntry, WalkFilter
+
+
+def make_tree(root):
+    """Создает небольшое дерево с вложенными папками и манифестом в корне."""
+    files = {
+        "a.txt": b"alpha",
+        "b/c.bin": os.urandom(300000),
+        "b/d/e.txt": b"",
+        "b/file_hashes.txt": b"nested manifest is ordinary data",
+        "z.txt": os.urandom(1000),
+    }
+    for rel_path, data in files.items():
+        path = os.path.join(root, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    with open(os.path.join(root, MANIFEST_NAME), "w") as f:
+        f.write("stale manifest\n")
+    return files
+
+
+def expected_folder_hash(root):
+    """Хеш папки через hashlib: MD5 от хешей файлов по порядку полных путей."""
+    paths = sorted(
+        os.path.join(directory, name)
+        for directory, _, names in os.walk(root)
+        for name in names
+        if os.path.join(directory, name) != os.path.join(root, MANIFEST_NAME)
+    )
+    digests = []
+    for path in paths:
+        with open(path, "rb") as f:
+            digests.append(hashlib.md5(f.read()).hexdigest())
+    return hashlib.md5("".join(digests).encode("ascii")).hexdigest()
+
+
+class ScanFolderTest(unittest.TestCase):
+    """Хеш папки и манифест за один проход."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "tree")
+        self.files = make_tree(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_folder_hash_matches_hashlib(self):
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                summary = scan_folder(self.root, workers=workers)
+                self.assertEqual(summary.folder_hash, expected_folder_hash(self.root))
+                self.assertEqual(summary.files, len(self.files))
+                self.assertEqual(summary.errors, [])
+
+    def test_manifest_excludes_root_manifest(self):
+        manifest_path = os.path.join(self.root, MANIFEST_NAME)
+        before = scan_folder(self.root, manifest_path).folder_hash
+        # Перезапись манифеста не меняет хеш папки
+        self.assertEqual(scan_folder(self.root, manifest_path).folder_hash, before)
+
+        with open(manifest_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "Файл\tMD5 Хеш")
+        entries = dict(line.rsplit(": ", 1) for line in lines[1:])
+        self.assertNotIn(MANIFEST_NAME, entries)
+        for rel_path, data in self.files.items():
+            self.assertEqual(entries[rel_path.replace("/", os.sep)], hashlib.md5(data).hexdigest())
+
+    def test_walk_filter_and_callback(self):
+        seen = []
+        summary = scan_folder(self.root, walk_filter=WalkFilter(include=["*.txt"]), workers=1,
+                              on_entry=lambda entry, digest, error, summary: seen.append((entry.rel_path, digest)))
+        expected = sorted(rel_path for rel_path in self.files if rel_path.endswith(".txt"))
+        self.assertEqual([rel_path for rel_path, _ in seen], [rel_path.replace("/", os.sep) for rel_path in expected])
+        self.assertEqual([digest for _, digest in seen], [hashlib.md5(self.files[rel_path]).hexdigest()
+                                                          for rel_path in expected])
+        self.assertEqual((summary.total, summary.files), (len(expected), len(expected)))
+        self.assertEqual(summary.bytes, sum(len(self.files[rel_path]) for rel_path in expected))
+
+    def test_scan_filter_does_not_modify_argument(self):
+        walk_filter = WalkFilter(exclude=["*.tmp"])
+        result = scan_filter(walk_filter)
+        self.assertEqual(result.exclude, ("*.tmp", MANIFEST_EXCLUDE))
+        self.assertEqual(walk_filter.exclude, ("*.tmp",))
+        self.assertEqual(scan_filter(result).exclude, result.exclude)
+
+    def test_summary_with_errors(self):
+        summary = ScanSummary()
+        summary.add(WalkEntry("/r/a", "a", 5, 0, 1, 1), "0" * 32, None)
+        self.assertEqual(summary.folder_hash, hashlib.md5(b"0" * 32).hexdigest())
+        summary.add(WalkEntry("/r/b", "b", 7, 0, 2, 1), None, "нет доступа")
+        self.assertIsNone(summary.folder_hash)
+        self.assertEqual((summary.files, summary.bytes, summary.errors), (1, 5, [("b", "нет доступа")]))
+
+
+class ScanJournalTest(unittest.TestCase):
+    """Продолжение прерванного сканирования по журналу."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "tree")
+        self.files = make_tree(self.root)
+        self.journal_path = os.path.join(self._tmp.name, "scan.journal")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_journal_resume(self):
+        # Прерванное задание: обработаны первые два файла
+        journal = ScanJournal(self.journal_path, self.root)
+        scan = iter_folder_scan(self.root, ScanSummary(), workers=1, journal=journal)
+        next(scan)
+        next(scan)
+        scan.close()
+        journal.close()
+        self.assertTrue(os.path.exists(self.journal_path))
+
+        # Измененный после сбоя файл не берется из журнала
+        changed = os.path.join(self.root, "a.txt")
+        with open(changed, "wb") as f:
+            f.write(b"alpha, changed")
+        os.utime(changed, ns=(0, 10 ** 9))
+
+        summary = scan_folder(self.root, workers=1, journal_path=self.journal_path)
+        self.assertEqual(summary.reused, 1)
+        self.assertEqual(summary.folder_hash, expected_folder_hash(self.root))
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_torn_journal_line_is_ignored(self):
+        journal = ScanJournal(self.journal_path, self.root)
+        for _ in iter_folder_scan(self.root, workers=1, journal=journal):
+            pass
+        journal.close()
+        with open(self.journal_path, "a") as f:
+            f.write('{"p": "z.txt", "s"')
+
+        summary = scan_folder(self.root, workers=1, journal_path=self.journal_path)
+        self.assertEqual(summary.reused, len(self.files))
+        self.assertEqual(summary.folder_hash, expected_folder_hash(self.root))
+
+    def test_journal_of_other_root_is_ignored(self):
+        journal = ScanJournal(self.journal_path, self.root)
+        for _ in iter_folder_scan(self.root, workers=1, journal=journal):
+            pass
+        journal.close()
+
+        other = os.path.join(self._tmp.name, "other")
+        make_tree(other)
+        self.assertEqual(ScanJournal(self.journal_path, other).done, {})
+        summary = scan_folder(other, workers=1, journal_path=self.journal_path)
+        self.assertEqual(summary.reused, 0)
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_journal_is_kept_after_errors(self):
+        hash_entries_auto = md5_scan.hash_entries_auto
+
+        def failing(pending, *args):
+            for entry, digest, error in hash_entries_auto(pending, *args):
+                yield (entry, None, "ошибка чтения") if entry.rel_path == "z.txt" else (entry, digest, error)
+
+        with mock.patch.object(md5_scan, "hash_entries_auto", failing):
+            summary = scan_folder(self.root, workers=1, journal_path=self.journal_path)
+        self.assertIsNone(summary.folder_hash)
+        self.assertTrue(os.path.exists(self.journal_path))
+
+        summary = scan_folder(self.root, workers=1, journal_path=self.journal_path)
+        self.assertEqual(summary.reused, len(self.files) - 1)
+        self.assertEqual(summary.folder_hash, expected_folder_hash(self.root))
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_default_path_per_job(self):
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self._tmp.name}):
+            manifest_journal = default_journal_path(self.root, JOB_MANIFEST)
+            hash_journal = default_journal_path(self.root, JOB_FOLDER_HASH)
+        self.assertNotEqual(manifest_journal, hash_journal)
+        self.assertEqual(os.path.dirname(manifest_journal), os.path.join(self._tmp.name, "md5hasher"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import hashlib
+import unittest
+from multiprocessing import shared_memory
+
+from md5_shm import _split, md5_many_shared, md5_shared_ranges
+
+
+class SharedMemoryHashTest(unittest.TestCase):
+    """Хеширование через разделяемую память в нескольких процессах."""
+
+    def test_many_shared(self):
+        items = [b"", b"abc", "строка", bytearray(b"x" * 200), memoryview(b"y" * 70)]
+        expected = [hashlib.md5(item.encode() if isinstance(item, str) else bytes(item)).hexdigest()
+                    for item in items]
+        self.assertEqual(md5_many_shared(items, workers=2, hex=True), expected)
+        self.assertEqual(md5_many_shared(items, workers=1), b"".join(bytes.fromhex(d) for d in expected))
+        self.assertEqual(md5_many_shared([], workers=2), b"")
+
+    def test_prefix(self):
+        prefix = b"p" * 130
+        items = [b"", b"a", b"b" * 100]
+        self.assertEqual(md5_many_shared(items, workers=2, hex=True, prefix=prefix),
+                         [hashlib.md5(prefix + item).hexdigest() for item in items])
+
+    def test_ranges_of_existing_segment(self):
+        data = bytes(range(256)) * 4
+        ranges = [(0, 10), (5, 300), (1000, 24), (1024, 0)]
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[:len(data)] = data
+            self.assertEqual(md5_shared_ranges(shm, ranges, workers=2, hex=True),
+                             [hashlib.md5(data[offset:offset + length]).hexdigest() for offset, length in ranges])
+            with self.assertRaises(ValueError):
+                md5_shared_ranges(shm, [(1000, 100)], workers=1)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_split_covers_all_items(self):
+        lengths = [10, 5000, 1, 1, 300, 0, 64]
+        for parts in (1, 3, 8, 100):
+            with self.subTest(parts=parts):
+                ranges = _split(lengths, parts)
+                self.assertEqual(ranges[0][0], 0)
+                self.assertEqual(ranges[-1][1], len(lengths))
+                self.assertTrue(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import md5_throttle
+from md5_throttle import Throttle, init_worker, worker_throttle
+
+
+def _worker_limits():
+    """Возвращает ограничения, видимые процессу пула."""
+    throttle = worker_throttle()
+    return None if throttle is None else (throttle.bytes_per_sec, throttle.max_workers)
+
+
+class ThrottleTest(unittest.TestCase):
+    """Ограничение скорости чтения и числа процессов."""
+
+    def test_rate_limit(self):
+        throttle = Throttle(bytes_per_sec=200000)
+        started = time.monotonic()
+        for _ in range(10):
+            throttle.consume(10000)
+        # 100 КБ на 200 КБ/с - не меньше 0,5 с (минус токены, накопленные с создания)
+        self.assertGreaterEqual(time.monotonic() - started, 0.45)
+
+    def test_unlimited(self):
+        throttle = Throttle()
+        started = time.monotonic()
+        for _ in range(1000):
+            throttle.consume(1 << 30)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertIsNone(throttle.bytes_per_sec)
+
+    def test_burst_is_capped(self):
+        with mock.patch.object(md5_throttle, "BURST_SECONDS", 0.1):
+            throttle = Throttle(bytes_per_sec=100000)
+            time.sleep(0.3)
+            started = time.monotonic()
+            # Запас не больше 0,1 с работы: 10 КБ из 30 КБ бесплатно, остальное - 0,2 с ожидания
+            throttle.consume(30000)
+            self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+    def test_set_rate(self):
+        throttle = Throttle(bytes_per_sec=1000)
+        throttle.set_rate(None)
+        self.assertIsNone(throttle.bytes_per_sec)
+        started = time.monotonic()
+        throttle.consume(1 << 20)
+        self.assertLess(time.monotonic() - started, 0.1)
+
+        throttle.set_rate(100000)
+        started = time.monotonic()
+        throttle.consume(20000)
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+    def test_max_workers(self):
+        throttle = Throttle(max_workers=1)
+        throttle.acquire_worker()
+        acquired = threading.Event()
+
+        def second():
+            throttle.acquire_worker()
+            acquired.set()
+            throttle.release_worker()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        self.assertFalse(acquired.wait(0.2))
+        throttle.release_worker()
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+
+        # Снятие предела пропускает сразу
+        throttle.set_max_workers(None)
+        throttle.acquire_worker()
+        throttle.acquire_worker()
+        throttle.release_worker()
+        throttle.release_worker()
+
+    def test_pool_workers_share_limits(self):
+        throttle = Throttle(bytes_per_sec=5000, max_workers=2)
+        with ProcessPoolExecutor(max_workers=1, initializer=init_worker, initargs=(throttle,)) as executor:
+            self.assertEqual(executor.submit(_worker_limits).result(), (5000, 2))
+            # Изменения в родительском процессе видны процессу пула
+            throttle.set_rate(7000)
+            throttle.set_max_workers(3)
+            self.assertEqual(executor.submit(_worker_limits).result(), (7000, 3))
+        self.assertIsNone(worker_throttle())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import hashlib
+import io
+import os
+import unittest
+
+from md5_core import MD5StepByStep, md5_with_viz
+from md5_trace import TraceRecorder
+
+
+class TraceRecorderTest(unittest.TestCase):
+    """Журнал шагов md5_with_viz и его экспорт."""
+
+    def test_records_every_step(self):
+        data = os.urandom(100)
+        recorder = TraceRecorder()
+        self.assertEqual(md5_with_viz(data, recorder), hashlib.md5(data).hexdigest())
+        # 100 байт с дополнением занимают два чанка по 64 шага
+        self.assertEqual(len(recorder), 128)
+        self.assertEqual(recorder[0]['chunk'], 1)
+        self.assertEqual((recorder[0]['round'], recorder[0]['step']), (1, 1))
+        self.assertEqual((recorder[127]['chunk'], recorder[127]['round'], recorder[127]['step']), (2, 4, 16))
+
+    def test_matches_step_by_step(self):
+        data = b"The quick brown fox jumps over the lazy dog"
+        recorder = TraceRecorder()
+        md5_with_viz(data, recorder)
+
+        stepper = MD5StepByStep(data)
+        steps = []
+        while not stepper.finished:
+            info, _ = stepper.next_step()
+            if info:
+                steps.append(info)
+        self.assertEqual(len(steps), len(recorder))
+        for index, info in enumerate(steps):
+            recorded = recorder[index]
+            for name in ('chunk', 'round', 'step', 'A', 'B', 'C', 'D', 'f', 'g', 'temp'):
+                self.assertEqual(recorded[name], info[name], (index, name))
+
+    def test_sampling(self):
+        data = os.urandom(200)
+        sampled = TraceRecorder(every=10)
+        md5_with_viz(data, sampled)
+        self.assertEqual(len(sampled), len(range(0, 4 * 64, 10)))
+
+        selected = TraceRecorder(chunks=[2])
+        self.assertEqual(md5_with_viz(data, selected), hashlib.md5(data).hexdigest())
+        self.assertEqual(len(selected), 64)
+        self.assertEqual({selected[i]['chunk'] for i in range(len(selected))}, {2})
+
+        with self.assertRaises(ValueError):
+            TraceRecorder(every=0)
+
+    def test_binary_round_trip(self):
+        recorder = TraceRecorder()
+        md5_with_viz(os.urandom(70), recorder)
+        buffer = io.BytesIO()
+        recorder.to_binary(buffer)
+        buffer.seek(0)
+        restored = TraceRecorder.from_binary(buffer)
+        self.assertEqual(len(restored), len(recorder))
+        self.assertEqual(list(restored.iter_lines()), list(recorder.iter_lines()))
+
+        blob = bytearray(buffer.getvalue())
+        with self.assertRaises(ValueError):
+            TraceRecorder.from_binary(io.BytesIO(bytes(blob[:-1])))
+        blob[0:4] = b'XXXX'
+        with self.assertRaises(ValueError):
+            TraceRecorder.from_binary(io.BytesIO(bytes(blob)))
+
+    def test_csv_export(self):
+        recorder = TraceRecorder()
+        md5_with_viz(b"abc", recorder)
+        text = io.StringIO()
+        recorder.to_csv(text)
+        lines = text.getvalue().splitlines()
+        self.assertEqual(lines[0], "chunk,round,step,A,B,C,D,f,g,temp")
+        self.assertEqual(len(lines), 1 + 64)
+        self.assertEqual(lines[1].split(",")[3], f"{recorder[0]['A']:08x}")
+
+
+if __name__ == '__main__':
+    unittest.main()
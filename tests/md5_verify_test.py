@@ -0,0 +1,94 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from md5_verify import VerifyStats, iter_manifest_entries, verify_manifest
+
+
+def write_manifest(root, names, overrides=None):
+    """Записывает манифест с хешами файлов root (overrides подменяет хеши)."""
+    overrides = overrides or {}
+    path = os.path.join(root, "file_hashes.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Файл\tMD5 Хеш\n")
+        for name in names:
+            digest = overrides.get(name)
+            if digest is None:
+                with open(os.path.join(root, name), "rb") as data:
+                    digest = hashlib.md5(data.read()).hexdigest()
+            f.write(f"{name}: {digest}\n")
+    return path
+
+
+class VerifyManifestTest(unittest.TestCase):
+    """Проверка папки по манифесту."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.names = [f"f{i}.bin" for i in range(8)] + ["файл.txt"]
+        for name in self.names:
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(os.urandom(1000))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_all_match(self):
+        manifest = write_manifest(self.root, self.names)
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                stats = VerifyStats()
+                results = list(verify_manifest(manifest, workers=workers, stats=stats))
+                self.assertEqual(sorted(result.path for result in results), sorted(self.names))
+                self.assertTrue(all(result.status == 'ok' for result in results))
+                self.assertEqual((stats.files, stats.matched, stats.bytes), (9, 9, 9000))
+
+    def test_mismatch_and_missing(self):
+        manifest = write_manifest(self.root, self.names, {"f3.bin": "0" * 32})
+        os.remove(os.path.join(self.root, "f5.bin"))
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                stats = VerifyStats()
+                statuses = {result.path: result.status for result in
+                            verify_manifest(manifest, workers=workers, stats=stats)}
+                self.assertEqual(statuses["f3.bin"], 'mismatch')
+                self.assertEqual(statuses["f5.bin"], 'missing')
+                self.assertEqual(sum(status == 'ok' for status in statuses.values()), 7)
+                self.assertEqual((stats.mismatched, stats.missing, stats.errors), (1, 1, 0))
+
+    def test_hash_case_is_ignored(self):
+        with open(os.path.join(self.root, "f0.bin"), "rb") as f:
+            upper = hashlib.md5(f.read()).hexdigest().upper()
+        manifest = write_manifest(self.root, ["f0.bin"], {"f0.bin": upper})
+        self.assertEqual([result.status for result in verify_manifest(manifest, workers=1)], ['ok'])
+
+    def test_fail_fast_stops_at_first_problem(self):
+        manifest = write_manifest(self.root, self.names, {"f0.bin": "0" * 32})
+        results = list(verify_manifest(manifest, workers=1, fail_fast=True))
+        self.assertEqual([(result.path, result.status) for result in results], [("f0.bin", 'mismatch')])
+
+        results = list(verify_manifest(manifest, workers=2, fail_fast=True))
+        self.assertEqual(results[-1].status, 'mismatch')
+        self.assertEqual(sum(result.status != 'ok' for result in results), 1)
+        self.assertLess(len(results), len(self.names))
+
+    def test_separate_root(self):
+        manifest = write_manifest(self.root, self.names)
+        with tempfile.TemporaryDirectory() as other:
+            moved = os.path.join(other, "file_hashes.txt")
+            os.replace(manifest, moved)
+            results = list(verify_manifest(moved, root=self.root, workers=1))
+        self.assertTrue(all(result.status == 'ok' for result in results))
+
+    def test_manifest_in_cp1251(self):
+        path = os.path.join(self.root, "legacy.txt")
+        with open(path, "wb") as f:
+            f.write("Файл\tMD5 Хеш\n".encode("cp1251"))
+            f.write(f"файл.txt: {'a' * 32}\n".encode("cp1251"))
+        self.assertEqual(list(iter_manifest_entries(path)), [("файл.txt", "a" * 32)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from md5_walk import (SYMLINKS_FILES, SYMLINKS_FOLLOW, SYMLINKS_SKIP, WalkFilter,
+                      iter_files, walk_files)
+
+
+class WalkFilesTest(unittest.TestCase):
+    """Обход дерева папок с фильтрами."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        for rel_path, size in (("a.txt", 10), ("b.log", 2000), ("sub/c.txt", 300),
+                               ("sub/deep/d.txt", 5), ("build/e.txt", 1), ("file_hashes.txt", 7)):
+            path = os.path.join(self.root, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"x" * size)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def rel_paths(self, walk_filter=None, workers=1):
+        return [entry.rel_path.replace(os.sep, "/") for entry in walk_files(self.root, walk_filter, workers)]
+
+    def test_sorted_and_complete(self):
+        expected = ["a.txt", "b.log", "build/e.txt", "file_hashes.txt", "sub/c.txt", "sub/deep/d.txt"]
+        self.assertEqual(self.rel_paths(), expected)
+        entry = walk_files(self.root)[1]
+        self.assertEqual(entry.size, 2000)
+        self.assertEqual(entry.path, os.path.join(self.root, "b.log"))
+        self.assertEqual(entry.inode, os.stat(entry.path).st_ino)
+
+    def test_parallel_walk_is_identical(self):
+        self.assertEqual(walk_files(self.root, workers=4), walk_files(self.root))
+
+    def test_include_and_exclude(self):
+        self.assertEqual(self.rel_paths(WalkFilter(include=["*.txt"], exclude=["build", "/file_hashes.txt"])),
+                         ["a.txt", "sub/c.txt", "sub/deep/d.txt"])
+        self.assertEqual(self.rel_paths(WalkFilter(exclude=["sub/deep"])),
+                         ["a.txt", "b.log", "build/e.txt", "file_hashes.txt", "sub/c.txt"])
+
+    def test_size_limits(self):
+        self.assertEqual(self.rel_paths(WalkFilter(min_size=10, max_size=300)), ["a.txt", "sub/c.txt"])
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "символические ссылки не поддерживаются")
+    def test_symlink_policies(self):
+        try:
+            os.symlink(os.path.join(self.root, "a.txt"), os.path.join(self.root, "link.txt"))
+            os.symlink(os.path.join(self.root, "sub"), os.path.join(self.root, "sub_link"))
+            # Цикл: ссылка на корень внутри дерева
+            os.symlink(self.root, os.path.join(self.root, "sub", "loop"))
+        except OSError:
+            self.skipTest("нет прав на создание символических ссылок")
+
+        skipped = self.rel_paths(WalkFilter(symlinks=SYMLINKS_SKIP))
+        self.assertNotIn("link.txt", skipped)
+        files = self.rel_paths(WalkFilter(symlinks=SYMLINKS_FILES))
+        self.assertIn("link.txt", files)
+        self.assertFalse(any(path.startswith("sub_link/") for path in files))
+
+        followed = self.rel_paths(WalkFilter(symlinks=SYMLINKS_FOLLOW))
+        # Каждая реальная папка обходится один раз, цикл не приводит к зависанию
+        self.assertEqual(len(followed), len(set(followed)))
+        self.assertIn("link.txt", followed)
+        self.assertEqual(sum(path.endswith("c.txt") for path in followed), 1)
+
+    def test_subtree_and_missing_root(self):
+        self.assertEqual(sorted(entry.rel_path for entry in iter_files(os.path.join(self.root, "sub"))),
+                         ["c.txt", os.path.join("deep", "d.txt")])
+        with self.assertRaises(OSError):
+            list(iter_files(os.path.join(self.root, "missing")))
+
+    def test_unknown_symlink_policy(self):
+        with self.assertRaises(ValueError):
+            WalkFilter(symlinks="sometimes")
+
+
+if __name__ == '__main__':
+    unittest.main()